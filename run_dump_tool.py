@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Удобный скрипт для работы с дампами памяти.
+"""
+
+import sys
+import os
+
+# Добавляем src в путь Python
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from vm.dump_tool import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Частичное вычисление программы при ассемблировании.
+
+В системе команд УВМ нет переходов, а адреса READ_MEM статические, поэтому
+начало программы, не зависящее от исходного содержимого памяти и регистров
+(данных времени выполнения), можно выполнить заранее. Результат такого
+выполнения записывается в компактный образ состояния, а остаток программы
+кодируется обычным образом и выполняется виртуальной машиной после
+применения образа.
+
+Вычисление учитывает размер памяти данных и число регистров целевой ВМ:
+образ, построенный для большей памяти, машина отвергает при загрузке.
+Вычисленные команды входят в счетчик выполненных инструкций, но не
+в ограничения max_steps и max_instructions: они действуют только на
+остаток программы, выполняемый машиной.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from .command import Command
+from .encoder import Encoder
+
+# Формат образа состояния задан в src/vm/image.py (пакет vm доступен через путь src)
+from vm.image import StateImage, encode_state_image
+
+
+@dataclass
+class EvaluationResult:
+    """Результат частичного вычисления программы."""
+    folded: int  # Количество вычисленных команд
+    registers: Dict[int, int] = field(default_factory=dict)  # Регистр -> беззнаковое значение
+    memory: Dict[int, int] = field(default_factory=dict)  # Адрес -> беззнаковое значение
+    memory_accesses: int = 0
+    alu_flags: Optional[Tuple[bool, bool, bool, bool]] = None  # Z, N, V, C
+    residual: List[Command] = field(default_factory=list)  # Невычисленный остаток
+
+    @property
+    def fully_evaluated(self) -> bool:
+        """Вся программа вычислена при ассемблировании."""
+        return not self.residual
+
+    def memory_runs(self) -> List[Tuple[int, List[int]]]:
+        """Группирует записанные ячейки в непрерывные участки."""
+        runs = []
+        for address in sorted(self.memory):
+            if runs and runs[-1][0] + len(runs[-1][1]) == address:
+                runs[-1][1].append(self.memory[address])
+            else:
+                runs.append((address, [self.memory[address]]))
+        return runs
+
+    def to_image(self) -> bytes:
+        """Кодирует образ состояния вместе с остатком программы."""
+        return encode_state_image(StateImage(
+            instructions_executed=self.folded, memory_accesses=self.memory_accesses,
+            registers=self.registers, memory_runs=self.memory_runs(),
+            alu_flags=self.alu_flags, code=Encoder.encode_commands(self.residual)))
+
+
+class PartialEvaluator:
+    """Символьное выполнение списка команд с семантикой VirtualMachine."""
+
+    def __init__(self, data_size: int = 65536, num_registers: int = 32):
+        """
+        Args:
+            data_size: размер памяти данных целевой ВМ
+            num_registers: количество регистров целевой ВМ
+        """
+        self.data_size = data_size
+        self.num_registers = num_registers
+
+    @staticmethod
+    def _to_signed32(value: int) -> int:
+        """Преобразует 32-битное беззнаковое в знаковое."""
+        if value & 0x80000000:
+            return value - 0x100000000
+        return value
+
+    def evaluate(self, commands: List[Command]) -> EvaluationResult:
+        """
+        Вычисляет максимальное начало программы, не зависящее от данных
+        времени выполнения.
+
+        Вычисление останавливается на первой команде, которая читает
+        неизвестный регистр или ячейку памяти, не записанную ранее, либо
+        завершилась бы ошибкой: такая команда и все последующие остаются
+        в программе и выполняются виртуальной машиной.
+        """
+        registers: Dict[int, int] = {}  # Известные значения (беззнаковые)
+        memory: Dict[int, int] = {}
+        result = EvaluationResult(folded=0)
+
+        for position, command in enumerate(commands):
+            if not self._step(command, registers, memory, result):
+                result.residual = list(commands[position:])
+                break
+            result.folded += 1
+
+        result.registers = registers
+        result.memory = memory
+        return result
+
+    def _step(self, command: Command, registers: Dict[int, int],
+              memory: Dict[int, int], result: EvaluationResult) -> bool:
+        """Выполняет одну команду; False, если ее нельзя вычислить заранее."""
+        opcode, args = command.opcode, command.args
+
+        if opcode == 158:  # LOAD_CONST
+            const, reg = args
+            if reg >= self.num_registers:
+                return False
+            registers[reg] = const & 0xFFFFFFFF
+
+        elif opcode == 17:  # READ_MEM
+            address, reg = args
+            if address >= self.data_size or reg >= self.num_registers:
+                return False
+            if address not in memory:
+                return False  # Исходное содержимое памяти - данные времени выполнения
+            registers[reg] = memory[address]
+            result.memory_accesses += 1
+
+        elif opcode == 12:  # WRITE_MEM
+            reg_addr, reg_val = args
+            if reg_addr not in registers or reg_val not in registers:
+                return False
+            address = self._to_signed32(registers[reg_addr])
+            if not 0 <= address < self.data_size:
+                return False
+            memory[address] = registers[reg_val]
+            result.memory_accesses += 1
+
+        elif opcode == 214:  # ABS
+            offset, base_reg, src_reg = args
+            if base_reg not in registers or src_reg not in registers:
+                return False
+            address = self._to_signed32(registers[base_reg]) + offset
+            if not 0 <= address < self.data_size:
+                return False
+            value = self._to_signed32(registers[src_reg])
+            overflow = value == -0x80000000
+            abs_value = 0x7FFFFFFF if overflow else abs(value)
+            memory[address] = abs_value
+            result.alu_flags = (abs_value == 0, False, overflow, False)
+            result.memory_accesses += 1
+
+        else:
+            return False
+
+        return True
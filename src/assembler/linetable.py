@@ -0,0 +1,54 @@
+"""
+Таблица строк: соответствие смещений в двоичном файле строкам исходного текста.
+
+Таблица сохраняется рядом с двоичным файлом (файл .lines, JSON) и
+используется профилировщиком виртуальной машины для отчетов по строкам
+исходного текста. Смещения отсчитываются от начала кода, который
+выполняет машина (для образа состояния - от начала остатка программы).
+"""
+
+import json
+from pathlib import Path
+from typing import List, Optional
+from .command import Command
+
+# Формат таблицы строк задан в src/vm/profiler.py, который ее читает
+from vm.profiler import LINE_TABLE_FORMAT, LINE_TABLE_VERSION
+
+
+def default_line_table_path(output_file: str) -> str:
+    """Путь к таблице строк для двоичного файла (program.bin -> program.bin.lines)."""
+    return str(output_file) + ".lines"
+
+
+def build_line_table(commands: List[Command], source: Optional[str] = None) -> dict:
+    """
+    Строит таблицу строк для последовательности команд.
+
+    Args:
+        commands: команды в порядке размещения в двоичном файле
+        source: имя исходного файла
+
+    Returns:
+        Словарь в формате файла таблицы строк
+    """
+    entries = []
+    offset = 0
+    for command in commands:
+        size = command.get_size()
+        entries.append([offset, size, command.line_number, command.raw_line])
+        offset += size
+    return {
+        "format": LINE_TABLE_FORMAT,
+        "version": LINE_TABLE_VERSION,
+        "source": Path(source).name if source else None,
+        "entries": entries,
+    }
+
+
+def write_line_table(commands: List[Command], file_path: str,
+                     source: Optional[str] = None):
+    """Сохраняет таблицу строк в файл."""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(build_line_table(commands, source), f, ensure_ascii=False)
+        f.write("\n")
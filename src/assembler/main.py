@@ -7,6 +7,8 @@ import argparse
 from pathlib import Path
 from .parser import Parser
 from .encoder import Encoder
+from .evaluator import PartialEvaluator
+from .linetable import default_line_table_path, write_line_table
 
 def main():
     """Точка входа ассемблера."""
@@ -19,8 +21,23 @@ def main():
     parser.add_argument('output_file', help='Путь к двоичному файлу-результату')
     parser.add_argument('--test', action='store_true', 
                        help='Режим тестирования (вывод промежуточного представления и байтов)')
+    parser.add_argument('--fold', action='store_true',
+                       help='Частичное вычисление: заменить не зависящее от входных данных '
+                            'начало программы образом состояния (вычисленные команды не '
+                            'учитываются в --max-steps интерпретатора)')
+    parser.add_argument('--data-size', type=int, default=65536, metavar='N',
+                       help='Размер памяти данных целевой ВМ для --fold (по умолчанию 65536)')
+    parser.add_argument('--registers', type=int, default=32, metavar='N',
+                       help='Количество регистров целевой ВМ для --fold (по умолчанию 32)')
+    parser.add_argument('--line-table', nargs='?', const='', metavar='FILE',
+                       help='Сохранить таблицу строк для профилировщика '
+                            '(по умолчанию <output_file>.lines)')
     
     args = parser.parse_args()
+
+    if args.data_size <= 0 or args.registers <= 0:
+        print("Ошибка: размер памяти данных и количество регистров должны быть положительными")
+        sys.exit(1)
     
     # Проверяем существование входного файла
     input_path = Path(args.input_file)
@@ -47,12 +64,32 @@ def main():
         # Кодируем команды в бинарный формат
         encoder = Encoder()
         binary_data = encoder.encode_commands(commands)
+
+        # Частичное вычисление: образ состояния вместо вычисленных команд
+        executed_commands = commands
+        if args.fold:
+            result = PartialEvaluator(args.data_size, args.registers).evaluate(commands)
+            print(f"Вычислено при ассемблировании: {result.folded} из {len(commands)} команд")
+            if result.folded > 0:
+                binary_data = result.to_image()
+                executed_commands = result.residual
+                print(f"Образ состояния: {len(result.registers)} регистров, "
+                      f"{len(result.memory)} ячеек памяти, "
+                      f"остаток программы: {len(result.residual)} команд")
+            else:
+                print("Образ состояния не создан: программа зависит от входных данных")
         
         # Сохраняем бинарный файл
         output_path = Path(args.output_file)
         with open(output_path, 'wb') as f:
             f.write(binary_data)
         
+        # Таблица строк для профилирования
+        if args.line_table is not None:
+            line_table_path = args.line_table or default_line_table_path(output_path)
+            write_line_table(executed_commands, line_table_path, args.input_file)
+            print(f"Таблица строк сохранена в {line_table_path}")
+
         # Выводим информацию о файле
         file_size = output_path.stat().st_size
         print(f"\nДвоичный файл создан: {output_path}")
@@ -12,6 +12,9 @@ class ALU:
         self.negative_flag = False
         self.overflow_flag = False
         self.carry_flag = False
+        # Установки флага переполнения всеми механизмами выполнения
+        # (для счетчиков производительности; reset_flags не обнуляет)
+        self.overflow_events = 0
     
     def reset_flags(self):
         """Сбрасывает все флаги."""
@@ -42,12 +45,35 @@ class ALU:
         # Проверка на переполнение (если входное значение было минимальным отрицательным)
         if value == -0x80000000:  # -2^31
             self.overflow_flag = True
+            self.overflow_events += 1
             # В реальных системах abs(-2^31) = 2^31 вызывает переполнение
             # но в нашем случае ограничимся максимальным положительным 2^31-1
             result = 0x7FFFFFFF
         
         return result
     
+    @staticmethod
+    def abs_vector(values):
+        """
+        Вычисляет абсолютное значение для массива numpy (по одному на поток).
+
+        Args:
+            values: массив знаковых 32-битных значений (numpy int32)
+
+        Returns:
+            Кортеж (результаты int32, флаг Z, флаг N, флаг V) - флаги
+            являются булевыми массивами той же формы, что и values
+        """
+        import numpy as np
+        values = np.asarray(values, dtype=np.int32)
+        overflow = values == np.int32(-0x80000000)
+        result = np.abs(values.astype(np.int64))
+        result[overflow] = 0x7FFFFFFF
+        result = result.astype(np.int32)
+        zero = result == 0
+        negative = result < 0
+        return result, zero, negative, overflow
+
     def add(self, a: int, b: int) -> int:
         """Сложение двух чисел (заглушка для будущего расширения)."""
         self.reset_flags()
@@ -0,0 +1,22 @@
+"""
+Разбор аргументов командной строки, общих для программ УВМ.
+"""
+
+import argparse
+
+def parse_ip_range(text: str, kind: str = "IP"):
+    """Разбирает диапазон IP вида НАЧАЛО:КОНЕЦ (десятичные или 0x...)."""
+    try:
+        start, end = (int(part, 0) for part in text.split(':'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"неверный диапазон {kind}: {text}")
+    if start > end:
+        raise argparse.ArgumentTypeError(f"начало диапазона больше конца: {text}")
+    return start, end
+
+def parse_address_range(text: str):
+    """Разбирает диапазон адресов памяти вида НАЧАЛО:КОНЕЦ."""
+    start, end = parse_ip_range(text, "адресов")
+    if start < 0:
+        raise argparse.ArgumentTypeError(f"начальный адрес не может быть отрицательным: {text}")
+    return start, end
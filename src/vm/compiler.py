@@ -0,0 +1,251 @@
+"""
+Компиляция программ УВМ в функции Python.
+
+В системе команд УВМ нет переходов, поэтому программа является одним
+линейным блоком. Блок разбивается на фрагменты ограниченного размера,
+каждый фрагмент превращается в исходный текст функции Python (регистры -
+локальные переменные, память данных - локальная ссылка на список) и
+компилируется через compile/exec. Скомпилированные фрагменты кэшируются
+по хэшу кода инструкций фрагмента: кэш не хранит ссылок на программы,
+а одинаковые фрагменты разных программ компилируются один раз.
+
+Сгенерированный код не содержит сообщений об ошибках: если инструкция
+может завершиться ошибкой (неверный регистр, адрес вне памяти), фрагмент
+сохраняет регистры и возвращает номер этой инструкции. Ее выполняет
+интерпретатор, который и формирует ошибку так же, как при обычном запуске.
+"""
+
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+from .predecode import ProgramTable
+
+MASK32 = 0xFFFFFFFF
+SIGN32 = 0x80000000
+
+# Коды операций, обращающихся к памяти данных
+MEMORY_OPCODES = (17, 12, 214)
+
+# Размер фрагмента (в инструкциях) по умолчанию
+DEFAULT_CHUNK_SIZE = 2048
+
+# Кэш скомпилированных фрагментов, общий для всех ВМ
+_CACHE_LIMIT = 512
+_chunk_cache: "OrderedDict[tuple, Callable]" = OrderedDict()
+
+
+def generate_chunk_source(table: ProgramTable, start: int, stop: int,
+                          data_size: int, num_registers: int) -> str:
+    """
+    Генерирует исходный текст функции для инструкций [start, stop).
+
+    Функция принимает список регистров и память данных (беззнаковые
+    значения), возвращает кортеж (количество выполненных инструкций,
+    исходное значение последней выполненной ABS или -1, количество
+    переполнений ABS).
+    """
+    opcodes, arg0, arg1, arg2 = table.opcodes, table.arg0, table.arg1, table.arg2
+
+    body: List[str] = []
+    loaded = set()  # Регистры, прочитанные из списка в локальные переменные
+    modified = []  # Измененные регистры в порядке первого изменения
+    known: Dict[int, int] = {}  # Регистры с известным при компиляции значением
+
+    def use(reg: int) -> str:
+        if reg not in loaded and reg not in modified:
+            loaded.add(reg)
+        return f"r{reg}"
+
+    def assign(reg: int, expr: str):
+        if reg not in modified:
+            modified.append(reg)
+        body.append(f"    r{reg} = {expr}")
+
+    def bail(offset: int, indent: str = "    "):
+        for reg in modified:
+            body.append(f"{indent}regs[{reg}] = r{reg}")
+        body.append(f"{indent}return {offset}, f, o")
+
+    count = stop - start
+    for offset in range(count):
+        index = start + offset
+        opcode = opcodes[index]
+        a0, a1, a2 = arg0[index], arg1[index], arg2[index]
+
+        if opcode == 158:  # LOAD_CONST
+            if not 0 <= a1 < num_registers:
+                bail(offset)
+                break
+            value = a0 & MASK32
+            assign(a1, str(value))
+            known[a1] = value
+
+        elif opcode == 17:  # READ_MEM
+            if not (0 <= a0 < data_size and 0 <= a1 < num_registers):
+                bail(offset)
+                break
+            assign(a1, f"data[{a0}]")
+            known.pop(a1, None)
+
+        elif opcode == 12:  # WRITE_MEM
+            if not (0 <= a0 < num_registers and 0 <= a1 < num_registers):
+                bail(offset)
+                break
+            src = use(a1)
+            if a0 in known:
+                address = known[a0]
+                if address >= data_size:
+                    bail(offset)
+                    break
+                body.append(f"    data[{address}] = {src}")
+            else:
+                body.append(f"    a = {use(a0)}")
+                body.append(f"    if a >= {data_size}:")
+                bail(offset, "        ")
+                body.append(f"    data[a] = {src}")
+
+        else:  # ABS
+            if not (0 <= a1 < num_registers and 0 <= a2 < num_registers):
+                bail(offset)
+                break
+            if a1 in known:
+                base = known[a1]
+                if base & SIGN32:
+                    base -= 0x100000000
+                address = base + a0
+                if not 0 <= address < data_size:
+                    bail(offset)
+                    break
+                target = str(address)
+            else:
+                body.append(f"    a = {use(a1)}")
+                body.append(f"    if a & {SIGN32}:")
+                body.append(f"        a -= {0x100000000}")
+                if a0:
+                    body.append(f"    a += {a0}")
+                body.append(f"    if not 0 <= a < {data_size}:")
+                bail(offset, "        ")
+                target = "a"
+            body.append(f"    f = {use(a2)}")
+            body.append(f"    if f & {SIGN32}:")
+            body.append(f"        if f == {SIGN32}:")
+            body.append(f"            data[{target}] = {0x7FFFFFFF}")
+            body.append(f"            o += 1")
+            body.append(f"        else:")
+            body.append(f"            data[{target}] = {0x100000000} - f")
+            body.append(f"    else:")
+            body.append(f"        data[{target}] = f")
+    else:
+        bail(count)
+
+    header = [f"def chunk(regs, data):", "    f = -1", "    o = 0"]
+    header.extend(f"    r{reg} = regs[{reg}]" for reg in sorted(loaded))
+    return "\n".join(header + body) + "\n"
+
+
+def compile_chunk(table: ProgramTable, start: int, stop: int,
+                  data_size: int, num_registers: int) -> Callable:
+    """Компилирует фрагмент [start, stop) с использованием общего кэша."""
+    # Сгенерированный код зависит только от инструкций фрагмента и конфигурации ВМ
+    code = table.source[table.ip_at(start):table.ip_at(stop)]
+    key = (hashlib.blake2b(code, digest_size=16).digest(), data_size, num_registers)
+    function = _chunk_cache.get(key)
+    if function is not None:
+        _chunk_cache.move_to_end(key)
+        return function
+
+    source = generate_chunk_source(table, start, stop, data_size, num_registers)
+    namespace = {}
+    exec(compile(source, f"<УВМ: инструкции {start}-{stop - 1}>", "exec"), namespace)
+    function = namespace["chunk"]
+
+    _chunk_cache[key] = function
+    if len(_chunk_cache) > _CACHE_LIMIT:
+        _chunk_cache.popitem(last=False)
+    return function
+
+
+class CompiledProgram:
+    """Программа, выполняемая скомпилированными фрагментами."""
+
+    def __init__(self, vm, table: ProgramTable, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            vm: виртуальная машина
+            table: таблица предекодированных инструкций
+            chunk_size: максимальное количество инструкций во фрагменте
+        """
+        memory = vm.memory
+        self.table = table
+        self.chunk_size = chunk_size
+        self.data_size = memory.data_size
+        self.num_registers = memory.num_registers
+        self.chunks: Dict[Tuple[int, int], Callable] = {}
+
+        self.access_prefix = array('Q', [0])
+        total = 0
+        for opcode in table.opcodes:
+            if opcode in MEMORY_OPCODES:
+                total += 1
+            self.access_prefix.append(total)
+
+    def is_valid_for(self, vm, table: ProgramTable) -> bool:
+        """Проверяет, что программа построена для текущей конфигурации ВМ."""
+        return (self.table is table
+                and self.data_size == vm.memory.data_size
+                and self.num_registers == vm.memory.num_registers)
+
+    def chunk(self, start: int, stop: int) -> Callable:
+        """Возвращает функцию для инструкций [start, stop)."""
+        function = self.chunks.get((start, stop))
+        if function is None:
+            function = compile_chunk(self.table, start, stop,
+                                     self.data_size, self.num_registers)
+            self.chunks[(start, stop)] = function
+        return function
+
+    def memory_accesses(self, start: int, end: int) -> int:
+        """Количество обращений к памяти инструкций с номерами [start, end)."""
+        return self.access_prefix[end] - self.access_prefix[start]
+
+    def execute(self, vm, start: int, end: int) -> Tuple[int, Optional[int]]:
+        """
+        Выполняет инструкции [start, end) скомпилированными фрагментами.
+
+        Переполнения ABS учитываются в vm.alu.overflow_events.
+
+        Returns:
+            (номер первой невыполненной инструкции, исходное значение
+            последней выполненной ABS или None). Если номер меньше end,
+            эту инструкцию должен выполнить интерпретатор.
+        """
+        memory = vm.memory
+        regs = memory.registers
+        data = memory.data_memory
+        chunk_size = self.chunk_size
+        last_abs = None
+
+        index = start
+        while index < end:
+            stop = min(index + chunk_size, end)
+            executed, abs_source, overflows = self.chunk(index, stop)(regs, data)
+            if abs_source >= 0:
+                last_abs = abs_source
+            vm.alu.overflow_events += overflows
+            index += executed
+            if index < stop:
+                break
+
+        return index, last_abs
+
+
+def apply_abs_flags(alu, source: int):
+    """Устанавливает флаги АЛУ так же, как ALU.abs для беззнакового source."""
+    alu.reset_flags()
+    if source & SIGN32:
+        result = 0x7FFFFFFF if source == SIGN32 else 0x100000000 - source
+    else:
+        result = source
+    alu.zero_flag = result == 0
+    alu.overflow_flag = source == SIGN32
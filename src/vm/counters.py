@@ -0,0 +1,81 @@
+"""
+Счетчики производительности виртуальной машины.
+
+Счетчики заполняются после запуска по таблице предекодированных
+инструкций: программа выполняется линейно, поэтому выполненные инструкции -
+это отрезок таблицы от начального до конечного IP. Выполнение идет
+выбранным механизмом без дополнительных проверок; время по классам
+инструкций учитывается только при включенном профилировщике.
+"""
+
+from typing import Dict, Optional
+
+# Имена инструкций по кодам операций
+OPCODE_NAMES = {158: 'LOAD_CONST', 17: 'READ_MEM', 12: 'WRITE_MEM', 214: 'ABS'}
+
+# Классы инструкций для учета времени выполнения
+OPCODE_CLASSES = {158: 'register', 17: 'memory', 12: 'memory', 214: 'alu'}
+
+
+class PerfCounters:
+    """Счетчики производительности."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Обнуляет счетчики."""
+        self.retired: Dict[str, int] = dict.fromkeys(OPCODE_NAMES.values(), 0)
+        self.loads = 0            # Чтения памяти данных (READ_MEM)
+        self.stores = 0           # Записи в память данных (WRITE_MEM, ABS)
+        self.bytes_decoded = 0    # Байт кода выполненных инструкций
+        self.overflow_events = 0  # Установок флага переполнения АЛУ
+        self.time_ns: Dict[str, int] = dict.fromkeys(sorted(set(OPCODE_CLASSES.values())), 0)
+
+    def count_run(self, table, start: int, end: int, overflow_events: int = 0,
+                  time_ns: Optional[Dict[str, int]] = None):
+        """
+        Учитывает инструкции [start, end) таблицы, выполненные за запуск.
+
+        Args:
+            table: таблица предекодированных инструкций
+            start: номер первой выполненной инструкции
+            end: номер первой невыполненной инструкции
+            overflow_events: установок флага переполнения за запуск
+            time_ns: время выполнения по классам инструкций (из профилировщика)
+        """
+        opcodes = table.opcodes[start:end]
+        for opcode, name in OPCODE_NAMES.items():
+            self.retired[name] += opcodes.count(opcode)
+        self.loads += opcodes.count(17)
+        self.stores += opcodes.count(12) + opcodes.count(214)
+        self.bytes_decoded += table.ip_at(end) - table.ip_at(start)
+        self.overflow_events += overflow_events
+        if time_ns is not None:
+            for name, cost in time_ns.items():
+                self.time_ns[name] += cost
+
+    @property
+    def instructions_retired(self) -> int:
+        """Общее количество выполненных инструкций."""
+        return sum(self.retired.values())
+
+    def as_dict(self) -> dict:
+        """Значения счетчиков в виде словаря (пригоден для JSON)."""
+        return {
+            'instructions_retired': self.instructions_retired,
+            'retired': dict(self.retired),
+            'loads': self.loads,
+            'stores': self.stores,
+            'bytes_decoded': self.bytes_decoded,
+            'overflow_events': self.overflow_events,
+            'time_ns': dict(self.time_ns),
+        }
+
+
+def class_time_ns(profiler) -> Dict[str, int]:
+    """Время выполнения по классам инструкций, накопленное профилировщиком."""
+    totals = dict.fromkeys(sorted(set(OPCODE_CLASSES.values())), 0)
+    for ip, opcode in profiler.opcodes.items():
+        totals[OPCODE_CLASSES[opcode]] += profiler.cost_ns[ip]
+    return totals
@@ -2,7 +2,7 @@
 Декодер команд для виртуальной машины.
 """
 
-from typing import Tuple
+from typing import Optional, Tuple
 from dataclasses import dataclass
 
 @dataclass
@@ -34,16 +34,16 @@ class Decoder:
         return value
 
     @staticmethod
-    def decode_instruction(data: bytes, ip: int) -> DecodedInstruction:
+    def decode_fields(data: bytes, ip: int) -> Tuple[int, Tuple[int, ...], int]:
         """
-        Декодирует инструкцию из бинарных данных.
+        Декодирует поля инструкции без создания DecodedInstruction.
 
         Args:
             data: все бинарные данные программы
             ip: текущий указатель инструкции
 
         Returns:
-            DecodedInstruction: декодированная инструкция
+            Кортеж (код операции, аргументы, размер команды в байтах)
         """
         if ip >= len(data):
             raise IndexError(f"Указатель инструкции {ip} вне диапазона программы")
@@ -56,11 +56,8 @@ class Decoder:
             if ip + 6 > len(data):
                 raise ValueError("Недостаточно данных для команды LOAD_CONST")
 
-            # Извлекаем байты
-            bytes_data = data[ip:ip+6]
-
             # Декодируем: (c << 38) | (b << 8) | a
-            value = int.from_bytes(bytes_data, byteorder='little')
+            value = int.from_bytes(data[ip:ip+6], byteorder='little')
 
             # Извлекаем поля
             a = value & 0xFF  # opcode
@@ -70,40 +67,37 @@ class Decoder:
             # Расширяем знак для 30-битного числа
             b_signed = Decoder._sign_extend(b_raw, 30)
 
-            return DecodedInstruction(opcode=a, args=(b_signed, c), size=6)
+            return a, (b_signed, c), 6
 
         elif opcode == 17:  # READ_MEM - 5 байт
             if ip + 5 > len(data):
                 raise ValueError("Недостаточно данных для команды READ_MEM")
 
-            bytes_data = data[ip:ip+5]
-            value = int.from_bytes(bytes_data, byteorder='little')
+            value = int.from_bytes(data[ip:ip+5], byteorder='little')
 
             a = value & 0xFF  # opcode
             b = (value >> 8) & 0x3FFFFFF  # 26 бит (адрес памяти - беззнаковый)
             c = (value >> 34) & 0x1F  # 5 бит
 
-            return DecodedInstruction(opcode=a, args=(b, c), size=5)
+            return a, (b, c), 5
 
         elif opcode == 12:  # WRITE_MEM - 3 байта
             if ip + 3 > len(data):
                 raise ValueError("Недостаточно данных для команды WRITE_MEM")
 
-            bytes_data = data[ip:ip+3]
-            value = int.from_bytes(bytes_data, byteorder='little')
+            value = int.from_bytes(data[ip:ip+3], byteorder='little')
 
             a = value & 0xFF  # opcode
             b = (value >> 8) & 0x1F  # 5 бит
             c = (value >> 13) & 0x1F  # 5 бит
 
-            return DecodedInstruction(opcode=a, args=(b, c), size=3)
+            return a, (b, c), 3
 
         elif opcode == 214:  # ABS - 5 байт
             if ip + 5 > len(data):
                 raise ValueError("Недостаточно данных для команды ABS")
 
-            bytes_data = data[ip:ip+5]
-            value = int.from_bytes(bytes_data, byteorder='little')
+            value = int.from_bytes(data[ip:ip+5], byteorder='little')
 
             a = value & 0xFF  # opcode
             b_raw = (value >> 8) & 0xFFFF  # 16 бит (беззнаковое)
@@ -113,19 +107,35 @@ class Decoder:
             # Расширяем знак для 16-битного смещения
             b_signed = Decoder._sign_extend(b_raw, 16)
 
-            return DecodedInstruction(opcode=a, args=(b_signed, c, d), size=5)
-        
+            return a, (b_signed, c, d), 5
+
         else:
             raise ValueError(f"Неизвестный код операции: {opcode}")
+
+    @staticmethod
+    def decode_instruction(data: bytes, ip: int) -> DecodedInstruction:
+        """
+        Декодирует инструкцию из бинарных данных.
+
+        Args:
+            data: все бинарные данные программы
+            ip: текущий указатель инструкции
+
+        Returns:
+            DecodedInstruction: декодированная инструкция
+        """
+        opcode, args, size = Decoder.decode_fields(data, ip)
+        return DecodedInstruction(opcode=opcode, args=args, size=size)
     
     @staticmethod
-    def print_instruction(instr: DecodedInstruction, ip: int):
-        """Выводит информацию об инструкции."""
-        if instr.opcode == 158:
-            print(f"[{ip:04X}] LOAD_CONST const={instr.args[0]}, reg={instr.args[1]}")
-        elif instr.opcode == 17:
-            print(f"[{ip:04X}] READ_MEM  addr={instr.args[0]}, reg={instr.args[1]}")
-        elif instr.opcode == 12:
-            print(f"[{ip:04X}] WRITE_MEM reg_addr={instr.args[0]}, reg_val={instr.args[1]}")
-        elif instr.opcode == 214:
-            print(f"[{ip:04X}] ABS       offset={instr.args[0]}, base_reg={instr.args[1]}, src_reg={instr.args[2]}")
\ No newline at end of file
+    def format_fields(opcode: int, args, ip: int) -> Optional[str]:
+        """Возвращает строку с информацией об инструкции."""
+        if opcode == 158:
+            return f"[{ip:04X}] LOAD_CONST const={args[0]}, reg={args[1]}"
+        elif opcode == 17:
+            return f"[{ip:04X}] READ_MEM  addr={args[0]}, reg={args[1]}"
+        elif opcode == 12:
+            return f"[{ip:04X}] WRITE_MEM reg_addr={args[0]}, reg_val={args[1]}"
+        elif opcode == 214:
+            return f"[{ip:04X}] ABS       offset={args[0]}, base_reg={args[1]}, src_reg={args[2]}"
+        return None
@@ -0,0 +1,94 @@
+"""
+Работа с XML-дампами памяти: сравнение и разворачивание разреженных дампов,
+чтение ячеек по индексу дампа.
+"""
+
+import sys
+import argparse
+from .dumpformats import DUMP_FORMATS, COMPRESSIONS
+from .dumpreader import load_dump, diff_dumps, diff_registers
+from .dumpindex import IndexedDump
+from .cliargs import parse_address_range
+
+def parse_cells(text: str):
+    """Разбирает адрес ячейки или диапазон адресов НАЧАЛО:КОНЕЦ."""
+    if ':' in text:
+        return parse_address_range(text)
+    return parse_address_range(f"{text}:{text}")
+
+def main():
+    """Точка входа программы работы с дампами."""
+    parser = argparse.ArgumentParser(
+        description='Сравнение и разворачивание дампов памяти УВМ',
+        epilog='Пример: python run_dump_tool.py diff before.xml after.xml'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('diff', help='Различия регистров и ячеек двух дампов')
+    command.add_argument('old_dump')
+    command.add_argument('new_dump')
+
+    command = commands.add_parser('expand', help='Развернуть дамп (в том числе разреженный) '
+                                                 'в плотный дамп')
+    command.add_argument('dump_file')
+    command.add_argument('output_file')
+    command.add_argument('--format', choices=DUMP_FORMATS, default='xml', dest='dump_format')
+    command.add_argument('--compress', choices=COMPRESSIONS, default=None)
+    command.add_argument('--base', default=None, dest='base_dump',
+                         help='Исходный дамп - значения ячеек, не записанных '
+                              'в дамп changed')
+
+    command = commands.add_parser('get', help='Прочитать ячейки по индексу дампа '
+                                              '(дамп записан с --dump-index)')
+    command.add_argument('dump_file')
+    command.add_argument('addresses', nargs='+', type=parse_cells,
+                         metavar='ADDR|START:END')
+    command.add_argument('--index', default=None, dest='index_file',
+                         help='Файл индекса (по умолчанию - <дамп>.idx)')
+
+    args = parser.parse_args()
+
+    if args.command == 'get':
+        try:
+            with IndexedDump(args.dump_file, args.index_file) as dump:
+                for start_addr, end_addr in args.addresses:
+                    values = dump.read(start_addr, end_addr)
+                    for address, value in enumerate(values, start_addr):
+                        print(f"[{address}]: {value}")
+        except (OSError, ValueError) as e:
+            print(f"Ошибка чтения дампа: {e}")
+            sys.exit(1)
+        return
+
+    try:
+        if args.command == 'diff':
+            old, new = load_dump(args.old_dump), load_dump(args.new_dump)
+        else:
+            dump = load_dump(args.dump_file)
+            base = load_dump(args.base_dump) if args.base_dump else None
+            memory = dump.to_memory(base)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка чтения дампа: {e}")
+        sys.exit(1)
+
+    if args.command == 'expand':
+        select = 'all' if dump.regions else 'registers'
+        memory.dump_regions(args.output_file, dump.regions, args.dump_format, args.compress,
+                            select=select)
+        return
+
+    changes = 0
+    if not old.registers or not new.registers:
+        print("Регистры не сравниваются: в дампе нет раздела registers")
+    for reg, before, after in diff_registers(old, new):
+        print(f"R{reg}: {before} -> {after}")
+        changes += 1
+    for address, before, after in diff_dumps(old, new):
+        print(f"[{address}]: {before} -> {after}")
+        changes += 1
+    print(f"Различий: {changes}")
+    if changes:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Форматы дампа памяти данных.
+
+    xml   - прежний формат (система, регистры, ячейки), см. xmldump
+    raw   - 32-битные слова little-endian без заголовка
+    npy   - массив NumPy int32 (формат .npy, запись не требует numpy)
+    csv   - address,value_signed,value_unsigned,value_hex
+    jsonl - по объекту JSON на строку: {"address": ..., "value": ...}
+
+Двоичные форматы записываются прямо из буфера памяти блоками, без
+создания объектов на каждую ячейку. Любой формат можно сжать gzip или xz;
+сжатие определяется и по расширению файла (.gz, .xz).
+
+Разреженный дамп (SPARSE_MODES) содержит только ненулевые ячейки или
+ячейки, измененные после Memory.track_writes, и доступен только в XML:
+пропуски записываются элементами <gap address=... count=.../>, а режим -
+атрибутом sparse области. В csv и jsonl пропуски и режим записать негде.
+"""
+
+import os
+import gzip
+import lzma
+from typing import IO, Iterable, Optional, Tuple
+from .xmldump import SECTIONS
+from .paralleldump import formatted_blocks, PARALLEL_MIN_CELLS
+
+DUMP_FORMATS = ('xml', 'raw', 'npy', 'csv', 'jsonl')
+COMPRESSIONS = ('gzip', 'xz')
+
+# Форматы, хранящие непрерывный диапазон ячеек
+CONTIGUOUS_FORMATS = ('raw', 'npy')
+
+# Форматы, в которых записывается разреженный дамп
+SPARSE_FORMATS = ('xml',)
+
+# Режимы разреженного дампа: ненулевые ячейки, измененные ячейки
+SPARSE_MODES = ('nonzero', 'changed')
+
+# Выбор разделов дампа: все, только регистры, только память данных
+DUMP_SELECTIONS = {'all': SECTIONS, 'registers': ('registers',), 'memory': ('memory',)}
+
+# Количество ячеек в одном блоке записи
+CELLS_PER_BLOCK = 1 << 16
+
+# Строки ячеек текстовых форматов: адрес, знаковое, беззнаковое значение
+ROW_FORMATS = {
+    'csv': "{0},{1},{2},0x{2:08X}\n",
+    'jsonl': '{{"address": {0}, "value": {1}}}\n',
+}
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """Определяет сжатие по расширению файла."""
+    name = str(file_path).lower()
+    if name.endswith('.gz'):
+        return 'gzip'
+    if name.endswith('.xz'):
+        return 'xz'
+    return None
+
+
+def open_dump_file(file_path: str, binary: bool, compression: Optional[str] = None) -> IO:
+    """
+    Открывает файл дампа для записи.
+
+    Args:
+        file_path: путь к файлу
+        binary: двоичный (True) или текстовый (False, UTF-8) файл
+        compression: None, 'gzip' или 'xz'
+    """
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"Неизвестный вид сжатия: {compression}")
+    mode = 'wb' if binary else 'wt'
+    encoding = None if binary else 'utf-8'
+    if compression == 'gzip':
+        return gzip.open(file_path, mode, encoding=encoding)
+    if compression == 'xz':
+        return lzma.open(file_path, mode, encoding=encoding)
+    return open(file_path, 'wb' if binary else 'w', encoding=encoding)
+
+
+def region_path(file_path: str, start_addr: int, end_addr: int) -> str:
+    """Имя файла области дампа: dump.xml.gz -> dump_100_199.xml.gz."""
+    directory, name = os.path.split(file_path)
+    stem, dot, suffixes = name.partition('.')
+    return os.path.join(directory, f"{stem}_{start_addr}_{end_addr}{dot}{suffixes}")
+
+
+def open_dump_input(file_path: str, binary: bool = True) -> IO:
+    """Открывает файл дампа для чтения (сжатие - по расширению файла)."""
+    compression = detect_compression(file_path)
+    mode = 'rb' if binary else 'rt'
+    encoding = None if binary else 'utf-8'
+    if compression == 'gzip':
+        return gzip.open(file_path, mode, encoding=encoding)
+    if compression == 'xz':
+        return lzma.open(file_path, mode, encoding=encoding)
+    return open(file_path, 'rb' if binary else 'r', encoding=encoding)
+
+
+def npy_header(count: int) -> bytes:
+    """Заголовок файла .npy (версия 1.0) для одномерного массива int32."""
+    header = f"{{'descr': '<i4', 'fortran_order': False, 'shape': ({count},), }}"
+    # Заголовок дополняется пробелами так, чтобы данные начинались с границы 64 байт
+    padding = 64 - (10 + len(header) + 1) % 64
+    header = header + " " * (padding % 64) + "\n"
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, 'little') + header.encode('latin1')
+
+
+def write_raw(memory, f: IO, start_addr: int, end_addr: int) -> int:
+    """Записывает ячейки [start_addr, end_addr] словами little-endian."""
+    for block in range(start_addr, end_addr + 1, CELLS_PER_BLOCK):
+        f.write(memory.to_bytes(block, min(block + CELLS_PER_BLOCK - 1, end_addr)))
+    return end_addr - start_addr + 1
+
+
+def write_npy(memory, f: IO, start_addr: int, end_addr: int) -> int:
+    """Записывает ячейки [start_addr, end_addr] в формате .npy (int32)."""
+    f.write(npy_header(end_addr - start_addr + 1))
+    return write_raw(memory, f, start_addr, end_addr)
+
+
+def _format_rows(cells, first: int, row_format: str) -> str:
+    """Строки ячеек cells (беззнаковые значения начиная с адреса first)."""
+    lines = []
+    for address, unsigned in enumerate(cells, first):
+        signed = unsigned - 0x100000000 if unsigned & 0x80000000 else unsigned
+        lines.append(row_format.format(address, signed, unsigned))
+    return "".join(lines)
+
+
+def _text_rows(memory, f: IO, ranges: Iterable[Tuple[int, int]], kind: str,
+               workers: int = 0) -> int:
+    """Записывает ячейки участков ranges строками формата kind."""
+    ranges = list(ranges)
+    written = 0
+    if workers > 1 and sum(last - first + 1 for first, last in ranges) >= PARALLEL_MIN_CELLS:
+        for count, text in formatted_blocks(memory, ranges, kind, workers):
+            f.write(text)
+            written += count
+        return written
+    data = memory.data_memory
+    for first, last in ranges:
+        for block in range(first, last + 1, CELLS_PER_BLOCK):
+            stop = min(block + CELLS_PER_BLOCK, last + 1)
+            f.write(_format_rows(data[block:stop], block, ROW_FORMATS[kind]))
+            written += stop - block
+    return written
+
+
+def _text_regions(memory, f: IO, regions: Iterable[Tuple[int, int, Iterable]],
+                  kind: str, workers: int) -> int:
+    """Записывает области дампа строками формата kind."""
+    return sum(_text_rows(memory, f, source, kind, workers) for _, _, source in regions)
+
+
+def write_csv(memory, f: IO, regions: Iterable[Tuple[int, int, Iterable]],
+              workers: int = 0) -> int:
+    """
+    Записывает ячейки в CSV с заголовком.
+
+    Области regions - как в write_xml_dump: (start_addr, end_addr, source),
+    source - участки [first, last] (разреженный дамп в csv недоступен).
+    При workers > 1 большие плотные области форматируются пулом процессов.
+    """
+    f.write("address,value_signed,value_unsigned,value_hex\n")
+    return _text_regions(memory, f, regions, 'csv', workers)
+
+
+def write_jsonl(memory, f: IO, regions: Iterable[Tuple[int, int, Iterable]],
+                workers: int = 0) -> int:
+    """Записывает ячейки в формате JSON Lines (аргументы - как в write_csv)."""
+    return _text_regions(memory, f, regions, 'jsonl', workers)
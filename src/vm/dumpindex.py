@@ -0,0 +1,236 @@
+"""
+Индекс XML-дампа памяти для чтения отдельных ячеек без разбора документа.
+
+Индекс записывается вместе с дампом в файл <дамп>.idx и хранит для
+каждого блока из CELLS_PER_INDEX_BLOCK адресов смещение (в байтах) первой
+строки дампа (<cell> или <gap>), относящейся к адресам блока или следующим
+за ним. Чтобы прочитать ячейку, достаточно прочитать одно смещение по
+номеру блока, перейти к нему в дампе и просмотреть не больше строк блока,
+поэтому время обращения не зависит от размера дампа.
+
+Формат индекса (little-endian):
+    b"UVMIDX01", длина заголовка (4 байта), заголовок JSON;
+    смещения блоков с first_block по 8 байт (NO_OFFSET - блок без строк).
+Индексируются только несжатые XML-дампы: в сжатом файле нельзя перейти
+к смещению без распаковки предшествующих данных.
+"""
+
+import os
+import re
+import sys
+import json
+from array import array
+from typing import Callable, List, Optional, Tuple
+
+INDEX_MAGIC = b"UVMIDX01"
+INDEX_FORMAT = "uvm-dump-index"
+
+# Количество адресов в блоке индекса
+CELLS_PER_INDEX_BLOCK = 256
+
+# Смещение блока, для которого в дампе нет строк
+NO_OFFSET = 0xFFFFFFFFFFFFFFFF
+
+# Строка ячейки или пропуска дампа
+_ELEMENT = re.compile(rb'<(cell|gap) address="(\d+)" (?:value_signed="(-?\d+)"|count="(\d+)")')
+
+
+def index_path(dump_path: str) -> str:
+    """Имя файла индекса дампа: dump.xml -> dump.xml.idx."""
+    return str(dump_path) + ".idx"
+
+
+class DumpIndexBuilder:
+    """Строит индекс во время записи XML-дампа (см. write_xml_dump)."""
+
+    def __init__(self, write: Callable[[str], None], block: int = CELLS_PER_INDEX_BLOCK):
+        """
+        Args:
+            write: функция записи текста дампа в файл
+            block: количество адресов в блоке индекса
+        """
+        self._write = write
+        self.block = block
+        self.offset = 0  # Записано байт дампа
+        self.regions: List[Tuple[int, int]] = []
+        self.region_modes: List[Optional[str]] = []
+        self.sparse: Optional[str] = None
+        self.first_block = 0
+        self.offsets = array('Q')
+        self._next_block = 0
+
+    def write(self, text: str):
+        """Записывает текст дампа и учитывает его размер в байтах (UTF-8)."""
+        self._write(text)
+        self.offset += len(text) if text.isascii() else len(text.encode('utf-8'))
+
+    def region(self, start_addr: int, end_addr: int, sparse: Optional[str] = None):
+        """Начало области дампа; области должны идти по возрастанию адресов."""
+        if not self.regions:
+            self.first_block = self._next_block = start_addr // self.block
+        self._next_block = max(self._next_block, start_addr // self.block)
+        self.regions.append((start_addr, end_addr))
+        self.region_modes.append(sparse)
+        self.sparse = sparse
+
+    def _mark_until(self, last: int, offset: int):
+        """Назначает offset блокам, начинающимся не позже адреса last."""
+        while self._next_block * self.block <= last:
+            missing = self._next_block - self.first_block - len(self.offsets)
+            self.offsets.extend([NO_OFFSET] * missing)
+            self.offsets.append(offset)
+            self._next_block += 1
+
+    def element(self, last: int, pending: int = 0):
+        """
+        Строка дампа, относящаяся к адресам до last включительно.
+
+        Args:
+            last: последний адрес строки (ячейки или пропуска)
+            pending: байт текста, еще не переданного в write перед строкой
+        """
+        self._mark_until(last, self.offset + pending)
+
+    def cells(self, text: str, first: int, count: int):
+        """Пакет строк count ячеек плотного дампа начиная с адреса first (до записи)."""
+        last = first + count - 1
+        position = 0
+        while self._next_block * self.block <= last:
+            address = self._next_block * self.block
+            if address > first:
+                position = text.index(f"<cell address=\"{address}\"", position)
+                position = text.rfind("\n", 0, position) + 1
+            self._mark_until(address, self.offset + position)
+
+    def save(self, file_path: str):
+        """Записывает индекс в файл."""
+        header = json.dumps({"format": INDEX_FORMAT, "version": 1, "block": self.block,
+                             "first_block": self.first_block, "blocks": len(self.offsets),
+                             "regions": self.regions, "region_modes": self.region_modes,
+                             "sparse": self.sparse,
+                             "dump_size": self.offset}).encode('utf-8')
+        with open(file_path, 'wb') as f:
+            f.write(INDEX_MAGIC + len(header).to_bytes(4, 'little') + header)
+            offsets = array('Q', self.offsets)
+            if sys.byteorder != 'little':
+                offsets.byteswap()
+            f.write(offsets.tobytes())
+
+
+class IndexedDump:
+    """XML-дамп с индексом: чтение ячеек и диапазонов переходом по смещению."""
+
+    def __init__(self, dump_path: str, index_file: Optional[str] = None):
+        """
+        Args:
+            dump_path: несжатый XML-дамп
+            index_file: файл индекса (по умолчанию - index_path(dump_path))
+
+        Raises:
+            ValueError: файл не является индексом или индекс не соответствует дампу
+        """
+        index_file = index_file or index_path(dump_path)
+        self._index = open(index_file, 'rb')
+        try:
+            magic = self._index.read(len(INDEX_MAGIC))
+            size = int.from_bytes(self._index.read(4), 'little')
+            header = json.loads(self._index.read(size).decode('utf-8')) \
+                if magic == INDEX_MAGIC else {}
+            if header.get("format") != INDEX_FORMAT:
+                raise ValueError(f"Файл не является индексом дампа: {index_file}")
+            if os.path.getsize(dump_path) != header["dump_size"]:
+                raise ValueError(f"Индекс {index_file} не соответствует дампу {dump_path}")
+            self._dump = open(dump_path, 'rb')
+        except BaseException:
+            self._index.close()
+            raise
+        self._base = len(INDEX_MAGIC) + 4 + size
+        self.block = header["block"]
+        self.first_block = header["first_block"]
+        self.blocks = header["blocks"]
+        self.regions: List[Tuple[int, int]] = [tuple(region) for region in header["regions"]]
+        self.sparse: Optional[str] = header["sparse"]
+        self.region_modes: List[Optional[str]] = header.get(
+            "region_modes", [self.sparse] * len(self.regions))
+
+    def close(self):
+        """Закрывает файлы дампа и индекса."""
+        self._dump.close()
+        self._index.close()
+
+    def __enter__(self) -> 'IndexedDump':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, address: int) -> bool:
+        return any(start <= address <= end for start, end in self.regions)
+
+    def _check_range(self, start_addr: int, end_addr: int):
+        """Проверяет, что адреса [start_addr, end_addr] входят в области дампа."""
+        address = start_addr
+        for start, end in self.regions:
+            if start <= address <= end:
+                address = end + 1
+            if address > end_addr:
+                return
+        raise ValueError(f"Адреса [{start_addr}, {end_addr}] вне областей дампа: "
+                         + ", ".join(f"[{start}, {end}]" for start, end in self.regions))
+
+    def _offset(self, address: int) -> Optional[int]:
+        """Смещение строк блока адреса address (None - строк нет)."""
+        position = address // self.block - self.first_block
+        if not 0 <= position < self.blocks:
+            return None
+        self._index.seek(self._base + 8 * position)
+        offset = int.from_bytes(self._index.read(8), 'little')
+        return None if offset == NO_OFFSET else offset
+
+    def _initial_values(self, start_addr: int, end_addr: int) -> List[Optional[int]]:
+        """
+        Значения пропусков [start_addr, end_addr]: ноль, а в областях
+        дампа changed - None (ячейка не изменилась, ее значения в дампе нет).
+        """
+        values: List[Optional[int]] = [0] * (end_addr - start_addr + 1)
+        for (start, end), mode in zip(self.regions, self.region_modes):
+            if mode == 'changed':
+                first, last = max(start, start_addr), min(end, end_addr)
+                values[first - start_addr:last - start_addr + 1] = [None] * max(0, last - first + 1)
+        return values
+
+    def read(self, start_addr: int, end_addr: int) -> List[int]:
+        """
+        Знаковые значения ячеек [start_addr, end_addr] (пропуск дампа nonzero - ноль).
+
+        Raises:
+            ValueError: адреса вне областей дампа или значение ячейки
+                        неизвестно (пропуск дампа changed)
+        """
+        if end_addr < start_addr:
+            raise ValueError(f"Конечный адрес меньше начального: {end_addr} < {start_addr}")
+        self._check_range(start_addr, end_addr)
+        values = self._initial_values(start_addr, end_addr)
+        offset = self._offset(start_addr)
+        if offset is not None:
+            self._dump.seek(offset)
+            for line in self._dump:
+                match = _ELEMENT.search(line)
+                if match is None:
+                    if line.lstrip().startswith(b"</memory_dump"):
+                        break
+                    continue
+                address = int(match.group(2))
+                if address > end_addr:
+                    break
+                if match.group(1) == b"cell" and address >= start_addr:
+                    values[address - start_addr] = int(match.group(3))
+        if None in values:
+            address = start_addr + values.index(None)
+            raise ValueError(f"Значение ячейки {address} неизвестно: дамп changed содержит "
+                             f"только ячейки, измененные после track_writes")
+        return values
+
+    def value(self, address: int) -> int:
+        """Знаковое значение ячейки (пропуск дампа nonzero - ноль, см. read)."""
+        return self.read(address, address)[0]
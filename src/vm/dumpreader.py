@@ -0,0 +1,250 @@
+"""
+Чтение и сравнение XML-дампов памяти.
+
+iter_dump разбирает дамп потоком (ElementTree.iterparse): элементы ячеек
+освобождаются сразу после чтения. load_dump собирает ячейки в MemoryDump,
+поэтому расход памяти определяется количеством ячеек в дампе, а не
+размером файла; загрузка состояния машины (stateload) пишет ячейки прямо
+в память и не хранит их вовсе. Дамп может содержать
+несколько областей памяти.
+
+Смысл пропусков разреженного дампа (<gap>) зависит от режима области:
+в дампе nonzero это нулевые ячейки, а в дампе changed - ячейки, не
+изменившиеся после Memory.track_writes, значения которых в дампе нет.
+MemoryDump разворачивает нулевые пропуски при обращении к значениям,
+а для неизвестных ячеек требует исходный дамп (base); diff_dumps
+сравнивает плотные и разреженные дампы в любом сочетании, пропуская
+неизвестные ячейки.
+"""
+
+import xml.etree.ElementTree as ET
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+from .dumpformats import open_dump_input
+from .paged import PagedMemory
+
+
+def _to_signed32(value: int) -> int:
+    return value - 0x100000000 if value & 0x80000000 else value
+
+
+@dataclass
+class MemoryDump:
+    """Содержимое дампа памяти."""
+    regions: List[Tuple[int, int]] = field(default_factory=list)  # Области [start, end]
+    region_modes: List[Optional[str]] = field(default_factory=list)  # Режим каждой области
+    sparse: Optional[str] = None                          # Режим разреженного дампа
+    info: Dict[str, str] = field(default_factory=dict)    # Раздел system_info
+    registers: List[int] = field(default_factory=list)    # Беззнаковые значения
+    cells: Dict[int, int] = field(default_factory=dict)   # Адрес -> беззнаковое значение
+
+    @property
+    def start_address(self) -> int:
+        """Начальный адрес первой области дампа."""
+        return min(start for start, _ in self.regions)
+
+    @property
+    def end_address(self) -> int:
+        """Конечный адрес последней области дампа."""
+        return max(end for _, end in self.regions)
+
+    def __contains__(self, address: int) -> bool:
+        return any(start <= address <= end for start, end in self.regions)
+
+    def region_mode(self, number: int) -> Optional[str]:
+        """Режим разреженного дампа области с номером number (None - плотная)."""
+        return self.region_modes[number] if number < len(self.region_modes) else None
+
+    def _changed_regions(self) -> List[Tuple[int, int]]:
+        """Области дампа changed: значения пропусков в них неизвестны."""
+        return [region for number, region in enumerate(self.regions)
+                if self.region_mode(number) == 'changed']
+
+    def is_known(self, address: int) -> bool:
+        """Входит ли ячейка в дамп и известно ли ее значение."""
+        for number, (start, end) in enumerate(self.regions):
+            if start <= address <= end:
+                return self.region_mode(number) != 'changed' or address in self.cells
+        return False
+
+    def value(self, address: int) -> int:
+        """
+        Знаковое значение ячейки (пропуск дампа nonzero - ноль).
+
+        Raises:
+            ValueError: адрес вне областей дампа или значение неизвестно
+                        (пропуск дампа changed)
+        """
+        if address not in self:
+            raise ValueError(f"Адрес {address} вне областей дампа: "
+                             + ", ".join(f"[{start}, {end}]" for start, end in self.regions))
+        if not self.is_known(address):
+            raise ValueError(f"Значение ячейки {address} неизвестно: дамп changed содержит "
+                             f"только ячейки, измененные после track_writes")
+        return _to_signed32(self.cells.get(address, 0))
+
+    def _covers(self, start_addr: int, end_addr: int) -> bool:
+        """Известны ли все ячейки [start_addr, end_addr] (без областей changed)."""
+        address = start_addr
+        for number, (start, end) in sorted(enumerate(self.regions), key=lambda item: item[1]):
+            if start <= address <= end and self.region_mode(number) != 'changed':
+                address = end + 1
+        return address > end_addr
+
+    def _merged_cells(self, base: Optional['MemoryDump']) -> Iterator[Tuple[int, int]]:
+        """
+        Явно заданные ячейки дампа; для областей changed сначала
+        перечисляются ячейки исходного дампа base.
+        """
+        changed = self._changed_regions()
+        if changed and base is None:
+            raise ValueError("Дамп changed содержит только измененные ячейки: "
+                             "для остальных нужен исходный дамп")
+        for start, end in changed:
+            if not base._covers(start, end):
+                raise ValueError(f"Исходный дамп не содержит всех ячеек области [{start}, {end}]")
+            for address, unsigned in base.cells.items():
+                if start <= address <= end:
+                    yield address, unsigned
+        yield from self.cells.items()
+
+    def expand(self, base: Optional['MemoryDump'] = None) -> array:
+        """
+        Ячейки от start_address до end_address (беззнаковые); пропуски
+        дампа nonzero и промежутки между областями заполнены нулями.
+
+        Args:
+            base: исходный дамп (например, плотный дамп перед запуском) -
+                  источник неизменившихся ячеек областей changed
+
+        Raises:
+            ValueError: в дампе есть области changed, а base не задан
+                        или не содержит их ячеек
+        """
+        cells = array('I', bytes(4 * (self.end_address - self.start_address + 1)))
+        for address, unsigned in self._merged_cells(base):
+            cells[address - self.start_address] = unsigned
+        return cells
+
+    def to_memory(self, base: Optional['MemoryDump'] = None) -> PagedMemory:
+        """
+        Память с содержимым дампа: регистры, ячейки и статистика system_info.
+
+        Используется страничная память, поэтому размер памяти данных
+        (total_data_memory) не требует выделения всего адресного пространства.
+        Неизменившиеся ячейки областей changed берутся из base (см. expand).
+        """
+        end = self.end_address if self.regions else 0
+        data_size = int(self.info.get('total_data_memory', end + 1))
+        num_registers = int(self.info.get('num_registers', len(self.registers)))
+        memory = PagedMemory(data_size, num_registers)
+        for reg, unsigned in enumerate(self.registers):
+            memory.set_register_raw(reg, unsigned)
+        for address, unsigned in self._merged_cells(base):
+            memory.data_memory[address] = unsigned
+        memory.instructions_executed = int(self.info.get('instructions_executed', 0))
+        memory.memory_accesses = int(self.info.get('memory_accesses', 0))
+        return memory
+
+
+def iter_dump(file_path: str) -> Iterator[Tuple]:
+    """
+    Разбирает XML-дамп памяти потоком и перечисляет его содержимое:
+
+        ('region', start, end, sparse) - начало области data_memory
+        ('cell', address, unsigned)    - ячейка
+        ('gap', address, count)        - пропуск разреженного дампа
+        ('register', id, unsigned)     - регистр
+        ('info', tag, text)            - значение раздела system_info
+
+    Raises:
+        ValueError: файл не является дампом памяти
+    """
+    path: List[str] = []
+    data_element = None
+    with open_dump_input(file_path) as f:
+        try:
+            for event, element in ET.iterparse(f, events=('start', 'end')):
+                if event == 'start':
+                    path.append(element.tag)
+                    if len(path) == 1 and element.tag != 'memory_dump':
+                        raise ValueError(f"Файл не является дампом памяти: {file_path}")
+                    if element.tag == 'data_memory' and len(path) == 2:
+                        data_element = element
+                        yield ('region', int(element.get('start_address')),
+                               int(element.get('end_address')), element.get('sparse'))
+                    continue
+                path.pop()
+                if element.tag in ('cell', 'gap') and data_element is not None:
+                    if element.tag == 'cell':
+                        yield 'cell', int(element.get('address')), int(element.get('value_unsigned'))
+                    else:
+                        yield 'gap', int(element.get('address')), int(element.get('count'))
+                    data_element.remove(element)  # Элемент прочитан - освобождаем его
+                elif element.tag == 'register':
+                    yield 'register', int(element.get('id')), int(element.get('value_unsigned'))
+                elif len(path) == 2 and path[1] == 'system_info' and element.text is not None:
+                    yield 'info', element.tag, element.text
+        except ET.ParseError as e:
+            raise ValueError(f"Ошибка разбора дампа {file_path}: {e}")
+
+
+def load_dump(file_path: str) -> MemoryDump:
+    """
+    Загружает XML-дамп памяти (плотный или разреженный, в том числе сжатый).
+
+    Raises:
+        ValueError: файл не является дампом памяти
+    """
+    dump = MemoryDump()
+    registers: Dict[int, int] = {}
+    for kind, key, value, *rest in iter_dump(file_path):
+        if kind == 'cell':
+            dump.cells[key] = value
+        elif kind == 'region':
+            dump.regions.append((key, value))
+            dump.region_modes.append(rest[0])
+            dump.sparse = rest[0] or dump.sparse
+        elif kind == 'register':
+            registers[key] = value
+        elif kind == 'info':
+            dump.info[key] = value
+    dump.registers = [registers[reg] for reg in sorted(registers)]
+    return dump
+
+
+def diff_registers(old: MemoryDump, new: MemoryDump) -> List[Tuple[int, int, int]]:
+    """
+    Различающиеся регистры: (номер, старое, новое знаковые значения).
+
+    Если в одном из дампов нет раздела регистров (дамп --dump-select
+    memory), регистры не сравниваются и список пуст.
+    """
+    if not old.registers or not new.registers:
+        return []
+    count = max(len(old.registers), len(new.registers))
+    changes = []
+    for reg in range(count):
+        before = _to_signed32(old.registers[reg]) if reg < len(old.registers) else 0
+        after = _to_signed32(new.registers[reg]) if reg < len(new.registers) else 0
+        if before != after:
+            changes.append((reg, before, after))
+    return changes
+
+
+def diff_dumps(old: MemoryDump, new: MemoryDump) -> Iterator[Tuple[int, int, int]]:
+    """
+    Перечисляет различающиеся ячейки, входящие в области обоих дампов:
+    (адрес, старое, новое знаковые значения) по возрастанию адреса.
+
+    Перебираются только ячейки, записанные хотя бы в один из дампов,
+    поэтому сравнение разреженных дампов не разворачивает пропуски.
+    Ячейки с неизвестным значением (пропуски дампа changed) не сравниваются.
+    """
+    for address in sorted(set(old.cells) | set(new.cells)):
+        if old.is_known(address) and new.is_known(address):
+            before = old.cells.get(address, 0)
+            after = new.cells.get(address, 0)
+            if before != after:
+                yield address, _to_signed32(before), _to_signed32(after)
@@ -0,0 +1,259 @@
+"""
+Ансамблевое выполнение: одна программа над многими начальными состояниями.
+
+Регистры и память данных N потоков (lanes) хранятся в двумерных массивах
+numpy. Каждая инструкция декодируется один раз и выполняется сразу для
+всех потоков векторной операцией, поэтому время работы определяется длиной
+программы, а не произведением длины на число потоков.
+
+Семантика каждого потока совпадает с VirtualMachine.run: поток, в котором
+инструкция завершилась ошибкой, останавливается на ней (с тем же
+сообщением), остальные потоки продолжают выполнение.
+"""
+
+from typing import List, Optional
+from .alu import ALU
+from .memory import Memory, np, _require_numpy
+from .predecode import ProgramTable
+
+MASK32 = 0xFFFFFFFF
+
+
+class EnsembleVM:
+    """Виртуальная машина, выполняющая программу в N потоках данных."""
+
+    def __init__(self, lanes: int, data_memory_size: int = 65536, num_registers: int = 32):
+        """
+        Args:
+            lanes: количество потоков (начальных состояний)
+            data_memory_size: размер памяти данных каждого потока
+            num_registers: количество регистров каждого потока
+        """
+        _require_numpy()
+        if lanes <= 0:
+            raise ValueError(f"Количество потоков должно быть положительным: {lanes}")
+
+        self.lanes = lanes
+        self.data_size = data_memory_size
+        self.num_registers = num_registers
+        self.max_instructions = 100000  # Защита от бесконечного цикла (как в VirtualMachine)
+
+        # Беззнаковые 32-битные значения, строка - поток
+        self.data_memory = np.zeros((lanes, data_memory_size), dtype=np.uint32)
+        self.registers = np.zeros((lanes, num_registers), dtype=np.uint32)
+
+        # Флаги АЛУ по потокам
+        self.zero_flag = np.zeros(lanes, dtype=bool)
+        self.negative_flag = np.zeros(lanes, dtype=bool)
+        self.overflow_flag = np.zeros(lanes, dtype=bool)
+        self.carry_flag = np.zeros(lanes, dtype=bool)
+
+        # Счетчики по потокам
+        self.instructions_executed = np.zeros(lanes, dtype=np.int64)
+        self.memory_accesses = np.zeros(lanes, dtype=np.int64)
+
+        self.program_table: Optional[ProgramTable] = None
+        self.index = 0  # Номер следующей инструкции активных потоков
+        self.active = np.ones(lanes, dtype=bool)
+        self.fault_index = np.full(lanes, -1, dtype=np.int64)
+        self.errors: List[Optional[str]] = [None] * lanes
+
+    def load_program(self, program_data: bytes):
+        """Загружает и предекодирует программу."""
+        self.program_table = ProgramTable(bytes(program_data))
+        self.index = 0
+
+    def load_program_from_file(self, file_path: str):
+        """Загружает программу из бинарного файла."""
+        with open(file_path, 'rb') as f:
+            self.load_program(f.read())
+
+    def data_view(self, signed: bool = False):
+        """Память данных всех потоков (int32 или uint32, без копирования)."""
+        return self.data_memory.view(np.int32) if signed else self.data_memory
+
+    def registers_view(self, signed: bool = False):
+        """Регистры всех потоков (int32 или uint32, без копирования)."""
+        return self.registers.view(np.int32) if signed else self.registers
+
+    def ip(self, lane: int) -> int:
+        """IP потока: адрес следующей (или вызвавшей ошибку) инструкции."""
+        index = self.fault_index[lane] if self.fault_index[lane] >= 0 else self.index
+        return self.program_table.ip_at(int(index))
+
+    def _fault(self, lanes, message_for):
+        """Останавливает потоки lanes (массив номеров) с сообщениями об ошибке."""
+        for lane in lanes:
+            lane = int(lane)
+            self.errors[lane] = message_for(lane)
+            self.fault_index[lane] = self.index
+        self.active[lanes] = False
+
+    def run(self, max_steps: int = 0) -> int:
+        """
+        Выполняет программу во всех активных потоках.
+
+        Args:
+            max_steps: максимальное количество инструкций (0 - без ограничений)
+
+        Returns:
+            Количество выполненных шагов (инструкций программы)
+        """
+        table = self.program_table
+        if table is None:
+            raise ValueError("Программа не загружена")
+
+        limit = self.max_instructions + 1
+        if max_steps > 0:
+            limit = min(limit, max_steps)
+        end = min(len(table), self.index + limit)
+        start = self.index
+
+        while self.index < end and self.active.any():
+            self._step(table)
+            self.index += 1
+
+        # Недекодируемая инструкция в конце таблицы
+        if (self.index == len(table) and table.error_message is not None
+                and self.index - start < limit):
+            message = table.error_message
+            self._fault(np.flatnonzero(self.active), lambda lane: message)
+
+        return self.index - start
+
+    def _step(self, table: ProgramTable):
+        """Выполняет инструкцию self.index во всех активных потоках."""
+        index = self.index
+        opcode = table.opcodes[index]
+        arg0, arg1, arg2 = table.arg0[index], table.arg1[index], table.arg2[index]
+        regs = self.registers
+        data = self.data_memory
+        num_registers = self.num_registers
+        data_size = self.data_size
+
+        all_active = self.active.all()
+        lanes = slice(None) if all_active else np.flatnonzero(self.active)
+
+        if opcode == 158:  # LOAD_CONST
+            if not 0 <= arg1 < num_registers:
+                self._fault(np.flatnonzero(self.active),
+                            lambda lane: f"Номер регистра вне диапазона: {arg1}")
+                return
+            regs[lanes, arg1] = arg0 & MASK32
+
+        elif opcode == 17:  # READ_MEM
+            if not 0 <= arg0 < data_size:
+                self._fault(np.flatnonzero(self.active),
+                            lambda lane: f"Адрес памяти вне диапазона: {arg0}")
+                return
+            if not 0 <= arg1 < num_registers:
+                # Чтение памяти засчитывается до ошибки записи в регистр
+                self.memory_accesses[lanes] += 1
+                self._fault(np.flatnonzero(self.active),
+                            lambda lane: f"Номер регистра вне диапазона: {arg1}")
+                return
+            regs[lanes, arg1] = data[lanes, arg0]
+            self.memory_accesses[lanes] += 1
+
+        elif opcode == 12:  # WRITE_MEM
+            dest_reg, src_reg = arg0, arg1
+            if not 0 <= dest_reg < num_registers:
+                self._fault(np.flatnonzero(self.active),
+                            lambda lane: f"Номер регистра вне диапазона: {dest_reg}")
+                return
+            lane_ids = np.arange(self.lanes) if all_active else lanes
+            addresses = regs[lane_ids, dest_reg]
+            bad = addresses >= data_size  # Отрицательные адреса тоже велики как uint32
+            if bad.any():
+                self._fault(lane_ids[bad], lambda lane: self._write_error(int(regs[lane, dest_reg])))
+                lane_ids, addresses = lane_ids[~bad], addresses[~bad]
+            if not 0 <= src_reg < num_registers:
+                self._fault(lane_ids, lambda lane: f"Номер регистра вне диапазона: {src_reg}")
+                return
+            data[lane_ids, addresses] = regs[lane_ids, src_reg]
+            self.memory_accesses[lane_ids] += 1
+            self.instructions_executed[lane_ids] += 1
+            return
+
+        else:  # ABS
+            offset, base_reg, src_reg = arg0, arg1, arg2
+            if not 0 <= src_reg < num_registers:
+                self._fault(np.flatnonzero(self.active),
+                            lambda lane: f"Номер регистра вне диапазона: {src_reg}")
+                return
+            lane_ids = np.arange(self.lanes) if all_active else lanes
+            result, zero, negative, overflow = ALU.abs_vector(regs[lane_ids, src_reg].view(np.int32))
+
+            # Флаги устанавливаются до проверки базового регистра и адреса, как в execute_abs
+            self.zero_flag[lane_ids] = zero
+            self.negative_flag[lane_ids] = negative
+            self.overflow_flag[lane_ids] = overflow
+            self.carry_flag[lane_ids] = False
+
+            if not 0 <= base_reg < num_registers:
+                self._fault(lane_ids, lambda lane: f"Номер регистра вне диапазона: {base_reg}")
+                return
+            addresses = regs[lane_ids, base_reg].view(np.int32).astype(np.int64) + offset
+            bad = (addresses < 0) | (addresses >= data_size)
+            if bad.any():
+                self._fault(lane_ids[bad], lambda lane: self._abs_error(
+                    int(regs[lane, base_reg].view(np.int32)) + offset))
+                good = ~bad
+                lane_ids, addresses, result = lane_ids[good], addresses[good], result[good]
+            data[lane_ids, addresses] = result.view(np.uint32)
+            self.memory_accesses[lane_ids] += 1
+            self.instructions_executed[lane_ids] += 1
+            return
+
+        self.instructions_executed[lanes] += 1
+
+    @staticmethod
+    def _write_error(address: int) -> str:
+        """Сообщение об ошибке WRITE_MEM для беззнакового адреса из регистра."""
+        if address & 0x80000000:
+            return f"Адрес памяти не может быть отрицательным: {address - 0x100000000}"
+        return f"Адрес памяти вне диапазона: {address}"
+
+    def _abs_error(self, address: int) -> str:
+        """Сообщение об ошибке ABS для адреса назначения."""
+        if address < 0:
+            return f"Адрес памяти не может быть отрицательным: {address}"
+        return f"Адрес {address} вне диапазона памяти [0, {self.data_size-1}]"
+
+    def results(self) -> List[dict]:
+        """
+        Возвращает итоговое состояние каждого потока.
+
+        Returns:
+            Список словарей (по одному на поток): ip, ошибка, счетчики,
+            флаги АЛУ и знаковые значения регистров
+        """
+        registers = self.registers_view(signed=True)
+        return [{
+            'ip': self.ip(lane),
+            'error': self.errors[lane],
+            'instructions_executed': int(self.instructions_executed[lane]),
+            'memory_accesses': int(self.memory_accesses[lane]),
+            'flags': (bool(self.zero_flag[lane]), bool(self.negative_flag[lane]),
+                      bool(self.overflow_flag[lane]), bool(self.carry_flag[lane])),
+            'registers': [int(value) for value in registers[lane]],
+        } for lane in range(self.lanes)]
+
+    def lane_memory(self, lane: int) -> Memory:
+        """
+        Возвращает состояние потока в виде Memory (копия).
+
+        Полученный объект поддерживает все средства Memory, в том числе
+        dump_to_xml и print_status.
+        """
+        memory = Memory(self.data_size, self.num_registers)
+        memory.data_memory[:] = self.data_memory[lane]
+        memory.registers[:] = self.registers[lane]
+        memory.instructions_executed = int(self.instructions_executed[lane])
+        memory.memory_accesses = int(self.memory_accesses[lane])
+        return memory
+
+    def dump_lane(self, lane: int, start_addr: int = 0, end_addr: int = 100,
+                  file_path: str = "memory_dump.xml") -> str:
+        """Создает XML-дамп памяти потока lane."""
+        return self.lane_memory(lane).dump_to_xml(start_addr, end_addr, file_path)
@@ -0,0 +1,169 @@
+"""
+Слияние частых последовательностей инструкций в суперинструкции.
+
+Поиск выполняется по таблице предекодирования при построении шитого кода.
+Суперинструкция выполняется за одну диспетчеризацию, но сохраняет
+поведение каждой исходной инструкции: значения регистров и памяти, флаги
+АЛУ и счетчики (инструкции и обращения к памяти считаются по исходным
+инструкциям).
+"""
+
+from typing import Callable, List, Tuple
+from .predecode import ProgramTable
+
+MASK32 = 0xFFFFFFFF
+SIGN32 = 0x80000000
+WRAP32 = 0x100000000
+
+# Виды суперинструкций
+LOAD_STORE = 'LOAD_CONST+WRITE_MEM'
+READ_ABS = 'READ_MEM+ABS'
+LOAD_RUN = 'LOAD_CONST*'
+
+FUSION_KINDS = (LOAD_STORE, READ_ABS, LOAD_RUN)
+
+
+class FusedFault(ValueError):
+    """Ошибка внутри суперинструкции после выполнения ее начальной части."""
+
+    def __init__(self, message: str, completed: int):
+        super().__init__(message)
+        self.completed = completed  # Количество успешно выполненных инструкций
+
+
+def find_fusions(table: ProgramTable, data_size: int,
+                 num_registers: int) -> List[Tuple[int, int, str]]:
+    """
+    Находит последовательности инструкций для слияния.
+
+    Сливаются только инструкции с корректными номерами регистров и
+    статически корректными адресами, поэтому суперинструкция не может
+    завершиться ошибкой раньше, чем исходная последовательность.
+
+    Returns:
+        Список (номер первой инструкции, длина, вид суперинструкции)
+    """
+    opcodes, arg0, arg1, arg2 = table.opcodes, table.arg0, table.arg1, table.arg2
+    count = len(table)
+    fusions = []
+
+    index = 0
+    while index < count:
+        opcode = opcodes[index]
+
+        if opcode == 158:
+            # Серия LOAD_CONST с корректными регистрами
+            end = index
+            loaded = {}
+            while (end < count and opcodes[end] == 158
+                   and 0 <= arg1[end] < num_registers):
+                loaded[arg1[end]] = arg0[end]
+                end += 1
+
+            # Серия, за которой следует запись по загруженному адресу
+            if (end < count and end > index and opcodes[end] == 12
+                    and arg0[end] in loaded
+                    and 0 <= arg1[end] < num_registers
+                    and 0 <= loaded[arg0[end]] < data_size):
+                fusions.append((index, end - index + 1, LOAD_STORE))
+                index = end + 1
+                continue
+
+            if end - index >= 2:
+                fusions.append((index, end - index, LOAD_RUN))
+                index = end
+                continue
+
+        elif (opcode == 17 and index + 1 < count and opcodes[index + 1] == 214
+                and 0 <= arg0[index] < data_size and 0 <= arg1[index] < num_registers
+                and arg2[index + 1] == arg1[index]
+                and 0 <= arg1[index + 1] < num_registers):
+            fusions.append((index, 2, READ_ABS))
+            index += 2
+            continue
+
+        index += 1
+
+    return fusions
+
+
+def build_fused(vm, table: ProgramTable, index: int, length: int,
+                kind: str) -> Callable[[], None]:
+    """Строит обработчик суперинструкции."""
+    memory = vm.memory
+    alu = vm.alu
+    regs = memory.registers
+    data = memory.data_memory
+    data_size = memory.data_size
+    arg0, arg1, arg2 = table.arg0, table.arg1, table.arg2
+
+    if kind == LOAD_RUN or kind == LOAD_STORE:
+        loads = length if kind == LOAD_RUN else length - 1
+        # Повторная загрузка в тот же регистр перекрывает предыдущую
+        final = {}
+        for i in range(index, index + loads):
+            final[arg1[i]] = arg0[i] & MASK32
+        assignments = tuple(final.items())
+
+        if kind == LOAD_RUN:
+            if len(assignments) == 1:
+                (reg, value), = assignments
+
+                def op():
+                    regs[reg] = value
+                return op
+
+            def op():
+                for reg, value in assignments:
+                    regs[reg] = value
+            return op
+
+        store = index + loads
+        address = final[arg0[store]]
+        src_reg = arg1[store]
+        if len(assignments) == 1:
+            (reg, value), = assignments
+
+            def op():
+                regs[reg] = value
+                data[address] = regs[src_reg]
+            return op
+
+        def op():
+            for reg, value in assignments:
+                regs[reg] = value
+            data[address] = regs[src_reg]
+        return op
+
+    # READ_MEM + ABS
+    read_address, read_reg = arg0[index], arg1[index]
+    offset, base_reg = arg0[index + 1], arg1[index + 1]
+
+    def op():
+        value = data[read_address]
+        regs[read_reg] = value
+        if value & SIGN32:
+            if value == SIGN32:
+                result = 0x7FFFFFFF
+                alu.overflow_flag = True
+                alu.overflow_events += 1
+            else:
+                result = WRAP32 - value
+                alu.overflow_flag = False
+        else:
+            result = value
+            alu.overflow_flag = False
+        alu.zero_flag = result == 0
+        alu.negative_flag = False
+        alu.carry_flag = False
+
+        base = regs[base_reg]
+        if base & SIGN32:
+            base -= WRAP32
+        address = base + offset
+        if address < 0:
+            raise FusedFault(f"Адрес памяти не может быть отрицательным: {address}", 1)
+        if address >= data_size:
+            raise FusedFault(f"Адрес {address} вне диапазона памяти [0, {data_size-1}]", 1)
+        data[address] = result
+    return op
@@ -0,0 +1,119 @@
+"""
+Реестр обработчиков событий (hooks) виртуальной машины.
+
+Пока ни один обработчик не зарегистрирован, машина выполняет программу
+выбранным механизмом без каких-либо проверок. При наличии обработчиков
+используется интерпретирующий цикл, в котором каждая инструкция
+выполняется через обертку, вызывающую обработчики.
+
+События и аргументы обработчиков:
+    pre_instruction(vm, ip, opcode, args)  - перед выполнением инструкции
+    post_instruction(vm, ip, opcode, args) - после успешного выполнения
+    memory_read(vm, address, value)        - чтение памяти данных (READ_MEM)
+    memory_write(vm, address, value)       - запись в память (WRITE_MEM, ABS)
+    alu_flags(vm, alu)                     - АЛУ установило флаги (ABS)
+
+Значения передаются знаковыми. События памяти и флагов формируются для
+завершившихся без ошибки инструкций.
+"""
+
+from typing import Callable, Dict, List
+
+HOOK_EVENTS = ('pre_instruction', 'post_instruction', 'memory_read', 'memory_write', 'alu_flags')
+
+
+class HookRegistry:
+    """Реестр обработчиков событий."""
+
+    def __init__(self):
+        self._hooks: Dict[str, List[Callable]] = {event: [] for event in HOOK_EVENTS}
+
+    def _handlers(self, event: str) -> List[Callable]:
+        handlers = self._hooks.get(event)
+        if handlers is None:
+            raise ValueError(f"Неизвестное событие: {event}")
+        return handlers
+
+    def register(self, event: str, callback: Callable) -> Callable:
+        """Регистрирует обработчик события и возвращает его."""
+        self._handlers(event).append(callback)
+        return callback
+
+    def unregister(self, event: str, callback: Callable):
+        """Удаляет обработчик события."""
+        handlers = self._handlers(event)
+        if callback not in handlers:
+            raise ValueError(f"Обработчик не зарегистрирован для события {event}")
+        handlers.remove(callback)
+
+    def clear(self):
+        """Удаляет все обработчики."""
+        for handlers in self._hooks.values():
+            handlers.clear()
+
+    def has(self, event: str) -> bool:
+        """Есть ли обработчики события."""
+        return bool(self._handlers(event))
+
+    def __bool__(self) -> bool:
+        return any(self._hooks.values())
+
+    def hooked(self, vm, table, execute=None):
+        """
+        Возвращает функцию выполнения инструкции с номером index,
+        вызывающую зарегистрированные обработчики.
+
+        Args:
+            vm: виртуальная машина
+            table: таблица предекодированных инструкций
+            execute: внутренняя функция выполнения по номеру инструкции
+        """
+        opcodes, arg0, arg1, arg2 = table.opcodes, table.arg0, table.arg1, table.arg2
+        addresses = table.addresses
+        memory = vm.memory
+        alu = vm.alu
+        pre = self._hooks['pre_instruction']
+        post = self._hooks['post_instruction']
+        reads = self._hooks['memory_read']
+        writes = self._hooks['memory_write']
+        flags = self._hooks['alu_flags']
+        if execute is None:
+            execute_operation = vm.execute_operation
+
+            def execute(index: int):
+                execute_operation(opcodes[index], arg0[index], arg1[index], arg2[index])
+
+        def hooked_execute(index: int):
+            opcode = opcodes[index]
+            ip = addresses[index]
+            if opcode == 214:
+                args = (arg0[index], arg1[index], arg2[index])
+            else:
+                args = (arg0[index], arg1[index])
+            for hook in pre:
+                hook(vm, ip, opcode, args)
+
+            execute(index)
+
+            if opcode == 17:
+                if reads:
+                    value = memory.get_register(args[1])
+                    for hook in reads:
+                        hook(vm, args[0], value)
+            elif opcode == 12:
+                if writes:
+                    address = memory.get_register(args[0])
+                    value = memory.get_register(args[1])
+                    for hook in writes:
+                        hook(vm, address, value)
+            elif opcode == 214:
+                if writes:
+                    address = memory.get_register(args[1]) + args[0]
+                    value = memory.data_memory[address]  # abs не бывает отрицательным
+                    for hook in writes:
+                        hook(vm, address, value)
+                for hook in flags:
+                    hook(vm, alu)
+            for hook in post:
+                hook(vm, ip, opcode, args)
+        return hooked_execute
@@ -0,0 +1,107 @@
+"""
+Образ состояния, построенный частичным вычислением при ассемблировании.
+
+Формат (little-endian; образ записывается encode_state_image, его
+вызывает ассемблер в src/assembler/evaluator.py):
+    заголовок: b'UVMS', версия (u8), флаги АЛУ (u8), число регистров (u16),
+               выполнено инструкций (u64), обращений к памяти (u64)
+    регистры:  (номер u8, значение u32) * число регистров
+    память:    число участков (u32), затем для каждого участка
+               начальный адрес (u32), длина (u32), значения (u32 * длина)
+    остаток:   бинарный код команд до конца файла
+"""
+
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+STATE_IMAGE_MAGIC = b'UVMS'
+STATE_IMAGE_VERSION = 1
+_HEADER = struct.Struct('<4sBBHQQ')
+_REGISTER = struct.Struct('<BI')
+_RUN = struct.Struct('<II')
+_COUNT = struct.Struct('<I')
+
+FLAGS_PRESENT = 0x01
+FLAG_ZERO = 0x02
+FLAG_NEGATIVE = 0x04
+FLAG_OVERFLOW = 0x08
+FLAG_CARRY = 0x10
+
+
+@dataclass
+class StateImage:
+    """Разобранный образ состояния."""
+    instructions_executed: int
+    memory_accesses: int
+    registers: Dict[int, int] = field(default_factory=dict)
+    memory_runs: List[Tuple[int, List[int]]] = field(default_factory=list)
+    alu_flags: Optional[Tuple[bool, bool, bool, bool]] = None  # Z, N, V, C
+    code: bytes = b''  # Остаток программы
+
+
+def is_state_image(data: bytes) -> bool:
+    """Проверяет, является ли файл программы образом состояния."""
+    return data[:len(STATE_IMAGE_MAGIC)] == STATE_IMAGE_MAGIC
+
+
+def encode_state_image(image: StateImage) -> bytes:
+    """Кодирует образ состояния вместе с остатком программы (image.code)."""
+    flags = 0
+    if image.alu_flags is not None:
+        flags = FLAGS_PRESENT
+        for bit, value in zip((FLAG_ZERO, FLAG_NEGATIVE, FLAG_OVERFLOW, FLAG_CARRY),
+                              image.alu_flags):
+            if value:
+                flags |= bit
+
+    data = bytearray(_HEADER.pack(STATE_IMAGE_MAGIC, STATE_IMAGE_VERSION, flags,
+                                  len(image.registers), image.instructions_executed,
+                                  image.memory_accesses))
+    for reg in sorted(image.registers):
+        data += _REGISTER.pack(reg, image.registers[reg])
+
+    data += _COUNT.pack(len(image.memory_runs))
+    for start, values in image.memory_runs:
+        data += _RUN.pack(start, len(values))
+        data += struct.pack(f'<{len(values)}I', *values)
+
+    data += image.code
+    return bytes(data)
+
+
+def parse_state_image(data: bytes) -> StateImage:
+    """Разбирает образ состояния."""
+    try:
+        magic, version, flags, reg_count, instructions, accesses = \
+            _HEADER.unpack_from(data, 0)
+        if magic != STATE_IMAGE_MAGIC:
+            raise ValueError("Неверная сигнатура образа состояния")
+        if version != STATE_IMAGE_VERSION:
+            raise ValueError(f"Неподдерживаемая версия образа состояния: {version}")
+
+        offset = _HEADER.size
+        image = StateImage(instructions_executed=instructions, memory_accesses=accesses)
+
+        for _ in range(reg_count):
+            reg, value = _REGISTER.unpack_from(data, offset)
+            image.registers[reg] = value
+            offset += _REGISTER.size
+
+        run_count, = _COUNT.unpack_from(data, offset)
+        offset += _COUNT.size
+        for _ in range(run_count):
+            start, length = _RUN.unpack_from(data, offset)
+            offset += _RUN.size
+            values = list(struct.unpack_from(f'<{length}I', data, offset))
+            offset += 4 * length
+            image.memory_runs.append((start, values))
+
+    except struct.error as e:
+        raise ValueError(f"Образ состояния поврежден: {e}") from e
+
+    if flags & FLAGS_PRESENT:
+        image.alu_flags = tuple(bool(flags & bit) for bit in
+                                (FLAG_ZERO, FLAG_NEGATIVE, FLAG_OVERFLOW, FLAG_CARRY))
+    image.code = bytes(data[offset:])
+    return image
@@ -3,27 +3,93 @@
 """
 
 import sys
+from dataclasses import dataclass
 from pathlib import Path
-from .memory import Memory
-from .decoder import Decoder, DecodedInstruction
+from typing import Optional, Tuple
+from .memory import Memory, MemorySnapshot
+from .mapped import MappedMemory
+from .decoder import DecodedInstruction
+from .predecode import ProgramTable
+from .threaded import ThreadedProgram
+from .compiler import CompiledProgram, apply_abs_flags
 from .alu import ALU  # Импортируем АЛУ
+from .image import StateImage, is_state_image, parse_state_image
+from .counters import PerfCounters, class_time_ns
+from .profiler import Profiler
+from .hooks import HookRegistry
+from .snapshots import SnapshotStream
+from .trace import TraceWriter, Tracer, TRACE_EFFECTS, TRACE_FLAGS
+from .stateload import load_state
+
+@dataclass
+class MachineSnapshot:
+    """Снимок состояния виртуальной машины (см. VirtualMachine.snapshot)."""
+    ip: int
+    alu_flags: Tuple[bool, bool, bool, bool]
+    memory: MemorySnapshot
+    program_table: Optional[ProgramTable]
+
 
 class VirtualMachine:
     """Виртуальная машина УВМ."""
 
-    def __init__(self, data_memory_size: int = 65536, num_registers: int = 32):
+    # Доступные механизмы выполнения
+    ENGINES = ('interpret', 'threaded', 'compiled')
+
+    def __init__(self, data_memory_size: Optional[int] = None, num_registers: int = 32,
+                 engine: str = 'interpret', fuse: bool = False,
+                 memory: Optional[Memory] = None, memory_file: Optional[str] = None,
+                 counters: bool = False):
         """
         Инициализация виртуальной машины.
 
         Args:
-            data_memory_size: размер памяти данных
+            data_memory_size: размер памяти данных (None - 65536 ячеек, а для
+                              memory_file - по размеру существующего файла)
             num_registers: количество регистров
+            engine: механизм выполнения ('interpret' - интерпретация таблицы,
+                    'threaded' - шитый код из специализированных замыканий,
+                    'compiled' - компиляция программы в функции Python)
+            fuse: объединять частые последовательности инструкций
+                  в суперинструкции (только механизм 'threaded'). Построение
+                  шитого кода со слиянием примерно втрое дольше обычного,
+                  поэтому оно окупается на долгих или повторных запусках:
+                  построенный код сохраняется, пока не изменится программа
+            memory: готовая память (например, PagedMemory); если задана,
+                    data_memory_size и num_registers не используются
+            memory_file: файл, на который отображается память данных (mmap);
+                         память предыдущего запуска берется из этого файла
+            counters: вести счетчики производительности (заполняются после
+                      запуска; время по классам инструкций - только при
+                      включенном профилировщике)
         """
-        self.memory = Memory(data_memory_size, num_registers)
+        if engine not in self.ENGINES:
+            raise ValueError(f"Неизвестный механизм выполнения: {engine}")
+        if fuse and engine != 'threaded':
+            raise ValueError(f"Слияние инструкций доступно только для механизма threaded, "
+                             f"а не {engine}")
+
+        if memory is None and memory_file is not None:
+            memory = MappedMemory(memory_file, data_memory_size, num_registers)
+        if memory is None:
+            memory = Memory(65536 if data_memory_size is None else data_memory_size,
+                            num_registers)
+        self.memory = memory
         self.alu = ALU()  # Создаем экземпляр АЛУ
         self.ip = 0  # Instruction Pointer
         self.running = False
         self.max_instructions = 100000  # Защита от бесконечного цикла
+        self.program_table = None  # Предекодированная программа
+        self.engine = engine
+        self.fuse = fuse
+        self.threaded_program = None  # Программа для механизма 'threaded'
+        self.compiled_program = None  # Программа для механизма 'compiled'
+        self.state_image = None  # Примененный образ состояния (частичное вычисление)
+        self.counters = PerfCounters() if counters else None  # Счетчики производительности
+        self.profiler: Optional[Profiler] = None  # Профилировщик (выполнение интерпретатором)
+        self.hooks = HookRegistry()  # Обработчики событий (выполнение интерпретатором)
+        self.snapshots: Optional[SnapshotStream] = None  # Периодические снимки памяти
+        self._debug_tracer: Optional[Tracer] = None  # Вывод режима отладки во время run
 
         # Флаги для отладки
         self.debug = False
@@ -41,8 +107,17 @@ class VirtualMachine:
             with open(file_path, 'rb') as f:
                 program_data = f.read()
 
+            # Образ состояния: применяем вычисленное состояние,
+            # выполнять остается только остаток программы
+            self.state_image = None
+            if is_state_image(program_data):
+                image = parse_state_image(program_data)
+                self.apply_state_image(image)
+                program_data = image.code
+
             self.memory.load_program(program_data)
             self.ip = 0
+            self.program_table = self.get_program_table()
             print(f"Программа загружена из {file_path}")
             print(f"Размер программы: {len(program_data)} байт")
 
@@ -53,18 +128,67 @@ class VirtualMachine:
             print(f"Ошибка загрузки программы: {e}")
             sys.exit(1)
 
+    def apply_state_image(self, image: StateImage):
+        """
+        Применяет образ состояния, построенный при ассемблировании.
+
+        Вычисленные при ассемблировании инструкции добавляются к счетчику
+        instructions_executed, но не учитываются в max_steps и max_instructions.
+
+        Args:
+            image: разобранный образ состояния
+
+        Raises:
+            ValueError: образ построен для большей памяти данных или большего
+                        числа регистров (машина не изменяется)
+        """
+        data_size = max((start + len(values) for start, values in image.memory_runs), default=0)
+        if data_size > self.memory.data_size:
+            raise ValueError(f"Образ состояния построен для памяти данных не меньше {data_size} "
+                             f"ячеек, а у машины {self.memory.data_size}: ассемблируйте "
+                             f"программу с --fold --data-size {self.memory.data_size}")
+        num_registers = max(image.registers, default=-1) + 1
+        if num_registers > self.memory.num_registers:
+            raise ValueError(f"Образ состояния использует регистр R{num_registers - 1}, а у машины "
+                             f"{self.memory.num_registers} регистров: ассемблируйте программу "
+                             f"с --fold --registers {self.memory.num_registers}")
+        for reg, value in image.registers.items():
+            self.memory.set_register_raw(reg, value)
+        for start, values in image.memory_runs:
+            self.memory.load_block(start, values)
+        if image.alu_flags is not None:
+            (self.alu.zero_flag, self.alu.negative_flag,
+             self.alu.overflow_flag, self.alu.carry_flag) = image.alu_flags
+        self.memory.instructions_executed += image.instructions_executed
+        self.memory.memory_accesses += image.memory_accesses
+        self.state_image = image
+        print(f"Применен образ состояния: {image.instructions_executed} инструкций "
+              f"вычислено при ассемблировании")
+
+    def load_state(self, file_path: str, address: int = 0) -> int:
+        """
+        Загружает регистры и память данных из дампа предыдущего запуска
+        (форматы - см. stateload.load_state).
+
+        Args:
+            file_path: файл дампа
+            address: адрес первой ячейки для форматов raw и npy
+
+        Returns:
+            Количество загруженных ячеек
+        """
+        cells = load_state(self.memory, file_path, address)
+        print(f"Состояние загружено из {file_path}: {cells} ячеек")
+        return cells
+
     def execute_load_const(self, const: int, reg_addr: int):
         """Выполняет команду LOAD_CONST."""
         self.memory.set_register(reg_addr, const)
-        if self.debug:
-            print(f"  LOAD_CONST: R{reg_addr} = {const}")
 
     def execute_read_mem(self, mem_addr: int, reg_addr: int):
         """Выполняет команду READ_MEM."""
         value = self.memory.read_data(mem_addr)
         self.memory.set_register(reg_addr, value)
-        if self.debug:
-            print(f"  READ_MEM: R{reg_addr} = memory[{mem_addr}] = {value}")
 
     def execute_write_mem(self, reg_addr_dest: int, reg_addr_src: int):
         """Выполняет команду WRITE_MEM."""
@@ -77,8 +201,6 @@ class VirtualMachine:
 
         value = self.memory.get_register(reg_addr_src)
         self.memory.write_data(address, value)
-        if self.debug:
-            print(f"  WRITE_MEM: memory[{address}] = R{reg_addr_src} = {value}")
 
     def execute_abs(self, offset: int, base_reg: int, src_reg: int):
         """Выполняет команду ABS с использованием АЛУ."""
@@ -98,95 +220,402 @@ class VirtualMachine:
 
         if 0 <= address < self.memory.data_size:
             self.memory.write_data(address, abs_value)
-            if self.debug:
-                print(f"  ABS: memory[{address}] = abs(R{src_reg}) = {abs_value}")
-                if self.show_alu_flags:
-                    print(f"       Флаги АЛУ: {self.alu.get_status_string()}")
         else:
             raise ValueError(f"Адрес {address} вне диапазона памяти [0, {self.memory.data_size-1}]")
 
     def execute_instruction(self, instr: DecodedInstruction):
         """Выполняет одну инструкцию."""
-        if instr.opcode == 158:  # LOAD_CONST
-            self.execute_load_const(instr.args[0], instr.args[1])
-        elif instr.opcode == 17:  # READ_MEM
-            self.execute_read_mem(instr.args[0], instr.args[1])
-        elif instr.opcode == 12:  # WRITE_MEM
-            self.execute_write_mem(instr.args[0], instr.args[1])
-        elif instr.opcode == 214:  # ABS
-            self.execute_abs(instr.args[0], instr.args[1], instr.args[2])
+        self.execute_operation(instr.opcode, *instr.args)
+
+    def execute_operation(self, opcode: int, arg0: int, arg1: int, arg2: int = 0):
+        """Выполняет одну инструкцию, заданную кодом операции и аргументами."""
+        if opcode == 158:  # LOAD_CONST
+            self.execute_load_const(arg0, arg1)
+        elif opcode == 17:  # READ_MEM
+            self.execute_read_mem(arg0, arg1)
+        elif opcode == 12:  # WRITE_MEM
+            self.execute_write_mem(arg0, arg1)
+        elif opcode == 214:  # ABS
+            self.execute_abs(arg0, arg1, arg2)
         else:
-            raise ValueError(f"Неизвестный код операции: {instr.opcode}")
+            raise ValueError(f"Неизвестный код операции: {opcode}")
 
         self.memory.instructions_executed += 1
 
+    def get_program_table(self) -> ProgramTable:
+        """
+        Возвращает таблицу предекодированных инструкций для текущего IP.
+
+        Таблица строится при загрузке программы и перестраивается, только
+        если изменилось содержимое памяти команд или IP указывает не на
+        границу инструкции. Повторная загрузка той же программы (например,
+        машиной пула) сохраняет таблицу, а с ней и построенный по ней код
+        механизмов threaded и compiled.
+        """
+        table = self.program_table
+        if (table is None or table.source != self.memory.program_memory
+                or table.index_of(self.ip) is None):
+            table = ProgramTable(self.memory.program_memory, self.ip)
+            self.program_table = table
+        return table
+
+    def get_threaded_program(self, table: ProgramTable) -> ThreadedProgram:
+        """Возвращает (при необходимости строит) шитый код для таблицы."""
+        program = self.threaded_program
+        if program is None or not program.is_valid_for(self, table, self.fuse):
+            program = ThreadedProgram(self, table, self.fuse)
+            self.threaded_program = program
+            if program.fuse:
+                details = ", ".join(f"{kind}: {count}"
+                                    for kind, count in program.fusions.items())
+                print(f"Применено слияний инструкций: {program.fusions_applied} ({details})")
+        return program
+
+    def get_compiled_program(self, table: ProgramTable) -> CompiledProgram:
+        """Возвращает (при необходимости создает) компилируемую программу."""
+        program = self.compiled_program
+        if program is None or not program.is_valid_for(self, table):
+            program = CompiledProgram(self, table)
+            self.compiled_program = program
+        return program
+
     def run(self, max_steps: int = 0):
         """
         Запускает выполнение программы.
 
         Args:
-            max_steps: максимальное количество инструкций для выполнения (0 - без ограничений)
+            max_steps: максимальное количество инструкций для выполнения (0 - без ограничений;
+                       инструкции образа состояния не учитываются)
         """
         if not self.memory.program_memory:
-            print("Ошибка: программа не загружена")
+            if self.state_image is not None:
+                print("Программа полностью вычислена при ассемблировании")
+            else:
+                print("Ошибка: программа не загружена")
             return
 
         self.running = True
-        instructions_executed = 0
 
         print(f"\nЗапуск выполнения программы...")
         print(f"Начальный IP: 0x{self.ip:04X}")
 
-        while self.running and self.ip < len(self.memory.program_memory):
-            try:
-                # Декодируем инструкцию
-                instr = Decoder.decode_instruction(
-                    bytes(self.memory.program_memory),
-                    self.ip
-                )
+        table = self.get_program_table()
+        # Вывод режима отладки формирует трассировщик: строки копятся
+        # пакетами и записываются в стандартный вывод фоновым потоком
+        if self.debug:
+            level = TRACE_FLAGS if self.show_alu_flags else TRACE_EFFECTS
+            self._debug_tracer = Tracer(TraceWriter(), level)
+            self._debug_tracer.attach(self)
+        try:
+            # Отладочный и пошаговый режимы, профилирование и обработчики
+            # событий всегда используют интерпретатор
+            fast_path = (not self.step_by_step and self.profiler is None
+                         and not self.hooks)
+            if self.engine == 'threaded' and fast_path:
+                engine = self._run_threaded
+            elif self.engine == 'compiled' and fast_path:
+                engine = self._run_compiled
+            else:
+                engine = self._run_interpreted
+            if self.engine != 'interpret' and engine == self._run_interpreted:
+                print(f"Предупреждение: механизм {self.engine} не используется - отладочный "
+                      f"или пошаговый режим, профилирование и обработчики событий "
+                      f"выполняются интерпретатором")
+            start = table.index_of(self.ip)
+            overflow_events = self.alu.overflow_events
+            if self.counters is not None and self.profiler is not None:
+                time_before = class_time_ns(self.profiler)
+            if self.snapshots is not None:
+                instructions_executed = self._run_with_snapshots(engine, table, max_steps)
+            else:
+                instructions_executed = engine(table, max_steps)
+            if self.counters is not None and start is not None:
+                time_ns = None
+                if self.profiler is not None:
+                    time_ns = {name: cost - time_before[name]
+                               for name, cost in class_time_ns(self.profiler).items()}
+                self.counters.count_run(table, start, table.index_of(self.ip),
+                                        self.alu.overflow_events - overflow_events, time_ns)
+        finally:
+            if self._debug_tracer is not None:
+                self._debug_tracer.detach(self)
+                self._debug_tracer.writer.close()
+                self._debug_tracer = None
+
+        self.running = False
+        print(f"\nВыполнение завершено.")
+        print(f"Выполнено инструкций: {instructions_executed}")
+        print(f"Финальный IP: 0x{self.ip:04X}")
+
+        # Показываем флаги АЛУ, если нужно
+        if self.show_alu_flags:
+            print(f"Флаги АЛУ: {self.alu.get_status_string()}")
+    
+    def _flush_debug(self):
+        """Дописывает вывод режима отладки перед сообщением интерпретатора."""
+        if self._debug_tracer is not None:
+            self._debug_tracer.writer.flush()
+
+    def _run_with_snapshots(self, engine, table: ProgramTable, max_steps: int) -> int:
+        """
+        Выполняет программу участками между точками снимков (self.snapshots).
+
+        Программа выполняется линейно, поэтому каждый участок выполняется
+        выбранным механизмом целиком, а снимок делается на его границе.
+        """
+        stream = self.snapshots
+        index = table.index_of(self.ip)
+        if index is None:
+            return engine(table, max_steps)
+        if stream.is_ip_point(table, index):
+            stream.capture(self)
+        executed = 0
+        while True:
+            stop = stream.next_stop(table, index, executed)
+            executed = engine(table, max_steps, stop, executed)
+            index = table.index_of(self.ip)
+            if (stop is None or index != stop or not self.running
+                    or (max_steps > 0 and executed >= max_steps)
+                    or executed > self.max_instructions):
+                return executed
+            stream.capture(self)
+
+    def _run_interpreted(self, table: ProgramTable, max_steps: int,
+                         stop: Optional[int] = None, executed: int = 0) -> int:
+        """
+        Выполняет программу по таблице с диспетчеризацией по коду операции.
 
-                # Выводим информацию в режиме отладки
-                if self.debug:
-                    Decoder.print_instruction(instr, self.ip)
+        Args:
+            table: таблица предекодированных инструкций
+            max_steps: ограничение количества инструкций (0 - без ограничений)
+            stop: номер инструкции, перед которой выполнение приостанавливается
+            executed: инструкций, выполненных в этом запуске до продолжения
+
+        Returns:
+            Количество инструкций, выполненных в запуске (включая executed)
+        """
+        instructions_executed = executed
+        index = table.index_of(self.ip)
+        opcodes, arg0, arg1, arg2 = table.opcodes, table.arg0, table.arg1, table.arg2
+        next_ips = table.next_ips
+        decoded_count = len(table)
+        program_size = table.program_size
+        execute = self.profiler.profiled(self, table) if self.profiler is not None else None
+        if self.hooks:
+            execute = self.hooks.hooked(self, table, execute)
+
+        while self.running and self.ip < program_size:
+            if index == stop:
+                break  # Точка снимка: выполнение продолжит _run_with_snapshots
+            try:
+                # Инструкция не была декодирована при загрузке
+                if index >= decoded_count:
+                    raise ValueError(table.error_message)
 
                 # Выполняем инструкцию
-                self.execute_instruction(instr)
+                if execute is None:
+                    self.execute_operation(opcodes[index], arg0[index], arg1[index], arg2[index])
+                else:
+                    execute(index)
 
                 # Переходим к следующей инструкции
-                self.ip += instr.size
+                self.ip = next_ips[index]
+                index += 1
                 instructions_executed += 1
 
                 # Проверяем ограничение по шагам
                 if max_steps > 0 and instructions_executed >= max_steps:
+                    self._flush_debug()
                     print(f"\nДостигнут лимит инструкций: {max_steps}")
                     break
 
                 # Пошаговый режим
                 if self.step_by_step:
+                    self._flush_debug()
                     input("Нажмите Enter для следующей инструкции...")
 
                 # Защита от бесконечного цикла
                 if instructions_executed > self.max_instructions:
+                    self._flush_debug()
                     print(f"\nПревышен лимит инструкций: {self.max_instructions}")
                     break
 
             except (ValueError, IndexError) as e:
+                self._flush_debug()
                 print(f"\nОшибка выполнения инструкции по адресу 0x{self.ip:04X}: {e}")
                 break
             except KeyboardInterrupt:
+                self._flush_debug()
                 print("\nВыполнение прервано пользователем")
                 break
 
+        return instructions_executed
+
+    def _run_threaded(self, table: ProgramTable, max_steps: int,
+                      stop: Optional[int] = None, executed: int = 0) -> int:
+        """
+        Выполняет программу последовательным вызовом замыканий
+        (аргументы и результат - как у _run_interpreted).
+        """
+        program = self.get_threaded_program(table)
+        start = table.index_of(self.ip)
+        end = self._run_end(table, start, max_steps, stop, executed)
+
+        try:
+            index = program.execute(start, end)
+        except (ValueError, IndexError) as e:
+            self._finish_fast_run(program, start, program.fault_index)
+            print(f"\nОшибка выполнения инструкции по адресу 0x{self.ip:04X}: {e}")
+            return executed + program.fault_index - start
+        except KeyboardInterrupt:
+            self._finish_fast_run(program, start, program.fault_index)
+            print("\nВыполнение прервано пользователем")
+            return executed + program.fault_index - start
+
+        self._finish_fast_run(program, start, index)
+        self._report_run_end(table, index, executed + index - start, max_steps)
+        return executed + index - start
+
+    def _run_compiled(self, table: ProgramTable, max_steps: int,
+                      stop: Optional[int] = None, executed: int = 0) -> int:
+        """
+        Выполняет программу скомпилированными фрагментами
+        (аргументы и результат - как у _run_interpreted).
+        """
+        program = self.get_compiled_program(table)
+        start = table.index_of(self.ip)
+        end = self._run_end(table, start, max_steps, stop, executed)
+
+        index = start
+        try:
+            while index < end:
+                stop, last_abs = program.execute(self, index, end)
+                if last_abs is not None:
+                    apply_abs_flags(self.alu, last_abs)
+                self._finish_fast_run(program, index, stop)
+                index = stop
+                if index < end:
+                    # Инструкцию, которую фрагмент не выполнил, выполняет
+                    # интерпретатор: он же формирует ошибку выполнения.
+                    self.execute_operation(table.opcodes[index], table.arg0[index],
+                                           table.arg1[index], table.arg2[index])
+                    index += 1
+                    self.ip = table.ip_at(index)
+        except (ValueError, IndexError) as e:
+            print(f"\nОшибка выполнения инструкции по адресу 0x{self.ip:04X}: {e}")
+            return executed + index - start
+        except KeyboardInterrupt:
+            print("\nВыполнение прервано пользователем")
+            return executed + index - start
+
+        self._report_run_end(table, index, executed + index - start, max_steps)
+        return executed + index - start
+
+    def _run_end(self, table: ProgramTable, start: int, max_steps: int,
+                 stop: Optional[int] = None, executed: int = 0) -> int:
+        """
+        Номер инструкции, перед которой остановится выполнение.
+
+        Лимиты проверяются один раз: быстрые механизмы выполняют ровно
+        столько инструкций, сколько выполнил бы интерпретирующий цикл.
+        """
+        limit = self.max_instructions + 1 - executed
+        if max_steps > 0:
+            limit = min(limit, max_steps - executed)
+        end = min(len(table), start + limit)
+        return end if stop is None else min(end, stop)
+
+    def _report_run_end(self, table: ProgramTable, index: int,
+                        instructions_executed: int, max_steps: int):
+        """Выводит причину остановки быстрых механизмов выполнения."""
+        if max_steps > 0 and instructions_executed >= max_steps:
+            print(f"\nДостигнут лимит инструкций: {max_steps}")
+        elif instructions_executed > self.max_instructions:
+            print(f"\nПревышен лимит инструкций: {self.max_instructions}")
+        elif index == len(table) and table.error_message is not None:
+            print(f"\nОшибка выполнения инструкции по адресу 0x{self.ip:04X}: "
+                  f"{table.error_message}")
+
+    def _finish_fast_run(self, program, start: int, end: int):
+        """Переносит счетчики и IP после выполнения инструкций [start, end)."""
+        self.memory.instructions_executed += end - start
+        self.memory.memory_accesses += program.memory_accesses(start, end)
+        self.ip = program.table.ip_at(end)
+
+    def reset(self):
+        """
+        Возвращает машину в начальное состояние без создания новых объектов.
+
+        Память очищается на месте (страничная память освобождает только
+        выделенные страницы), построенный код механизмов выполнения
+        сохраняется и перестраивается, только если загружена другая программа.
+        """
+        self.memory.clear()
+        self.alu.reset_flags()
+        self.ip = 0
         self.running = False
-        print(f"\nВыполнение завершено.")
-        print(f"Выполнено инструкций: {instructions_executed}")
-        print(f"Финальный IP: 0x{self.ip:04X}")
+        self.max_instructions = 100000
+        self.state_image = None
+        self.debug = False
+        self.step_by_step = False
+        self.show_alu_flags = False
+        if self.counters is not None:
+            self.counters.reset()
+        self.profiler = None
+        self.hooks.clear()
+        self.snapshots = None
+
+    def snapshot(self) -> MachineSnapshot:
+        """
+        Создает снимок состояния: IP, регистры, память данных, флаги АЛУ и счетчики.
+
+        Страничная память (PagedMemory) разделяет страницы со снимком
+        и копирует их только при записи; плотная память копируется
+        одним копированием буфера.
+        """
+        alu = self.alu
+        return MachineSnapshot(self.ip,
+                               (alu.zero_flag, alu.negative_flag, alu.overflow_flag, alu.carry_flag),
+                               self.memory.snapshot(), self.program_table)
+
+    def restore(self, snapshot: MachineSnapshot):
+        """
+        Восстанавливает состояние из снимка.
+
+        Снимок можно восстанавливать многократно. Память восстанавливается
+        на месте, поэтому построенный шитый или скомпилированный код
+        продолжает использоваться.
+        """
+        self.memory.restore(snapshot.memory)
+        self.ip = snapshot.ip
+        (self.alu.zero_flag, self.alu.negative_flag,
+         self.alu.overflow_flag, self.alu.carry_flag) = snapshot.alu_flags
+        self.program_table = snapshot.program_table
+        self.running = False
+
+    def close(self):
+        """Освобождает ресурсы памяти (сбрасывает отображенную память в файл)."""
+        self.memory.close()
 
-        # Показываем флаги АЛУ, если нужно
-        if self.show_alu_flags:
-            print(f"Флаги АЛУ: {self.alu.get_status_string()}")
-    
     def dump_memory(self, start_addr: int = 0, end_addr: int = 100, 
-                   file_path: str = "memory_dump.xml"):
-        """Создает дамп памяти."""
-        self.memory.dump_to_xml(start_addr, end_addr, file_path)
\ No newline at end of file
+                   file_path: str = "memory_dump.xml", populated_only: bool = False,
+                   dump_format: str = 'xml', compression: Optional[str] = None,
+                   sparse: Optional[str] = None):
+        """Создает дамп памяти (форматы - см. Memory.dump)."""
+        self.dump_regions(file_path, [(start_addr, end_addr)], dump_format, compression,
+                          populated_only, sparse)
+
+    def dump_regions(self, file_path: str, regions, dump_format: str = 'xml',
+                     compression: Optional[str] = None, populated_only: bool = False,
+                     sparse: Optional[str] = None, select: str = 'all',
+                     split: bool = False, workers: int = 0, index: bool = False):
+        """
+        Создает дамп нескольких областей памяти за один проход (см. Memory.dump_regions).
+
+        Области ограничиваются размером памяти данных.
+        """
+        regions = [self.memory.clamp_range(start_addr, end_addr) for start_addr, end_addr in regions]
+        counters = self.counters.as_dict() if self.counters is not None else None
+        return self.memory.dump_regions(file_path, regions, dump_format, compression,
+                                        populated_only, counters, sparse, select, split,
+                                        workers, index)
\ No newline at end of file
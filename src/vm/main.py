@@ -2,10 +2,20 @@
 Главный модуль интерпретатора УВМ.
 """
 
+import os
 import sys
+import json
 import argparse
 from pathlib import Path
 from .interpreter import VirtualMachine
+from .paged import PagedMemory
+from .mapped import MappedMemory
+from .profiler import LineTable, Profiler
+from .trace import TraceWriter, Tracer, TRACE_EFFECTS, TRACE_FLAGS
+from .recorder import TraceRecorder
+from .snapshots import SnapshotStream
+from .dumpformats import DUMP_FORMATS, COMPRESSIONS, SPARSE_MODES, SPARSE_FORMATS, DUMP_SELECTIONS
+from .cliargs import parse_ip_range, parse_address_range
 
 def main():
     """Точка входа интерпретатора."""
@@ -25,70 +35,265 @@ def main():
                        help='Пошаговый режим выполнения')
     parser.add_argument('--max-steps', type=int, default=0,
                        help='Максимальное количество инструкций для выполнения')
-<<<<<<< HEAD
     parser.add_argument('--show-flags', action='store_true',
                        help='Показывать флаги АЛУ после выполнения команд')
+    parser.add_argument('--engine', choices=VirtualMachine.ENGINES, default='interpret',
+                       help='Механизм выполнения: interpret (по умолчанию), threaded или compiled')
 
-    args = parser.parse_args()
+    parser.add_argument('--fuse', action='store_true',
+                       help='Объединять частые последовательности инструкций в суперинструкции '
+                            '(только --engine threaded; построение кода дольше, выполнение '
+                            'быстрее - окупается на долгих программах)')
+
+    parser.add_argument('--paged', action='store_true',
+                       help='Страничная память данных на все 26-битное адресное пространство')
+    parser.add_argument('--memory-file',
+                       help='Файл, на который отображается память данных (mmap): '
+                            'память сохраняется между запусками')
+    parser.add_argument('--populated-only', action='store_true',
+                       help='Выводить в дамп только выделенные страницы памяти')
+    parser.add_argument('--dump-format', choices=DUMP_FORMATS, default='xml',
+                       help='Формат дампа памяти: xml, raw (слова little-endian), npy, '
+                            'csv или jsonl (по умолчанию: xml)')
+    parser.add_argument('--dump-compress', choices=COMPRESSIONS, default=None,
+                       help='Сжатие дампа памяти (по умолчанию - по расширению файла: .gz, .xz)')
+    parser.add_argument('--range', type=parse_address_range, action='append', default=[],
+                       metavar='START:END', dest='extra_ranges',
+                       help='Дополнительная область памяти для дампа (можно указать '
+                            'несколько раз); все области записываются за один проход')
+    parser.add_argument('--dump-select', choices=tuple(DUMP_SELECTIONS), default='all',
+                       help='Разделы дампа: all - все, registers - только регистры, '
+                            'memory - только память данных')
+    parser.add_argument('--split-dump', action='store_true',
+                       help='Записать каждую область в отдельный файл '
+                            '(dump.xml -> dump_НАЧАЛО_КОНЕЦ.xml)')
+    parser.add_argument('--dump-workers', type=int, default=1, metavar='N',
+                       help='Форматировать большие дампы (xml, csv, jsonl) в N процессах '
+                            '(0 - по числу процессоров; по умолчанию 1 - в одном процессе)')
+    parser.add_argument('--dump-index', action='store_true',
+                       help='Записать индекс дампа (<дамп>.idx) для чтения отдельных ячеек '
+                            '(только несжатый xml, см. run_dump_tool.py get)')
+    parser.add_argument('--sparse', choices=SPARSE_MODES, default=None,
+                       help='Разреженный дамп xml: только ненулевые ячейки (nonzero) или '
+                            'ячейки, измененные программой (changed); пропуски записываются '
+                            'элементами <gap>')
+
+    parser.add_argument('--counters', action='store_true',
+                       help='Вести счетчики производительности (выводятся в дамп XML; '
+                            'время по классам инструкций - вместе с --profile)')
+    parser.add_argument('--counters-json', metavar='FILE',
+                       help='Сохранить счетчики производительности в JSON '
+                            '(- для стандартного вывода); включает --counters')
+
+    parser.add_argument('--profile', action='store_true',
+                       help='Профилировать программу: время и количество выполнений '
+                            'по строкам исходного текста и кодам операций')
+    parser.add_argument('--line-table', metavar='FILE',
+                       help='Таблица строк ассемблера (по умолчанию <program_file>.lines, '
+                            'если файл существует)')
+    parser.add_argument('--profile-top', type=int, default=10, metavar='N',
+                       help='Количество позиций в отчете профилировщика (по умолчанию 10)')
+    parser.add_argument('--profile-folded', metavar='FILE',
+                       help='Сохранить профиль в формате свернутых стеков (flamegraph); '
+                            'включает --profile')
+
+    parser.add_argument('--trace', metavar='FILE',
+                       help='Буферизованная трассировка выполнения в файл '
+                            '(вместо вывода --debug на экран)')
+    parser.add_argument('--trace-level', type=int, choices=(1, 2, 3), default=None,
+                       help='Подробность трассировки: 1 - инструкции, 2 - и результаты '
+                            '(по умолчанию), 3 - и флаги АЛУ')
+    parser.add_argument('--trace-every', type=int, default=1, metavar='N',
+                       help='Трассировать каждую N-ю инструкцию')
+    parser.add_argument('--trace-ip-range', type=parse_ip_range, metavar='START:END',
+                       help='Трассировать только инструкции с IP в диапазоне')
+
+    parser.add_argument('--snapshots', metavar='FILE',
+                       help='Сохранять снимки памяти и регистров во время выполнения '
+                            '(читаются vm.snapshots.load_snapshots)')
+    parser.add_argument('--snapshot-every', type=int, default=0, metavar='N',
+                       help='Снимок после каждых N выполненных инструкций')
+    parser.add_argument('--snapshot-ip', type=lambda text: int(text, 0), action='append',
+                       default=[], metavar='IP',
+                       help='Снимок перед выполнением инструкции с этим IP (можно указать '
+                            'несколько раз)')
+    parser.add_argument('--snapshot-range', type=parse_address_range, action='append',
+                       default=[], metavar='START:END',
+                       help='Область памяти для снимков (по умолчанию - области дампа)')
+    parser.add_argument('--init-state', metavar='FILE',
+                       help='Загрузить регистры и память данных из дампа перед выполнением '
+                            '(xml, csv, jsonl, npy или raw, в том числе сжатые)')
+    parser.add_argument('--init-address', type=lambda text: int(text, 0), default=0,
+                       metavar='ADDR',
+                       help='Адрес первой ячейки для состояния в формате raw или npy')
+    parser.add_argument('--record', metavar='FILE',
+                       help='Записать трассу выполнения по столбцам в файл .npz '
+                            '(запросы: run_trace_query.py)')
 
-=======
-    
     args = parser.parse_args()
-    
->>>>>>> 6d0920bfa9dbf1a9f73e89d6b633ff350341a778
+
     # Проверяем существование файла программы
     program_path = Path(args.program_file)
     if not program_path.exists():
         print(f"Ошибка: файл программы не найден: {args.program_file}")
         sys.exit(1)
-<<<<<<< HEAD
 
-=======
-    
->>>>>>> 6d0920bfa9dbf1a9f73e89d6b633ff350341a778
     # Проверяем диапазон адресов
     if args.start_addr < 0:
         print(f"Ошибка: начальный адрес не может быть отрицательным: {args.start_addr}")
         sys.exit(1)
-<<<<<<< HEAD
 
     if args.end_addr < args.start_addr:
         print(f"Ошибка: конечный адрес должен быть >= начального: {args.end_addr} < {args.start_addr}")
         sys.exit(1)
 
-=======
-    
-    if args.end_addr < args.start_addr:
-        print(f"Ошибка: конечный адрес должен быть >= начального: {args.end_addr} < {args.start_addr}")
+    if (args.populated_only or args.sparse) and args.dump_format in ('raw', 'npy'):
+        option = '--sparse' if args.sparse else '--populated-only'
+        print(f"Ошибка: {option} нельзя использовать с форматом {args.dump_format}")
         sys.exit(1)
-    
->>>>>>> 6d0920bfa9dbf1a9f73e89d6b633ff350341a778
+
+    if args.sparse and args.dump_format not in SPARSE_FORMATS:
+        print(f"Ошибка: --sparse доступен только для формата xml: "
+              f"в {args.dump_format} пропуски не записываются")
+        sys.exit(1)
+
+    if args.extra_ranges and args.dump_format in ('raw', 'npy') and not args.split_dump:
+        print(f"Ошибка: формат {args.dump_format} хранит одну область: "
+              f"для нескольких областей укажите --split-dump")
+        sys.exit(1)
+
+    if args.fuse and args.engine != 'threaded':
+        print(f"Ошибка: --fuse доступен только для --engine threaded, а не {args.engine}")
+        sys.exit(1)
+
+    if args.dump_workers < 0:
+        print(f"Ошибка: количество процессов не может быть отрицательным: {args.dump_workers}")
+        sys.exit(1)
+
+    if args.dump_select == 'registers' and args.dump_format != 'xml':
+        print(f"Ошибка: формат {args.dump_format} содержит только память данных")
+        sys.exit(1)
+
+    if args.dump_index and (args.dump_format != 'xml' or args.dump_compress
+                            or args.dump_file.lower().endswith(('.gz', '.xz'))):
+        print("Ошибка: --dump-index доступен только для несжатого дампа xml")
+        sys.exit(1)
+
+    if args.paged and args.memory_file:
+        print("Ошибка: --paged и --memory-file нельзя использовать вместе")
+        sys.exit(1)
+
     # Создаем и настраиваем виртуальную машину
-    vm = VirtualMachine()
-    vm.debug = args.debug
+    memory = PagedMemory() if args.paged else None
+    if args.memory_file:
+        memory = MappedMemory(args.memory_file)
+    vm = VirtualMachine(engine=args.engine, fuse=args.fuse, memory=memory,
+                        counters=args.counters or args.counters_json is not None)
+    vm.debug = args.debug and not args.trace
     vm.step_by_step = args.step
-<<<<<<< HEAD
     vm.show_alu_flags = args.show_flags
-=======
->>>>>>> 6d0920bfa9dbf1a9f73e89d6b633ff350341a778
+    if args.profile or args.profile_folded:
+        line_table_path = args.line_table or str(program_path) + ".lines"
+        line_table = None
+        if args.line_table or Path(line_table_path).exists():
+            line_table = LineTable.load(line_table_path)
+        vm.profiler = Profiler(line_table)
+    tracer = None
+    if args.trace:
+        level = args.trace_level or (TRACE_FLAGS if args.show_flags else TRACE_EFFECTS)
+        try:
+            tracer = Tracer(TraceWriter(args.trace), level, args.trace_every, args.trace_ip_range)
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+            sys.exit(1)
+        tracer.attach(vm)
+    recorder = None
+    if args.record:
+        try:
+            recorder = TraceRecorder(args.record)
+        except (ImportError, OSError) as e:
+            print(f"Ошибка: {e}")
+            sys.exit(1)
+        recorder.attach(vm)
     
     print("=" * 60)
     print("УЧЕБНАЯ ВИРТУАЛЬНАЯ МАШИНА (УВМ) - ИНТЕРПРЕТАТОР")
     print("=" * 60)
     
-    # Загружаем программу
+    # Загружаем начальное состояние и программу (образ состояния программы
+    # применяется поверх загруженного дампа)
+    if args.init_state:
+        try:
+            vm.load_state(args.init_state, args.init_address)
+        except (ValueError, OSError) as e:
+            print(f"Ошибка загрузки состояния: {e}")
+            sys.exit(1)
     vm.load_program_from_file(args.program_file)
+
+    # Снимки подключаются после загрузки программы: IP снимков проверяются по ней
+    snapshots = None
+    if args.snapshots:
+        # Области дампа ограничиваются размером памяти, как в VirtualMachine.dump_regions
+        regions = args.snapshot_range or [
+            vm.memory.clamp_range(start_addr, end_addr)
+            for start_addr, end_addr in [(args.start_addr, args.end_addr)] + args.extra_ranges]
+        try:
+            snapshots = SnapshotStream(args.snapshots, regions, args.snapshot_every,
+                                       args.snapshot_ip)
+            snapshots.attach(vm)
+        except (ValueError, OSError) as e:
+            print(f"Ошибка: {e}")
+            sys.exit(1)
     
     # Запускаем выполнение
+    if args.sparse == 'changed':
+        vm.memory.track_writes()
     vm.run(max_steps=args.max_steps)
+    if tracer is not None:
+        tracer.writer.close()
+        print(f"Трассировка сохранена в {args.trace}: {tracer.instructions_traced} "
+              f"из {tracer.instructions_seen} инструкций")
+    if snapshots is not None:
+        snapshots.close()
+        print(f"Снимки памяти сохранены в {args.snapshots}: {snapshots.snapshots_written}")
+    if recorder is not None:
+        recorder.close()
+        print(f"Трасса выполнения сохранена в {args.record}: {recorder.rows_written} инструкций")
     
     # Создаем дамп памяти
-    vm.dump_memory(args.start_addr, args.end_addr, args.dump_file)
+    regions = [(args.start_addr, args.end_addr)] + args.extra_ranges
+    try:
+        dump_files = vm.dump_regions(args.dump_file, regions, args.dump_format, args.dump_compress,
+                                     args.populated_only, args.sparse, args.dump_select,
+                                     args.split_dump, args.dump_workers or os.cpu_count() or 1,
+                                     args.dump_index)
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+        sys.exit(1)
     
+    # Выводим профиль
+    if vm.profiler is not None:
+        print("\n" + vm.profiler.format_report(args.profile_top))
+        if args.profile_folded:
+            with open(args.profile_folded, 'w', encoding='utf-8') as f:
+                f.write(vm.profiler.folded())
+            print(f"Свернутые стеки профиля сохранены в {args.profile_folded}")
+
+    # Сохраняем счетчики производительности
+    if args.counters_json:
+        counters_json = json.dumps(vm.counters.as_dict(), indent=2)
+        if args.counters_json == '-':
+            print(counters_json)
+        else:
+            with open(args.counters_json, 'w', encoding='utf-8') as f:
+                f.write(counters_json + "\n")
+            print(f"Счетчики производительности сохранены в {args.counters_json}")
+
     # Выводим статус
     vm.memory.print_status()
+    vm.close()
     
-    print(f"\nДамп памяти сохранен в: {args.dump_file}")
+    print(f"\nДамп памяти сохранен в: {', '.join(dump_files)}")
     print("=" * 60)
 
 if __name__ == '__main__':
@@ -0,0 +1,87 @@
+"""
+Память данных, отображенная на файл (mmap).
+
+Файл хранит ячейки в том же формате, что и двоичный дамп памяти
+(Memory.dump_raw): 32-битные слова little-endian без заголовка. Поэтому
+виртуальная машина может продолжить работу с памятью предыдущего запуска
+без разбора XML, операционная система подгружает только затронутые
+страницы, а результаты остаются в файле после завершения процесса.
+"""
+
+import mmap
+import os
+import sys
+from typing import Optional
+from .memory import Memory
+
+
+class MappedMemory(Memory):
+    """Память УВМ с памятью данных, отображенной на файл."""
+
+    def __init__(self, file_path: str, data_size: Optional[int] = None,
+                 num_registers: int = 32):
+        """
+        Инициализация памяти.
+
+        Args:
+            file_path: путь к файлу памяти данных (создается при отсутствии)
+            data_size: размер памяти данных в ячейках; None - по размеру
+                       существующего файла (или 65536 для нового файла)
+            num_registers: количество регистров
+        """
+        if sys.byteorder != 'little':
+            raise ValueError("Отображение памяти на файл поддерживается только "
+                             "на платформах little-endian")
+
+        super().__init__(0, num_registers)
+
+        existing_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        if data_size is None:
+            data_size = existing_size // 4 if existing_size >= 4 else 65536
+        if data_size <= 0:
+            raise ValueError(f"Размер памяти данных должен быть положительным: {data_size}")
+
+        self.file_path = file_path
+        self.data_size = data_size
+
+        # Файл дополняется нулями до нужного размера; более длинный файл
+        # не усекается, отображается только его начало.
+        self._file = open(file_path, 'r+b' if existing_size else 'w+b')
+        if existing_size < 4 * data_size:
+            self._file.truncate(4 * data_size)
+        self._data_buffer = mmap.mmap(self._file.fileno(), 4 * data_size,
+                                      access=mmap.ACCESS_WRITE)
+        self.data_memory = memoryview(self._data_buffer).cast('I')
+        self._data_signed = memoryview(self._data_buffer).cast('i')
+
+    @property
+    def closed(self) -> bool:
+        """Отображение закрыто."""
+        return self._data_buffer is None
+
+    def flush(self):
+        """Сбрасывает измененные страницы памяти в файл."""
+        if self._data_buffer is not None:
+            self._data_buffer.flush()
+
+    def close(self):
+        """
+        Сбрасывает память в файл и закрывает отображение.
+
+        Перед закрытием должны быть освобождены все представления numpy,
+        полученные через data_view.
+        """
+        if self._data_buffer is None:
+            return
+        self._data_buffer.flush()
+        self.data_memory.release()
+        self._data_signed.release()
+        self._data_buffer.close()
+        self._file.close()
+        self._data_buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
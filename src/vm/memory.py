@@ -2,9 +2,73 @@
 Модель памяти виртуальной машины.
 """
 
-from typing import List, Optional
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
+import sys
+import ctypes
+from array import array
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+from .xmldump import write_xml_dump
+from .dumpindex import DumpIndexBuilder, index_path
+from .dumpformats import (DUMP_FORMATS, CONTIGUOUS_FORMATS, SPARSE_MODES, SPARSE_FORMATS,
+                          DUMP_SELECTIONS, CELLS_PER_BLOCK, detect_compression, open_dump_file,
+                          region_path, write_raw, write_npy, write_csv, write_jsonl)
+
+try:
+    import numpy as np
+except ImportError:  # numpy нужен только для представлений и блочного чтения
+    np = None
+
+def _require_numpy():
+    """Проверяет, что numpy установлен."""
+    if np is None:
+        raise ImportError("Для работы с представлениями памяти требуется пакет numpy")
+
+def _zero_fill(buffer: bytearray):
+    """Обнуляет буфер на месте одним вызовом memset."""
+    if len(buffer):
+        ctypes.memset((ctypes.c_char * len(buffer)).from_buffer(buffer), 0, len(buffer))
+
+def _cells_to_le_bytes(cells) -> bytes:
+    """Возвращает байты ячеек в порядке little-endian."""
+    if sys.byteorder == 'little':
+        return cells.tobytes()
+    swapped = array('I', cells.tobytes())
+    swapped.byteswap()
+    return swapped.tobytes()
+
+def _le_bytes_to_cells(data: bytes) -> array:
+    """Преобразует байты little-endian в массив ячеек."""
+    cells = array('I', data)
+    if sys.byteorder != 'little':
+        cells.byteswap()
+    return cells
+
+def _nonzero_cells(cells, first: int) -> Iterator[Tuple[int, int]]:
+    """Ненулевые ячейки блока cells (адрес, беззнаковое значение); first - адрес cells[0]."""
+    if np is not None:
+        values = np.frombuffer(cells, dtype=np.uint32)
+        indexes = np.flatnonzero(values)
+        return zip((indexes + first).tolist(), values[indexes].tolist())
+    return ((address, value) for address, value in enumerate(cells, first) if value)
+
+def _changed_cells(cells, base, first: int) -> Iterator[Tuple[int, int]]:
+    """Ячейки блока cells, отличающиеся от ячеек base того же размера."""
+    if np is not None:
+        values = np.frombuffer(cells, dtype=np.uint32)
+        indexes = np.flatnonzero(values != np.frombuffer(base, dtype=np.uint32))
+        return zip((indexes + first).tolist(), values[indexes].tolist())
+    return ((address, value) for address, (value, old) in enumerate(zip(cells, base), first)
+            if value != old)
+
+@dataclass
+class MemorySnapshot:
+    """Снимок состояния памяти (см. Memory.snapshot)."""
+    data: Any               # Содержимое памяти данных (формат зависит от вида памяти)
+    registers: bytes
+    program_memory: bytes
+    instructions_executed: int
+    memory_accesses: int
+
 
 class Memory:
     """Память виртуальной машины УВМ."""
@@ -17,9 +81,16 @@ class Memory:
             data_size: размер памяти данных
             num_registers: количество регистров
         """
-        self.data_memory = [0] * data_size  # Память данных
-        self.registers = [0] * num_registers  # Регистры
-        self.program_memory = []  # Память команд (будет загружена из файла)
+        # Ячейки хранятся в буферах по 4 байта (32 бита) на ячейку.
+        # data_memory и registers - беззнаковые представления буферов,
+        # знаковые представления позволяют читать без преобразования знака.
+        self._data_buffer = bytearray(4 * data_size)
+        self.data_memory = memoryview(self._data_buffer).cast('I')  # Память данных
+        self._data_signed = memoryview(self._data_buffer).cast('i')
+        self._register_buffer = bytearray(4 * num_registers)
+        self.registers = memoryview(self._register_buffer).cast('I')  # Регистры
+        self._registers_signed = memoryview(self._register_buffer).cast('i')
+        self.program_memory = b''  # Память команд (будет загружена из файла)
         
         # Счетчики
         self.data_size = data_size
@@ -28,6 +99,9 @@ class Memory:
         # Статистика
         self.instructions_executed = 0
         self.memory_accesses = 0
+
+        # Содержимое памяти данных на момент track_writes (для changed_cells)
+        self._write_baseline = None
     
     def _to_signed32(self, value: int) -> int:
         """Преобразует 32-битное беззнаковое число в знаковое."""
@@ -40,12 +114,46 @@ class Memory:
         return value & 0xFFFFFFFF
 
     def clear(self):
-        """Очищает память."""
-        self.data_memory = [0] * self.data_size
-        self.registers = [0] * self.num_registers
-        self.program_memory = []
+        """Очищает память (на месте: представления numpy остаются действительными)."""
+        _zero_fill(self._data_buffer)
+        _zero_fill(self._register_buffer)
+        self.program_memory = b''
         self.instructions_executed = 0
         self.memory_accesses = 0
+        self._write_baseline = None
+
+    def _snapshot_data(self):
+        """Копия памяти данных для снимка (одно копирование буфера)."""
+        return bytes(self._data_buffer)
+
+    def _restore_data(self, data):
+        """Восстанавливает память данных из снимка на месте."""
+        self._data_buffer[:] = data
+
+    def snapshot(self) -> MemorySnapshot:
+        """
+        Создает снимок памяти данных, регистров, программы и счетчиков.
+
+        Буферы не заменяются, поэтому после restore представления numpy
+        и построенные механизмы выполнения остаются действительными.
+        """
+        return MemorySnapshot(self._snapshot_data(), bytes(self._register_buffer),
+                              self.program_memory, self.instructions_executed,
+                              self.memory_accesses)
+
+    def restore(self, snapshot: MemorySnapshot):
+        """Восстанавливает память из снимка."""
+        self._restore_data(snapshot.data)
+        self._register_buffer[:] = snapshot.registers
+        self.program_memory = snapshot.program_memory
+        self.instructions_executed = snapshot.instructions_executed
+        self.memory_accesses = snapshot.memory_accesses
+
+    def flush(self):
+        """Сохраняет память во внешнее хранилище (для памяти в ОЗУ ничего не делает)."""
+
+    def close(self):
+        """Освобождает внешние ресурсы памяти (для памяти в ОЗУ ничего не делает)."""
 
     def load_program(self, program_data: bytes):
         """
@@ -54,14 +162,14 @@ class Memory:
         Args:
             program_data: бинарные данные программы
         """
-        self.program_memory = list(program_data)
+        self.program_memory = bytes(program_data)
         print(f"Загружено {len(program_data)} байт программы")
 
     def read_data(self, address: int) -> int:
         """Читает значение из памяти данных (возвращает знаковое число)."""
         if 0 <= address < self.data_size:
             self.memory_accesses += 1
-            return self._to_signed32(self.data_memory[address])
+            return self._data_signed[address]
         else:
             raise ValueError(f"Адрес памяти вне диапазона: {address}")
 
@@ -76,7 +184,7 @@ class Memory:
     def get_register(self, reg_num: int) -> int:
         """Читает значение из регистра (возвращает знаковое число)."""
         if 0 <= reg_num < self.num_registers:
-            return self._to_signed32(self.registers[reg_num])
+            return self._registers_signed[reg_num]
         else:
             raise ValueError(f"Номер регистра вне диапазона: {reg_num}")
 
@@ -101,8 +209,169 @@ class Memory:
         else:
             raise ValueError(f"Номер регистра вне диапазона: {reg_num}")
 
+    def data_view(self, signed: bool = False):
+        """
+        Возвращает представление numpy памяти данных без копирования.
+
+        Изменения в представлении сразу видны виртуальной машине и наоборот.
+
+        Args:
+            signed: True - значения int32, False - uint32
+        """
+        _require_numpy()
+        return np.frombuffer(self._data_buffer, dtype=np.int32 if signed else np.uint32)
+
+    def registers_view(self, signed: bool = False):
+        """
+        Возвращает представление numpy регистров без копирования.
+
+        Args:
+            signed: True - значения int32, False - uint32
+        """
+        _require_numpy()
+        return np.frombuffer(self._register_buffer, dtype=np.int32 if signed else np.uint32)
+
+    def _check_block(self, address: int, count: int):
+        """Проверяет, что блок [address, address + count) лежит в памяти данных."""
+        if count < 0 or address < 0 or address + count > self.data_size:
+            raise ValueError(f"Блок памяти вне диапазона: [{address}, {address + count})")
+
+    def load_block(self, address: int, values):
+        """
+        Записывает блок значений в память данных одной операцией.
+
+        Счетчик обращений к памяти не изменяется: это загрузка данных
+        со стороны хост-программы, а не обращения программы УВМ.
+
+        Args:
+            address: начальный адрес
+            values: массив numpy или последовательность целых
+                    (знаковых или беззнаковых 32-битных)
+        """
+        if np is not None and isinstance(values, np.ndarray):
+            self._check_block(address, len(values))
+            view = self.data_view()
+            view[address:address + len(values)] = values.astype(np.int64) & 0xFFFFFFFF
+            return
+
+        if isinstance(values, array) and values.typecode == 'I':
+            block = values
+        else:
+            block = array('I', [value & 0xFFFFFFFF for value in values])
+        self._check_block(address, len(block))
+        self.data_memory[address:address + len(block)] = block
+
+    def read_block(self, address: int, count: int, signed: bool = True):
+        """
+        Читает блок памяти данных одной операцией.
+
+        Args:
+            address: начальный адрес
+            count: количество ячеек
+            signed: True - значения int32, False - uint32
+
+        Returns:
+            Массив numpy (копия блока)
+        """
+        self._check_block(address, count)
+        return self.data_view(signed)[address:address + count].copy()
+
+    def to_bytes(self, start_addr: int = 0, end_addr: Optional[int] = None) -> bytes:
+        """
+        Возвращает ячейки [start_addr, end_addr] как 32-битные слова little-endian.
+
+        Байты берутся прямо из буфера памяти, без создания объектов на ячейку.
+        """
+        if end_addr is None:
+            end_addr = self.data_size - 1
+        self._check_block(start_addr, end_addr - start_addr + 1)
+        return _cells_to_le_bytes(self.data_memory[start_addr:end_addr + 1])
+
+    def load_bytes(self, data: bytes, address: int = 0):
+        """
+        Загружает в память данных 32-битные слова little-endian.
+
+        Args:
+            data: байты (длина кратна 4)
+            address: адрес первой ячейки
+        """
+        if len(data) % 4:
+            raise ValueError(f"Размер двоичного образа памяти не кратен 4 байтам: {len(data)}")
+        cells = _le_bytes_to_cells(data)
+        self._check_block(address, len(cells))
+        self.data_memory[address:address + len(cells)] = cells
+
+    def dump_raw(self, file_path: str, start_addr: int = 0,
+                 end_addr: Optional[int] = None):
+        """
+        Сохраняет ячейки [start_addr, end_addr] в двоичный файл
+        (32-битные слова little-endian, без заголовка).
+        """
+        with open(file_path, 'wb') as f:
+            f.write(self.to_bytes(start_addr, end_addr))
+        print(f"Двоичный дамп памяти сохранен в {file_path}")
+
+    def populated_ranges(self, start_addr: int, end_addr: int) -> Iterator[Tuple[int, int]]:
+        """
+        Перечисляет участки [first, last] диапазона, хранящиеся в памяти.
+
+        Плотная память хранит все ячейки, поэтому участок один.
+        """
+        yield start_addr, end_addr
+
+    def nonzero_cells(self, start_addr: int, end_addr: int) -> Iterator[Tuple[int, int]]:
+        """Перечисляет ненулевые ячейки диапазона: (адрес, беззнаковое значение)."""
+        for first, last in self.populated_ranges(start_addr, end_addr):
+            for block in range(first, last + 1, CELLS_PER_BLOCK):
+                stop = min(block + CELLS_PER_BLOCK, last + 1)
+                yield from _nonzero_cells(self.data_memory[block:stop], block)
+
+    def track_writes(self):
+        """
+        Начинает отслеживание записей: запоминает текущее содержимое памяти
+        данных, с которым затем сравнивает changed_cells.
+
+        Механизмы выполнения пишут в память напрямую, поэтому записи не
+        перехватываются: измененными считаются ячейки, значение которых
+        отличается от запомненного.
+        """
+        self._write_baseline = self._snapshot_data()
+
+    def _require_baseline(self):
+        if self._write_baseline is None:
+            raise ValueError("Отслеживание записей не включено: вызовите track_writes")
+        return self._write_baseline
+
+    def changed_cells(self, start_addr: int, end_addr: int) -> Iterator[Tuple[int, int]]:
+        """Перечисляет ячейки диапазона, измененные после track_writes."""
+        base = memoryview(self._require_baseline()).cast('I')
+        for block in range(start_addr, end_addr + 1, CELLS_PER_BLOCK):
+            stop = min(block + CELLS_PER_BLOCK, end_addr + 1)
+            yield from _changed_cells(self.data_memory[block:stop], base[block:stop], block)
+
+    def _sparse_cells(self, sparse: str, start_addr: int, end_addr: int) -> Iterator[Tuple[int, int]]:
+        """Ячейки разреженного дампа в режиме sparse."""
+        if sparse == 'nonzero':
+            return self.nonzero_cells(start_addr, end_addr)
+        if sparse == 'changed':
+            self._require_baseline()
+            return self.changed_cells(start_addr, end_addr)
+        raise ValueError(f"Неизвестный режим разреженного дампа: {sparse}")
+
+    def clamp_range(self, start_addr: int, end_addr: Optional[int]) -> Tuple[int, int]:
+        """Ограничивает диапазон адресов размером памяти (None - до конца памяти)."""
+        if end_addr is None:
+            end_addr = self.data_size - 1
+        start_addr = max(0, min(start_addr, self.data_size - 1))
+        end_addr = max(start_addr, min(end_addr, self.data_size - 1))
+        return start_addr, end_addr
+
     def dump_to_xml(self, start_addr: int = 0, end_addr: Optional[int] = None,
-                   file_path: str = "memory_dump.xml") -> str:
+                   file_path: str = "memory_dump.xml",
+                   populated_only: bool = False,
+                   counters: Optional[dict] = None,
+                   compression: Optional[str] = None,
+                   sparse: Optional[str] = None) -> str:
         """
         Создает дамп памяти в формате XML.
 
@@ -110,65 +379,155 @@ class Memory:
             start_addr: начальный адрес для дампа
             end_addr: конечный адрес для дампа (None - до конца памяти)
             file_path: путь к файлу для сохранения
+            populated_only: выводить только ячейки из populated_ranges
+                            (для страничной памяти - только выделенные страницы)
+            counters: счетчики производительности (PerfCounters.as_dict)
+                      для раздела system_info
+            compression: 'gzip', 'xz' или None (по расширению файла)
+            sparse: разреженный дамп - только ненулевые ('nonzero') или
+                    измененные после track_writes ('changed') ячейки
+
+        Returns:
+            Путь к файлу дампа
+        """
+        start_addr, end_addr = self.clamp_range(start_addr, end_addr)
+        self.dump_regions(file_path, [(start_addr, end_addr)], 'xml', compression,
+                          populated_only, counters, sparse)
+        return file_path
+
+    def dump(self, file_path: str, start_addr: int = 0, end_addr: Optional[int] = None,
+             dump_format: str = 'xml', compression: Optional[str] = None,
+             populated_only: bool = False, counters: Optional[dict] = None,
+             sparse: Optional[str] = None) -> str:
+        """
+        Создает дамп диапазона памяти данных в выбранном формате.
+
+        Args:
+            file_path: путь к файлу дампа
+            start_addr: начальный адрес
+            end_addr: конечный адрес (None - до конца памяти)
+            остальные - как в dump_regions
 
         Returns:
-            XML-строка с дампом памяти
+            Путь к файлу дампа
         """
         if end_addr is None:
             end_addr = self.data_size - 1
+        return self.dump_regions(file_path, [(start_addr, end_addr)], dump_format, compression,
+                                 populated_only, counters, sparse)[0]
 
-        # Ограничиваем диапазон
-        start_addr = max(0, min(start_addr, self.data_size - 1))
-        end_addr = max(start_addr, min(end_addr, self.data_size - 1))
+    def _region_source(self, start_addr: int, end_addr: int, populated_only: bool,
+                       sparse: Optional[str]) -> Iterable:
+        """Участки или ячейки (для разреженного дампа) одной области дампа."""
+        if sparse:
+            return self._sparse_cells(sparse, start_addr, end_addr)
+        if populated_only:
+            return self.populated_ranges(start_addr, end_addr)
+        return [(start_addr, end_addr)]
 
-        # Создаем XML структуру
-        root = ET.Element("memory_dump")
+    def dump_regions(self, file_path: str, regions: List[Tuple[int, int]],
+                     dump_format: str = 'xml', compression: Optional[str] = None,
+                     populated_only: bool = False, counters: Optional[dict] = None,
+                     sparse: Optional[str] = None, select: str = 'all',
+                     split: bool = False, workers: int = 0, index: bool = False) -> List[str]:
+        """
+        Создает дамп нескольких областей памяти данных за один проход.
 
-        # Добавляем информацию о системе
-        info = ET.SubElement(root, "system_info")
-        ET.SubElement(info, "total_data_memory").text = str(self.data_size)
-        ET.SubElement(info, "num_registers").text = str(self.num_registers)
-        ET.SubElement(info, "instructions_executed").text = str(self.instructions_executed)
-        ET.SubElement(info, "memory_accesses").text = str(self.memory_accesses)
+        Args:
+            file_path: путь к файлу дампа; при split - образец имени файлов
+                       областей (dump.xml -> dump_100_199.xml, см. region_path)
+            regions: области [start_addr, end_addr]
+            dump_format: формат из DUMP_FORMATS (xml, raw, npy, csv, jsonl)
+            compression: 'gzip', 'xz' или None (по расширению файла)
+            populated_only: выводить только ячейки из populated_ranges
+                            (для форматов xml, csv и jsonl)
+            counters: счетчики производительности (только для xml)
+            sparse: режим разреженного дампа из SPARSE_MODES
+                    (только для формата xml)
+            select: выводимые разделы из DUMP_SELECTIONS: all, registers
+                    (только регистры) или memory (только память данных)
+            split: записать каждую область в отдельный файл
+            workers: количество процессов для форматирования больших плотных
+                     дампов xml, csv и jsonl (0 или 1 - последовательно)
+            index: записать рядом с каждым файлом индекс для чтения ячеек
+                   без разбора дампа (только несжатый xml, см. dumpindex)
 
-        # Добавляем регистры
-        registers_elem = ET.SubElement(root, "registers")
-        for i in range(self.num_registers):
-            reg_elem = ET.SubElement(registers_elem, "register")
-            reg_elem.set("id", str(i))
-            signed_val = self.get_register(i)
-            unsigned_val = self.registers[i]
-            reg_elem.set("value_signed", str(signed_val))
-            reg_elem.set("value_unsigned", str(unsigned_val))
-            reg_elem.set("value_hex", f"0x{unsigned_val:08X}")
-
-        # Добавляем память данных
-        memory_elem = ET.SubElement(root, "data_memory")
-        memory_elem.set("start_address", str(start_addr))
-        memory_elem.set("end_address", str(end_addr))
-
-        for addr in range(start_addr, end_addr + 1):
-            cell_elem = ET.SubElement(memory_elem, "cell")
-            cell_elem.set("address", str(addr))
-            signed_val = self.read_data(addr)
-            unsigned_val = self.data_memory[addr]
-            cell_elem.set("value_signed", str(signed_val))
-            cell_elem.set("value_unsigned", str(unsigned_val))
-            cell_elem.set("value_hex", f"0x{unsigned_val:08X}")
-
-        # Форматируем XML
-        xml_str = ET.tostring(root, encoding='unicode')
-
-        # Используем minidom для красивого форматирования
-        dom = minidom.parseString(xml_str)
-        pretty_xml = dom.toprettyxml(indent="  ")
-
-        # Сохраняем в файл
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(pretty_xml)
-
-        print(f"Дамп памяти сохранен в {file_path}")
-        return pretty_xml
+        Returns:
+            Пути к файлам дампа
+        """
+        if dump_format not in DUMP_FORMATS:
+            raise ValueError(f"Неизвестный формат дампа: {dump_format}")
+        if sparse is not None and sparse not in SPARSE_MODES:
+            raise ValueError(f"Неизвестный режим разреженного дампа: {sparse}")
+        if select not in DUMP_SELECTIONS:
+            raise ValueError(f"Неизвестный выбор разделов дампа: {select}")
+        sections = DUMP_SELECTIONS[select]
+        if 'memory' not in sections:
+            regions = []
+        elif not regions:
+            raise ValueError("Не заданы области памяти для дампа")
+        for start_addr, end_addr in regions:
+            self._check_block(start_addr, end_addr - start_addr + 1)
+
+        if dump_format != 'xml' and 'memory' not in sections:
+            raise ValueError(f"Формат {dump_format} содержит только память данных")
+        if dump_format in CONTIGUOUS_FORMATS:
+            if populated_only or sparse:
+                raise ValueError(f"Формат {dump_format} хранит непрерывный диапазон: "
+                                 f"разреженный дамп и вывод только выделенных страниц недоступны")
+            if len(regions) > 1 and not split:
+                raise ValueError(f"Формат {dump_format} хранит одну область: "
+                                 f"для нескольких областей используйте отдельные файлы")
+        if sparse and dump_format not in SPARSE_FORMATS:
+            raise ValueError(f"Разреженный дамп доступен только для формата xml: "
+                             f"в {dump_format} пропуски не записываются")
+
+        compression = compression or detect_compression(file_path)
+        if index and (dump_format != 'xml' or compression):
+            raise ValueError("Индекс дампа доступен только для несжатого формата xml")
+        if index and any(start_addr <= previous_end for (_, previous_end), (start_addr, _)
+                         in zip(regions, regions[1:])):
+            raise ValueError("Для индекса дампа области должны идти по возрастанию адресов "
+                             "и не пересекаться")
+
+        if split and len(regions) > 1:
+            targets = [(region_path(file_path, start_addr, end_addr), [(start_addr, end_addr)])
+                       for start_addr, end_addr in regions]
+        else:
+            targets = [(file_path, regions)]
+        binary = dump_format in CONTIGUOUS_FORMATS
+
+        for path, target_regions in targets:
+            sources = [(start_addr, end_addr,
+                        self._region_source(start_addr, end_addr, populated_only, sparse))
+                       for start_addr, end_addr in target_regions]
+            # Записываем дамп в файл потоком, без построения дерева элементов
+            with open_dump_file(path, binary, compression) as f:
+                builder = None
+                if dump_format == 'xml':
+                    builder = DumpIndexBuilder(f.write) if index else None
+                    cells_written = write_xml_dump(self, f, sources, counters, sparse, sections,
+                                                   workers, builder)
+                elif dump_format == 'raw':
+                    cells_written = write_raw(self, f, *target_regions[0])
+                elif dump_format == 'npy':
+                    cells_written = write_npy(self, f, *target_regions[0])
+                elif dump_format == 'csv':
+                    cells_written = write_csv(self, f, sources, workers)
+                else:
+                    cells_written = write_jsonl(self, f, sources, workers)
+            # Каждая ячейка дампа любого формата учитывается как обращение
+            # к памяти (как чтение read_data)
+            self.memory_accesses += cells_written
+
+            if dump_format == 'xml':
+                print(f"Дамп памяти сохранен в {path}")
+                if builder is not None:
+                    builder.save(index_path(path))
+                    print(f"Индекс дампа сохранен в {index_path(path)}")
+            else:
+                print(f"Дамп памяти ({dump_format}) сохранен в {path}")
+        return [path for path, _ in targets]
 
     def print_status(self):
         """Выводит статус памяти и регистров."""
@@ -0,0 +1,285 @@
+"""
+Страничная разреженная память данных.
+
+READ_MEM адресует 26 бит (до 64M ячеек), но большинство программ
+использует лишь небольшую часть адресного пространства. Страничная память
+выделяет страницы фиксированного размера только при первой записи
+ненулевого значения; чтение из невыделенной страницы возвращает ноль.
+
+Страницы разделяются со снимками памяти (copy-on-write): снимок хранит
+ссылки на страницы, а первая запись в разделяемую страницу копирует ее.
+Восстановление снимка возвращает только страницы, измененные после него.
+По тем же ссылкам changed_cells находит измененные после track_writes
+ячейки, сравнивая только скопированные или выделенные страницы.
+"""
+
+from array import array
+from typing import Dict, Iterator, Optional, Set, Tuple
+from .memory import Memory, np, _require_numpy, _changed_cells
+
+# Полное адресное пространство READ_MEM (26 бит)
+FULL_ADDRESS_SPACE = 1 << 26
+
+PAGE_SHIFT = 12
+PAGE_SIZE = 1 << PAGE_SHIFT  # Ячеек на странице
+PAGE_MASK = PAGE_SIZE - 1
+
+
+class PagedStore:
+    """
+    Последовательность ячеек, хранящаяся по страницам.
+
+    Поддерживает тот же доступ по индексу и срезу, что и плотная память
+    (memoryview формата 'I'), поэтому механизмы выполнения работают с ней
+    без изменений.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.pages: Dict[int, memoryview] = {}  # Номер страницы -> ячейки страницы
+        # Страницы, которые можно изменять на месте (не разделяются со снимками)
+        self._writable: Dict[int, memoryview] = {}
+        # Страницы, выделенные или скопированные после последнего снимка
+        self.dirty: Set[int] = set()
+        self._base: Optional[Dict[int, memoryview]] = None  # Последний снимок
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _page_for_write(self, page_no: int) -> memoryview:
+        """Возвращает страницу для записи, выделяя или копируя ее при необходимости."""
+        page = self._writable.get(page_no)
+        if page is None:
+            shared = self.pages.get(page_no)
+            if shared is None:
+                page = memoryview(bytearray(4 * PAGE_SIZE)).cast('I')
+            else:
+                page = memoryview(bytearray(shared)).cast('I')  # Копирование при записи
+            self.pages[page_no] = page
+            self._writable[page_no] = page
+            self.dirty.add(page_no)
+        return page
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._get_slice(index)
+        if not 0 <= index < self.size:
+            raise IndexError(f"Индекс ячейки вне диапазона: {index}")
+        page = self.pages.get(index >> PAGE_SHIFT)
+        if page is None:
+            return 0
+        return page[index & PAGE_MASK]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._set_slice(index, value)
+            return
+        if not 0 <= index < self.size:
+            raise IndexError(f"Индекс ячейки вне диапазона: {index}")
+        page = self._writable.get(index >> PAGE_SHIFT)
+        if page is None:
+            if not value and index >> PAGE_SHIFT not in self.pages:
+                return  # Запись нуля в невыделенную страницу ничего не меняет
+            page = self._page_for_write(index >> PAGE_SHIFT)
+        page[index & PAGE_MASK] = value
+
+    def _slice_bounds(self, index: slice) -> Tuple[int, int]:
+        start, stop, step = index.indices(self.size)
+        if step != 1:
+            raise ValueError("Страничная память поддерживает только срезы с шагом 1")
+        return start, max(start, stop)
+
+    def _get_slice(self, index: slice) -> array:
+        start, stop = self._slice_bounds(index)
+        result = bytearray(4 * (stop - start))
+        address = start
+        while address < stop:
+            page_no = address >> PAGE_SHIFT
+            offset = address & PAGE_MASK
+            count = min(PAGE_SIZE - offset, stop - address)
+            page = self.pages.get(page_no)
+            if page is not None:
+                position = 4 * (address - start)
+                result[position:position + 4 * count] = page[offset:offset + count]
+            address += count
+        return array('I', result)
+
+    def _set_slice(self, index: slice, values):
+        start, stop = self._slice_bounds(index)
+        if len(values) != stop - start:
+            raise ValueError("Размер среза страничной памяти изменять нельзя")
+        cells = values if isinstance(values, array) else array('I', values)
+        address = start
+        while address < stop:
+            page_no = address >> PAGE_SHIFT
+            offset = address & PAGE_MASK
+            count = min(PAGE_SIZE - offset, stop - address)
+            chunk = cells[address - start:address - start + count]
+            if page_no in self.pages or any(chunk):
+                self._page_for_write(page_no)[offset:offset + count] = chunk
+            address += count
+
+    def clear(self):
+        """Освобождает все страницы."""
+        self.pages = {}
+        self._writable = {}
+        self.dirty = set()
+        self._base = None
+
+    def snapshot(self) -> Dict[int, memoryview]:
+        """
+        Создает снимок страниц: копируются только ссылки на страницы.
+
+        После снимка все страницы становятся разделяемыми и копируются
+        при первой записи.
+        """
+        pages = dict(self.pages)
+        self._writable = {}
+        self.dirty = set()
+        self._base = pages
+        return pages
+
+    def share(self) -> Dict[int, memoryview]:
+        """
+        Копия ссылок на страницы для сравнения (Memory.track_writes).
+
+        Как и после снимка, все страницы становятся разделяемыми, но учет
+        изменений относительно последнего снимка (dirty) сохраняется,
+        поэтому его восстановление по-прежнему перебирает только
+        измененные страницы.
+        """
+        self._writable = {}
+        return dict(self.pages)
+
+    def restore(self, pages: Dict[int, memoryview]):
+        """
+        Восстанавливает страницы из снимка.
+
+        Для последнего снимка перебираются только страницы, измененные
+        после него; для более раннего снимка сравниваются ссылки на все
+        выделенные страницы (без копирования содержимого).
+        """
+        if pages is self._base:
+            candidates = self.dirty
+        else:
+            candidates = set(self.pages) | set(pages)
+        for page_no in candidates:
+            page = pages.get(page_no)
+            if page is None:
+                self.pages.pop(page_no, None)
+            else:
+                self.pages[page_no] = page
+        self._writable = {}
+        self.dirty = set()
+        self._base = pages
+
+    def iter_pages(self, start: int, stop: int) -> Iterator[Tuple[int, int]]:
+        """Перечисляет пересечения [start, stop) с выделенными страницами."""
+        for page_no in sorted(self.pages):
+            first = max(start, page_no << PAGE_SHIFT)
+            last = min(stop, (page_no + 1) << PAGE_SHIFT)
+            if first < last:
+                yield first, last
+
+
+class PagedMemory(Memory):
+    """Память УВМ со страничной разреженной памятью данных."""
+
+    def __init__(self, data_size: int = FULL_ADDRESS_SPACE, num_registers: int = 32):
+        """
+        Инициализация памяти.
+
+        Args:
+            data_size: размер адресного пространства памяти данных
+                       (по умолчанию все 26 бит адреса READ_MEM)
+            num_registers: количество регистров
+        """
+        super().__init__(0, num_registers)
+        self.data_size = data_size
+        self.data_memory = PagedStore(data_size)
+
+    @property
+    def resident_pages(self) -> int:
+        """Количество выделенных страниц."""
+        return len(self.data_memory.pages)
+
+    @property
+    def resident_bytes(self) -> int:
+        """Объем памяти, занятый выделенными страницами."""
+        return self.resident_pages * PAGE_SIZE * 4
+
+    def clear(self):
+        """Очищает память, освобождая все страницы."""
+        super().clear()
+        self.data_memory.clear()
+
+    def _snapshot_data(self):
+        """Снимок страниц: копируются только ссылки (copy-on-write)."""
+        return self.data_memory.snapshot()
+
+    def _restore_data(self, pages):
+        """Восстанавливает страницы, измененные после снимка."""
+        self.data_memory.restore(pages)
+
+    def track_writes(self):
+        """
+        Начинает отслеживание записей: запоминает ссылки на страницы
+        (copy-on-write), не затрагивая учет изменений для снимков.
+        """
+        self._write_baseline = self.data_memory.share()
+
+    def read_data(self, address: int) -> int:
+        """Читает значение из памяти данных (возвращает знаковое число)."""
+        if 0 <= address < self.data_size:
+            self.memory_accesses += 1
+            return self._to_signed32(self.data_memory[address])
+        else:
+            raise ValueError(f"Адрес памяти вне диапазона: {address}")
+
+    def data_view(self, signed: bool = False):
+        """Страничная память не является непрерывным буфером."""
+        raise ValueError("Представление без копирования недоступно для страничной памяти: "
+                         "используйте read_block/load_block")
+
+    def load_block(self, address: int, values):
+        """Записывает блок значений в память данных одной операцией."""
+        if np is not None and isinstance(values, np.ndarray):
+            values = array('I', (values.astype(np.int64) & 0xFFFFFFFF).astype(np.uint32).tobytes())
+        super().load_block(address, values)
+
+    def read_block(self, address: int, count: int, signed: bool = True):
+        """Читает блок памяти данных одной операцией (массив numpy)."""
+        _require_numpy()
+        self._check_block(address, count)
+        cells = self.data_memory[address:address + count]
+        return np.frombuffer(cells, dtype=np.int32 if signed else np.uint32).copy()
+
+    def populated_ranges(self, start_addr: int, end_addr: int) -> Iterator[Tuple[int, int]]:
+        """Перечисляет участки диапазона, попадающие в выделенные страницы."""
+        for first, stop in self.data_memory.iter_pages(start_addr, end_addr + 1):
+            yield first, stop - 1
+
+    def changed_cells(self, start_addr: int, end_addr: int) -> Iterator[Tuple[int, int]]:
+        """Перечисляет ячейки диапазона, измененные после track_writes."""
+        base = self._require_baseline()
+        pages = self.data_memory.pages
+        zeros = memoryview(bytes(4 * PAGE_SIZE)).cast('I')
+        for page_no in sorted(set(pages) | set(base)):
+            current, old = pages.get(page_no), base.get(page_no)
+            if current is old:
+                continue  # Страница не копировалась после track_writes
+            offset = page_no << PAGE_SHIFT
+            first = max(start_addr, offset)
+            stop = min(end_addr + 1, offset + PAGE_SIZE)
+            if first >= stop:
+                continue
+            current = zeros if current is None else current
+            old = zeros if old is None else old
+            yield from _changed_cells(current[first - offset:stop - offset],
+                                      old[first - offset:stop - offset], first)
+
+    def print_status(self):
+        """Выводит статус памяти и регистров."""
+        super().print_status()
+        print(f"\nВыделено страниц памяти: {self.resident_pages} "
+              f"({self.resident_bytes} байт, страница - {PAGE_SIZE} ячеек)")
@@ -0,0 +1,103 @@
+"""
+Параллельное форматирование больших дампов памяти.
+
+Ячейки выводимых участков один раз копируются в разделяемую память
+(multiprocessing.shared_memory), делятся на фрагменты, и процессы пула
+форматируют фрагменты в текст дампа (xml, csv или jsonl). Главный процесс
+записывает готовые фрагменты по порядку, поэтому документ совпадает с
+последовательной записью. Одновременно обрабатывается не больше
+2 * workers фрагментов, так что расход памяти ограничен.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Iterator, Tuple
+
+# Количество ячеек во фрагменте, передаваемом процессу пула
+CELLS_PER_CHUNK = 1 << 15
+
+# Меньшие дампы форматируются последовательно: запуск пула дороже
+PARALLEL_MIN_CELLS = 1 << 17
+
+# Разделяемая память, подключенная в процессе пула: имя -> сегмент
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Подключает сегмент разделяемой памяти в процессе пула.
+
+    Процессы пула используют трекер ресурсов главного процесса, поэтому
+    повторная регистрация сегмента не создает утечки: сегмент удаляет
+    главный процесс.
+    """
+    segment = _attached.get(name)
+    if segment is None:
+        segment = _attached[name] = shared_memory.SharedMemory(name)
+    return segment
+
+
+def _format_chunk(name: str, offset: int, first: int, count: int, kind: str) -> str:
+    """Форматирует count ячеек с адреса first (смещение offset в сегменте name)."""
+    cells = _attach(name).buf[offset:offset + 4 * count].cast('I')
+    try:
+        # Импорт при вызове: модули форматов сами используют этот модуль
+        if kind == 'xml':
+            from .xmldump import _cell_lines
+            return _cell_lines(cells, first)
+        from .dumpformats import ROW_FORMATS, _format_rows
+        return _format_rows(cells, first, ROW_FORMATS[kind])
+    finally:
+        cells.release()
+
+
+def formatted_blocks(memory, ranges: Iterable[Tuple[int, int]], kind: str,
+                     workers: int) -> Iterator[Tuple[int, str]]:
+    """
+    Форматирует ячейки участков ranges в пуле из workers процессов.
+
+    Args:
+        memory: память (Memory или ее подкласс)
+        ranges: участки [first, last]
+        kind: формат строк ячеек: 'xml', 'csv' или 'jsonl'
+        workers: количество процессов пула
+
+    Returns:
+        Итератор (количество ячеек, текст) по фрагментам в порядке адресов
+    """
+    ranges = list(ranges)
+    total = sum(last - first + 1 for first, last in ranges)
+    if not total:
+        return
+    segment = shared_memory.SharedMemory(create=True, size=4 * total)
+    try:
+        # Одно копирование ячеек в разделяемую память
+        target = segment.buf.cast('I')
+        chunks = []
+        position = 0
+        try:
+            for first, last in ranges:
+                count = last - first + 1
+                target[position:position + count] = memory.data_memory[first:last + 1]
+                for chunk in range(first, last + 1, CELLS_PER_CHUNK):
+                    size = min(CELLS_PER_CHUNK, last + 1 - chunk)
+                    chunks.append((4 * (position + chunk - first), chunk, size))
+                position += count
+        finally:
+            target.release()
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for offset, first, count in chunks:
+                pending.append((count, pool.submit(_format_chunk, segment.name,
+                                                   offset, first, count, kind)))
+                if len(pending) >= 2 * workers:
+                    count, future = pending.popleft()
+                    yield count, future.result()
+            while pending:
+                count, future = pending.popleft()
+                yield count, future.result()
+    finally:
+        segment.close()
+        segment.unlink()
@@ -0,0 +1,109 @@
+"""
+Пул заранее созданных виртуальных машин.
+
+Пакетная обработка выполняет много коротких заданий; вместо создания
+машины на каждое задание пул выдает готовую машину и очищает ее при
+возврате. По умолчанию машины пула используют страничную память: страницы
+выделяются только при записи, поэтому очистка освобождает лишь страницы,
+затронутые заданием, и ее стоимость не зависит от размера памяти данных.
+
+Страничная память не дает представлений без копирования (data_view,
+registers_view), а каждое обращение к ней проходит через PagedStore.
+Пул с paged=False создает машины с плотной памятью: доступ к ней
+быстрее и представления numpy доступны, но очистка обнуляет всю память
+данных, поэтому ее стоимость пропорциональна data_memory_size.
+"""
+
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Iterator, List
+from .interpreter import VirtualMachine
+from .memory import Memory
+from .paged import PagedMemory
+
+
+class VMPool:
+    """Пул виртуальных машин с одинаковой конфигурацией."""
+
+    def __init__(self, size: int = 4, data_memory_size: int = 65536,
+                 num_registers: int = 32, engine: str = 'interpret', fuse: bool = False,
+                 paged: bool = True):
+        """
+        Args:
+            size: количество машин, создаваемых заранее
+            data_memory_size: размер памяти данных каждой машины
+            num_registers: количество регистров каждой машины
+            engine: механизм выполнения машин пула
+            fuse: объединять инструкции в суперинструкции
+            paged: страничная (True) или плотная (False) память машин
+        """
+        if engine not in VirtualMachine.ENGINES:
+            raise ValueError(f"Неизвестный механизм выполнения: {engine}")
+        self.data_memory_size = data_memory_size
+        self.num_registers = num_registers
+        self.engine = engine
+        self.fuse = fuse
+        self.paged = paged
+
+        self._lock = threading.Lock()
+        self._owned = weakref.WeakSet()  # Машины, созданные пулом
+        self._in_use = set()  # Выданные машины
+        self._created = 0
+        self._idle: List[VirtualMachine] = [self._create() for _ in range(size)]
+
+    def _create(self) -> VirtualMachine:
+        """Создает машину пула."""
+        memory_class = PagedMemory if self.paged else Memory
+        memory = memory_class(self.data_memory_size, self.num_registers)
+        vm = VirtualMachine(engine=self.engine, fuse=self.fuse, memory=memory)
+        self._owned.add(vm)
+        self._created += 1
+        return vm
+
+    @property
+    def created(self) -> int:
+        """Количество машин, созданных пулом."""
+        return self._created
+
+    @property
+    def available(self) -> int:
+        """Количество свободных машин."""
+        return len(self._idle)
+
+    def acquire(self) -> VirtualMachine:
+        """Выдает свободную машину (при отсутствии свободных создает новую)."""
+        with self._lock:
+            vm = self._idle.pop() if self._idle else self._create()
+            self._in_use.add(vm)
+            return vm
+
+    def release(self, vm: VirtualMachine):
+        """
+        Возвращает машину в пул, очищая состояние, измененное заданием,
+        и восстанавливая механизм выполнения и слияние, заданные пулом.
+
+        Args:
+            vm: машина, полученная через acquire
+        """
+        if vm not in self._owned:
+            raise ValueError("Виртуальная машина не принадлежит пулу")
+        with self._lock:
+            if vm not in self._in_use:
+                raise ValueError("Виртуальная машина уже возвращена в пул")
+            self._in_use.remove(vm)
+        # Машина не выдается, пока не очищена и не добавлена в список свободных
+        vm.reset()
+        vm.engine = self.engine
+        vm.fuse = self.fuse
+        with self._lock:
+            self._idle.append(vm)
+
+    @contextmanager
+    def machine(self) -> Iterator[VirtualMachine]:
+        """Контекстный менеджер: машина возвращается в пул по выходе из блока."""
+        vm = self.acquire()
+        try:
+            yield vm
+        finally:
+            self.release(vm)
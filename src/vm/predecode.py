@@ -0,0 +1,103 @@
+"""
+Предекодирование программы УВМ в таблицу инструкций.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Optional
+from .decoder import Decoder, DecodedInstruction
+
+class ProgramTable:
+    """
+    Таблица предекодированных инструкций.
+
+    Программа декодируется один раз при загрузке. Поля инструкций хранятся
+    в компактных массивах (по одному элементу на инструкцию), поэтому цикл
+    выполнения не копирует программу и не создает объектов на каждом шаге.
+    """
+
+    def __init__(self, source, start: int = 0):
+        """
+        Декодирует программу.
+
+        Args:
+            source: бинарные данные программы (bytes, bytearray или список байтов)
+            start: IP, с которого начинается декодирование
+        """
+        self.source = source  # Исходная память команд (для проверки актуальности)
+        self.start = start
+        self.program_size = len(source)
+
+        self.opcodes = array('B')  # Коды операций
+        self.arg0 = array('q')  # Первый аргумент
+        self.arg1 = array('q')  # Второй аргумент
+        self.arg2 = array('q')  # Третий аргумент (только для ABS)
+        self.addresses = array('Q')  # IP каждой инструкции
+        self.next_ips = array('Q')  # IP следующей инструкции
+
+        # Ошибка декодирования: (IP, сообщение). Инструкции до ошибки
+        # выполняются как обычно, ошибка выдается при достижении этого IP.
+        self.error_ip: Optional[int] = None
+        self.error_message: Optional[str] = None
+
+        self._decode(bytes(source), start)
+
+    def _decode(self, data: bytes, ip: int):
+        """Последовательно декодирует программу начиная с ip."""
+        decode_fields = Decoder.decode_fields
+        opcodes, arg0, arg1, arg2 = self.opcodes, self.arg0, self.arg1, self.arg2
+        addresses, next_ips = self.addresses, self.next_ips
+        size = len(data)
+
+        while ip < size:
+            try:
+                opcode, args, length = decode_fields(data, ip)
+            except (ValueError, IndexError) as e:
+                self.error_ip = ip
+                self.error_message = str(e)
+                break
+
+            opcodes.append(opcode)
+            arg0.append(args[0])
+            arg1.append(args[1])
+            arg2.append(args[2] if len(args) > 2 else 0)
+            addresses.append(ip)
+            ip += length
+            next_ips.append(ip)
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def index_of(self, ip: int) -> Optional[int]:
+        """
+        Возвращает номер инструкции, начинающейся по адресу ip.
+
+        Returns:
+            Номер инструкции; len(table), если ip указывает на конец
+            декодированной части; None, если ip не на границе инструкции
+        """
+        index = bisect_left(self.addresses, ip)
+        if index < len(self.addresses) and self.addresses[index] == ip:
+            return index
+        if index == len(self.addresses) and ip == self.ip_at(index):
+            return index
+        return None
+
+    def ip_at(self, index: int) -> int:
+        """Возвращает IP инструкции с номером index (или IP конца таблицы)."""
+        if index < len(self.addresses):
+            return self.addresses[index]
+        return self.next_ips[-1] if self.next_ips else self.start
+
+    def instruction(self, index: int) -> DecodedInstruction:
+        """Восстанавливает DecodedInstruction для инструкции с номером index."""
+        opcode = self.opcodes[index]
+        if opcode == 214:
+            args = (self.arg0[index], self.arg1[index], self.arg2[index])
+        else:
+            args = (self.arg0[index], self.arg1[index])
+        return DecodedInstruction(
+            opcode=opcode,
+            args=args,
+            size=self.next_ips[index] - self.addresses[index]
+        )
@@ -0,0 +1,155 @@
+"""
+Профилировщик программ УВМ.
+
+Профилировщик накапливает количество выполнений и время выполнения для
+каждого IP. С таблицей строк, созданной ассемблером (--line-table),
+результаты сводятся по строкам исходного текста; без нее - по адресам.
+Отчеты: по строкам, по кодам операций, первые N позиций и свернутые
+стеки (folded) для построения flamegraph.
+"""
+
+import json
+from bisect import bisect_right
+from collections import defaultdict
+from time import perf_counter_ns
+from typing import Dict, List, Optional, Tuple
+from .counters import OPCODE_NAMES
+
+# Формат таблицы строк (записывается ассемблером, src/assembler/linetable.py)
+LINE_TABLE_FORMAT = "uvm-line-table"
+LINE_TABLE_VERSION = 1
+
+
+class LineTable:
+    """Таблица строк, прочитанная из файла ассемблера."""
+
+    def __init__(self, entries: List[Tuple[int, int, int, str]], source: Optional[str] = None):
+        self.source = source
+        self.entries = sorted(entries)
+        self.offsets = [entry[0] for entry in self.entries]
+
+    @classmethod
+    def load(cls, file_path: str) -> 'LineTable':
+        """Загружает таблицу строк из файла."""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("format") != LINE_TABLE_FORMAT:
+            raise ValueError(f"Файл не является таблицей строк: {file_path}")
+        return cls([tuple(entry) for entry in data["entries"]], data.get("source"))
+
+    def lookup(self, ip: int) -> Optional[Tuple[int, str]]:
+        """Возвращает (номер строки, текст строки) для IP или None."""
+        position = bisect_right(self.offsets, ip) - 1
+        if position < 0:
+            return None
+        offset, size, line, text = self.entries[position]
+        if ip >= offset + size:
+            return None
+        return line, text
+
+
+class Profiler:
+    """Профилировщик: выполнения и время по IP."""
+
+    def __init__(self, line_table: Optional[LineTable] = None):
+        self.line_table = line_table
+        self.hits: Dict[int, int] = defaultdict(int)     # IP -> выполнений
+        self.cost_ns: Dict[int, int] = defaultdict(int)  # IP -> время, нс
+        self.opcodes: Dict[int, int] = {}                # IP -> код операции
+
+    def profiled(self, vm, table, execute=None):
+        """
+        Возвращает функцию выполнения инструкции с номером index,
+        учитывающую ее в профиле.
+
+        Args:
+            vm: виртуальная машина
+            table: таблица предекодированных инструкций
+            execute: внутренняя функция выполнения по номеру инструкции
+        """
+        opcodes, addresses = table.opcodes, table.addresses
+        hits, cost_ns, ip_opcodes = self.hits, self.cost_ns, self.opcodes
+        if execute is None:
+            execute_operation = vm.execute_operation
+            arg0, arg1, arg2 = table.arg0, table.arg1, table.arg2
+
+            def execute(index: int):
+                execute_operation(opcodes[index], arg0[index], arg1[index], arg2[index])
+
+        def profiled_execute(index: int):
+            ip = addresses[index]
+            started = perf_counter_ns()
+            try:
+                execute(index)
+            finally:
+                cost_ns[ip] += perf_counter_ns() - started
+                hits[ip] += 1
+                ip_opcodes[ip] = opcodes[index]
+        return profiled_execute
+
+    def _location(self, ip: int) -> Tuple[object, str]:
+        """Ключ и подпись позиции профиля (строка исходного текста или IP)."""
+        if self.line_table is not None:
+            found = self.line_table.lookup(ip)
+            if found is not None:
+                line, text = found
+                return line, f"строка {line}: {text}"
+        return f"0x{ip:04X}", f"0x{ip:04X}: {OPCODE_NAMES.get(self.opcodes[ip], '?')}"
+
+    def by_line(self) -> List[dict]:
+        """Итоги по строкам исходного текста (или по IP без таблицы строк)."""
+        totals: Dict[object, dict] = {}
+        for ip in sorted(self.hits):
+            key, label = self._location(ip)
+            row = totals.get(key)
+            if row is None:
+                row = totals[key] = {'location': key, 'label': label, 'hits': 0, 'cost_ns': 0}
+            row['hits'] += self.hits[ip]
+            row['cost_ns'] += self.cost_ns[ip]
+        return list(totals.values())
+
+    def by_opcode(self) -> List[dict]:
+        """Итоги по кодам операций."""
+        totals: Dict[str, dict] = {}
+        for ip, opcode in self.opcodes.items():
+            name = OPCODE_NAMES.get(opcode, str(opcode))
+            row = totals.setdefault(name, {'opcode': name, 'hits': 0, 'cost_ns': 0})
+            row['hits'] += self.hits[ip]
+            row['cost_ns'] += self.cost_ns[ip]
+        return sorted(totals.values(), key=lambda row: row['cost_ns'], reverse=True)
+
+    def top(self, count: int = 10) -> List[dict]:
+        """Первые count строк (позиций) по времени выполнения."""
+        return sorted(self.by_line(), key=lambda row: row['cost_ns'], reverse=True)[:count]
+
+    def folded(self) -> str:
+        """
+        Свернутые стеки для flamegraph.pl и совместимых инструментов.
+
+        Стек: программа;код операции;строка (или IP), значение - время в нс.
+        """
+        root = "program"
+        if self.line_table is not None and self.line_table.source:
+            root = self.line_table.source
+        lines = []
+        for ip in sorted(self.hits):
+            _, label = self._location(ip)
+            name = OPCODE_NAMES.get(self.opcodes[ip], '?')
+            frames = [root, name, label]
+            stack = ";".join(frame.replace(";", ",") for frame in frames)
+            lines.append(f"{stack} {self.cost_ns[ip]}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def format_report(self, count: int = 10) -> str:
+        """Текстовый отчет: первые count строк и итоги по кодам операций."""
+        total = sum(self.cost_ns.values()) or 1
+        report = [f"Профиль: первые {count} позиций по времени выполнения",
+                  f"{'Время, мкс':>12} {'%':>6} {'Выполнений':>11}  Позиция"]
+        for row in self.top(count):
+            report.append(f"{row['cost_ns'] / 1000:12.1f} {100 * row['cost_ns'] / total:6.1f} "
+                          f"{row['hits']:11}  {row['label']}")
+        report.append("\nПо кодам операций:")
+        for row in self.by_opcode():
+            report.append(f"{row['cost_ns'] / 1000:12.1f} {100 * row['cost_ns'] / total:6.1f} "
+                          f"{row['hits']:11}  {row['opcode']}")
+        return "\n".join(report)
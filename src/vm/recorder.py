@@ -0,0 +1,138 @@
+"""
+Запись трассы выполнения по столбцам (NumPy, файл .npz).
+
+Для каждой выполненной инструкции сохраняются IP, код операции, операнды,
+эффективный адрес, записанное значение, регистр назначения и флаги АЛУ.
+Строки накапливаются в заранее выделенных столбцах и по заполнении
+записываются в файл .npz фрагментами, поэтому объем памяти не зависит от
+длины трассы. Файл читается функцией load_trace; запросы к трассе -
+модуль trace_query.
+"""
+
+import zipfile
+from typing import Dict
+from .memory import np, _require_numpy
+
+# Столбцы трассы: имя -> тип numpy
+TRACE_COLUMNS = (
+    ('ip', 'u4'),
+    ('opcode', 'u1'),
+    ('arg0', 'i8'),
+    ('arg1', 'i8'),
+    ('arg2', 'i8'),
+    ('address', 'i8'),   # Адрес памяти данных (-1 - нет обращения)
+    ('value', 'i8'),     # Записанное значение (регистр или память), знаковое
+    ('register', 'i1'),  # Регистр назначения (-1 - запись в память)
+    ('flags', 'u1'),     # Флаги АЛУ после инструкции (биты FLAG_*)
+)
+
+FLAG_Z, FLAG_N, FLAG_V, FLAG_C = 1, 2, 4, 8
+
+CHUNKS_MEMBER = "chunks"
+
+
+class TraceRecorder:
+    """Запись трассы выполнения в файл .npz."""
+
+    def __init__(self, file_path: str, chunk_size: int = 65536, compress: bool = False):
+        """
+        Args:
+            file_path: файл трассы (.npz)
+            chunk_size: количество строк во фрагменте
+            compress: сжимать фрагменты (zip deflate)
+        """
+        _require_numpy()
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.columns = {name: np.empty(chunk_size, dtype=dtype) for name, dtype in TRACE_COLUMNS}
+        self.rows = 0           # Заполнено строк в текущем фрагменте
+        self.rows_written = 0   # Записано строк в файл
+        self.chunks = []        # Количество строк во фрагментах
+        self._zip = zipfile.ZipFile(file_path, 'w',
+                                    zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED,
+                                    allowZip64=True)
+
+    def attach(self, vm):
+        """Подключает запись к машине через обработчики событий."""
+        vm.hooks.register('post_instruction', self._record)
+
+    def detach(self, vm):
+        """Отключает запись от машины."""
+        vm.hooks.unregister('post_instruction', self._record)
+
+    def _record(self, vm, ip: int, opcode: int, args):
+        memory = vm.memory
+        alu = vm.alu
+        if opcode == 158:
+            address, value, register = -1, args[0], args[1]
+        elif opcode == 17:
+            address, value, register = args[0], memory.get_register(args[1]), args[1]
+        elif opcode == 12:
+            address, value, register = (memory.get_register(args[0]),
+                                        memory.get_register(args[1]), -1)
+        else:
+            address = memory.get_register(args[1]) + args[0]
+            value, register = memory.data_memory[address], -1  # abs не бывает отрицательным
+
+        row = self.rows
+        columns = self.columns
+        columns['ip'][row] = ip
+        columns['opcode'][row] = opcode
+        columns['arg0'][row] = args[0]
+        columns['arg1'][row] = args[1]
+        columns['arg2'][row] = args[2] if opcode == 214 else 0
+        columns['address'][row] = address
+        columns['value'][row] = value
+        columns['register'][row] = register
+        columns['flags'][row] = ((FLAG_Z if alu.zero_flag else 0)
+                                 | (FLAG_N if alu.negative_flag else 0)
+                                 | (FLAG_V if alu.overflow_flag else 0)
+                                 | (FLAG_C if alu.carry_flag else 0))
+        self.rows = row + 1
+        if self.rows == self.chunk_size:
+            self.flush()
+
+    def _write_member(self, name: str, array):
+        """Записывает массив в файл трассы (формат .npy внутри .npz)."""
+        with self._zip.open(name + ".npy", 'w', force_zip64=True) as f:
+            np.lib.format.write_array(f, np.ascontiguousarray(array))
+
+    def flush(self):
+        """Записывает накопленные строки в файл отдельным фрагментом."""
+        if self.rows == 0:
+            return
+        chunk = len(self.chunks)
+        for name, _ in TRACE_COLUMNS:
+            self._write_member(f"{name}_{chunk:06d}", self.columns[name][:self.rows])
+        self.chunks.append(self.rows)
+        self.rows_written += self.rows
+        self.rows = 0
+
+    def close(self):
+        """Записывает оставшиеся строки и закрывает файл трассы."""
+        if self._zip is None:
+            return
+        self.flush()
+        self._write_member(CHUNKS_MEMBER, np.array(self.chunks, dtype=np.int64))
+        self._zip.close()
+        self._zip = None
+
+
+def load_trace(file_path: str) -> Dict[str, 'np.ndarray']:
+    """
+    Загружает трассу: столбцы TRACE_COLUMNS и 'step' (номер инструкции).
+
+    Returns:
+        Словарь имя столбца -> массив numpy
+    """
+    _require_numpy()
+    with np.load(file_path) as data:
+        if CHUNKS_MEMBER not in data:
+            raise ValueError(f"Файл не является трассой выполнения: {file_path}")
+        count = len(data[CHUNKS_MEMBER])
+        trace = {}
+        for name, dtype in TRACE_COLUMNS:
+            parts = [data[f"{name}_{chunk:06d}"] for chunk in range(count)]
+            trace[name] = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+    trace['step'] = np.arange(len(trace['ip']), dtype=np.int64)
+    return trace
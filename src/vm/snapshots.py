@@ -0,0 +1,267 @@
+"""
+Периодические снимки памяти во время выполнения.
+
+Поток снимков сохраняет выбранные области памяти данных и регистры каждые
+N выполненных инструкций и/или перед выполнением инструкций с заданными
+IP. Программа УВМ выполняется линейно, поэтому номер инструкции, перед
+которой нужен снимок, известен заранее: машина выполняет программу
+выбранным механизмом участками между точками снимков, без проверок на
+каждой инструкции. Снимок копируется в один из двух буферов, пока фоновый
+поток записывает другой; выполнение ждет записи, только если она отстает
+больше чем на снимок.
+
+Формат файла (little-endian):
+    b"UVMSNAP1", длина заголовка (4 байта), заголовок JSON;
+    записи фиксированного размера: instructions_executed (8 байт), IP
+    (4 байта), регистры и ячейки областей (по 4 байта, знаковые).
+Файл читается функцией load_snapshots.
+"""
+
+import os
+import json
+import queue
+import struct
+import threading
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Tuple
+from .memory import np, _require_numpy, _cells_to_le_bytes
+
+SNAPSHOT_MAGIC = b"UVMSNAP1"
+SNAPSHOT_FORMAT = "uvm-snapshots"
+
+# Заголовок записи: instructions_executed, IP
+RECORD_HEADER = struct.Struct('<QI')
+
+
+class SnapshotStream:
+    """Периодические снимки памяти с записью фоновым потоком."""
+
+    def __init__(self, file_path: str, regions: Iterable[Tuple[int, int]], every: int = 0,
+                 ips: Iterable[int] = (), registers: bool = True):
+        """
+        Args:
+            file_path: файл снимков
+            regions: области памяти данных [start_addr, end_addr]
+            every: снимок после каждых every выполненных инструкций (0 - нет)
+            ips: снимок перед выполнением инструкций с этими IP
+            registers: сохранять регистры
+        """
+        if every < 0:
+            raise ValueError(f"Интервал снимков не может быть отрицательным: {every}")
+        self.ips = sorted(set(ips))
+        if not every and not self.ips:
+            raise ValueError("Не заданы точки снимков: интервал или IP")
+        self.regions = [(start_addr, end_addr) for start_addr, end_addr in regions]
+        for start_addr, end_addr in self.regions:
+            if start_addr < 0 or end_addr < start_addr:
+                raise ValueError(f"Неверная область снимка: [{start_addr}, {end_addr}]")
+        self.file_path = file_path
+        self.every = every
+        self.registers = registers
+        self.snapshots_written = 0
+        self._table = None
+        self._ip_indexes: List[int] = []
+        self._file = None
+        self._thread = None
+
+    def attach(self, vm):
+        """
+        Подключает снимки к машине: открывает файл и запускает поток записи.
+
+        Если программа уже загружена, IP снимков проверяются по ней.
+        """
+        memory = vm.memory
+        if memory.program_memory:
+            self.check_ips(vm.get_program_table())
+        for start_addr, end_addr in self.regions:
+            if end_addr >= memory.data_size:
+                raise ValueError(f"Область снимка [{start_addr}, {end_addr}] вне памяти "
+                                 f"[0, {memory.data_size - 1}]")
+        num_registers = memory.num_registers if self.registers else 0
+        cells = sum(end_addr - start_addr + 1 for start_addr, end_addr in self.regions)
+        record_size = RECORD_HEADER.size + 4 * (num_registers + cells)
+        header = json.dumps({"format": SNAPSHOT_FORMAT, "version": 1,
+                             "regions": self.regions, "num_registers": num_registers,
+                             "record_size": record_size}).encode('utf-8')
+
+        self._file = open(self.file_path, 'wb')
+        self._file.write(SNAPSHOT_MAGIC + len(header).to_bytes(4, 'little') + header)
+        # Два буфера: один заполняется снимком, другой записывается потоком
+        self._free: queue.Queue = queue.Queue()
+        for _ in range(2):
+            self._free.put(bytearray(record_size))
+        self._ready: queue.Queue = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._drain, name="uvm-snapshot-writer",
+                                        daemon=True)
+        self._thread.start()
+        vm.snapshots = self
+
+    def detach(self, vm):
+        """Отключает снимки от машины."""
+        vm.snapshots = None
+
+    def _drain(self):
+        """Цикл потока записи."""
+        while True:
+            buffer = self._ready.get()
+            if buffer is None:
+                break
+            if self._error is None:
+                try:
+                    self._file.write(buffer)
+                except BaseException as e:  # Ошибка сообщается в close
+                    self._error = e
+            self._free.put(buffer)
+
+    def _invalid_ips(self, table) -> List[int]:
+        """IP из ips, не совпадающие с началом инструкции таблицы table."""
+        invalid = []
+        for ip in self.ips:
+            index = table.index_of(ip)
+            if index is None or index >= len(table):
+                invalid.append(ip)
+        return invalid
+
+    def check_ips(self, table):
+        """Проверяет, что все IP снимков - начала инструкций программы."""
+        invalid = self._invalid_ips(table)
+        if invalid:
+            raise ValueError("IP снимков не совпадают с началом инструкции: "
+                             + ", ".join(f"0x{ip:04X}" for ip in invalid))
+
+    def _ip_points(self, table) -> List[int]:
+        """Номера инструкций с IP из ips (для таблицы table)."""
+        if table is not self._table:
+            invalid = self._invalid_ips(table)
+            if invalid:
+                # Программа загружена после attach: снимки по этим IP не делаются
+                print("Предупреждение: IP снимков не совпадают с началом инструкции: "
+                      + ", ".join(f"0x{ip:04X}" for ip in invalid))
+            self._ip_indexes = sorted(table.index_of(ip) for ip in self.ips
+                                      if ip not in invalid)
+            self._table = table
+        return self._ip_indexes
+
+    def is_ip_point(self, table, index: int) -> bool:
+        """Нужен ли снимок перед инструкцией index."""
+        points = self._ip_points(table)
+        position = bisect_right(points, index) - 1
+        return position >= 0 and points[position] == index
+
+    def next_stop(self, table, index: int, executed: int) -> Optional[int]:
+        """
+        Номер инструкции, перед которой нужен следующий снимок.
+
+        Args:
+            table: таблица предекодированных инструкций
+            index: номер текущей инструкции
+            executed: выполнено инструкций с начала запуска
+
+        Returns:
+            Номер инструкции после index или None, если снимков больше нет
+        """
+        stops = []
+        if self.every:
+            stops.append(index + self.every - executed % self.every)
+        points = self._ip_points(table)
+        position = bisect_right(points, index)
+        if position < len(points):
+            stops.append(points[position])
+        stop = min(stops, default=None)
+        if stop is None or stop >= len(table):
+            return None
+        return stop
+
+    def capture(self, vm):
+        """Копирует снимок в свободный буфер и передает его потоку записи."""
+        buffer = self._free.get()  # Ждет, только если оба буфера еще записываются
+        memory = vm.memory
+        RECORD_HEADER.pack_into(buffer, 0, memory.instructions_executed, vm.ip)
+        offset = RECORD_HEADER.size
+        if self.registers:
+            data = _cells_to_le_bytes(memory.registers)
+            buffer[offset:offset + len(data)] = data
+            offset += len(data)
+        for start_addr, end_addr in self.regions:
+            data = memory.to_bytes(start_addr, end_addr)
+            buffer[offset:offset + len(data)] = data
+            offset += len(data)
+        self._ready.put(buffer)
+        self.snapshots_written += 1
+
+    def close(self):
+        """Дожидается записи снимков и закрывает файл."""
+        if self._thread is None:
+            return
+        self._ready.put(None)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+
+
+class SnapshotSeries:
+    """Снимки, прочитанные из файла: временные ряды ячеек и регистров."""
+
+    def __init__(self, regions: List[Tuple[int, int]], num_registers: int, records):
+        self.regions = regions
+        self.num_registers = num_registers
+        self.records = records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def steps(self):
+        """instructions_executed на момент каждого снимка."""
+        return self.records['step']
+
+    @property
+    def ips(self):
+        """IP следующей инструкции на момент каждого снимка."""
+        return self.records['ip']
+
+    def register(self, reg_num: int):
+        """Значения регистра во всех снимках."""
+        if not 0 <= reg_num < self.num_registers:
+            raise ValueError(f"Номер регистра вне диапазона: {reg_num}")
+        return self.records['registers'][:, reg_num]
+
+    def window(self, start_addr: int, end_addr: int):
+        """Значения ячеек [start_addr, end_addr] во всех снимках (снимок x ячейка)."""
+        offset = 0
+        for first, last in self.regions:
+            if first <= start_addr and end_addr <= last:
+                position = offset + start_addr - first
+                return self.records['memory'][:, position:position + end_addr - start_addr + 1]
+            offset += last - first + 1
+        raise ValueError(f"Ячейки [{start_addr}, {end_addr}] не входят в области снимков")
+
+    def cell(self, address: int):
+        """Значения ячейки во всех снимках."""
+        return self.window(address, address)[:, 0]
+
+
+def load_snapshots(file_path: str) -> SnapshotSeries:
+    """Загружает файл снимков (записи отображаются в память, без чтения целиком)."""
+    _require_numpy()
+    with open(file_path, 'rb') as f:
+        magic = f.read(len(SNAPSHOT_MAGIC))
+        size = int.from_bytes(f.read(4), 'little')
+        header = json.loads(f.read(size).decode('utf-8')) if magic == SNAPSHOT_MAGIC else {}
+    if header.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Файл не является файлом снимков: {file_path}")
+    regions = [tuple(region) for region in header["regions"]]
+    num_registers = header["num_registers"]
+    cells = sum(end_addr - start_addr + 1 for start_addr, end_addr in regions)
+    dtype = np.dtype([('step', '<u8'), ('ip', '<u4'),
+                      ('registers', '<i4', (num_registers,)), ('memory', '<i4', (cells,))])
+    offset = len(SNAPSHOT_MAGIC) + 4 + size
+    count = (os.path.getsize(file_path) - offset) // dtype.itemsize
+    if count:
+        records = np.memmap(file_path, dtype=dtype, mode='r', offset=offset, shape=(count,))
+    else:
+        records = np.empty(0, dtype=dtype)
+    return SnapshotSeries(regions, num_registers, records)
@@ -0,0 +1,177 @@
+"""
+Загрузка состояния машины из дампа памяти.
+
+Состояние (регистры и ячейки памяти данных) читается потоком и сразу
+записывается в память блоками: подряд идущие ячейки собираются в массив
+и записываются одной операцией, поэтому расход памяти не зависит от
+размера дампа. Поддерживаются все форматы дампа, в том числе сжатые:
+
+    xml   - плотный или разреженный дамп (регистры и ячейки)
+    csv, jsonl - ячейки (плотные или разреженные)
+    raw, npy   - непрерывный блок ячеек с заданного адреса
+
+Пропуски разреженного XML-дампа nonzero - нулевые ячейки, они обнуляются.
+Пропуски дампа changed - ячейки, не изменившиеся с начала предыдущего
+запуска, поэтому они не изменяются. Дампы csv и jsonl не бывают
+разреженными: изменяются ячейки из строк дампа (в дампе populated_only -
+только ячейки выделенных страниц).
+"""
+
+import ast
+import json
+from array import array
+from typing import IO, Iterator, Tuple
+from .dumpformats import CELLS_PER_BLOCK, detect_compression, open_dump_input
+from .dumpreader import iter_dump
+
+NPY_MAGIC = b"\x93NUMPY"
+
+# Типы элементов .npy, совместимые с ячейками памяти
+NPY_CELL_TYPES = ('<i4', '<u4')
+
+
+def state_format(file_path: str) -> str:
+    """Формат файла состояния по расширению (без учета сжатия); по умолчанию raw."""
+    name = str(file_path).lower()
+    if detect_compression(name) is not None:
+        name = name.rsplit('.', 1)[0]
+    for dump_format in ('xml', 'npy', 'csv', 'jsonl'):
+        if name.endswith('.' + dump_format):
+            return dump_format
+    return 'raw'
+
+
+class _BlockWriter:
+    """Собирает подряд идущие ячейки и записывает их в память блоками."""
+
+    def __init__(self, memory):
+        self.memory = memory
+        self.start = 0
+        self.cells = array('I')
+        self.cells_loaded = 0
+
+    def cell(self, address: int, unsigned: int):
+        if address != self.start + len(self.cells) or len(self.cells) >= CELLS_PER_BLOCK:
+            self.flush()
+            self.start = address
+        self.cells.append(unsigned & 0xFFFFFFFF)
+
+    def zeros(self, address: int, count: int):
+        self.flush()
+        for block in range(address, address + count, CELLS_PER_BLOCK):
+            size = min(CELLS_PER_BLOCK, address + count - block)
+            self.write(block, array('I', bytes(4 * size)))
+
+    def write(self, address: int, cells: array):
+        self.memory._check_block(address, len(cells))
+        self.memory.data_memory[address:address + len(cells)] = cells
+
+    def flush(self):
+        if self.cells:
+            self.write(self.start, self.cells)
+            self.cells_loaded += len(self.cells)
+            self.cells = array('I')
+
+
+def _load_xml(memory, file_path: str) -> int:
+    """Загружает регистры и ячейки XML-дампа."""
+    writer = _BlockWriter(memory)
+    sparse = None
+    for kind, key, value, *rest in iter_dump(file_path):
+        if kind == 'cell':
+            writer.cell(key, value)
+        elif kind == 'gap':
+            if sparse == 'nonzero':
+                writer.zeros(key, value)
+        elif kind == 'region':
+            sparse = rest[0]
+        elif kind == 'register':
+            if not 0 <= key < memory.num_registers:
+                raise ValueError(f"Регистр R{key} дампа вне диапазона "
+                                 f"[0, {memory.num_registers - 1}]")
+            memory.set_register_raw(key, value)
+    writer.flush()
+    return writer.cells_loaded
+
+
+def _text_cells(f: IO, dump_format: str) -> Iterator[Tuple[int, int]]:
+    """Ячейки (адрес, значение) строк csv или jsonl."""
+    if dump_format == 'csv':
+        f.readline()  # Заголовок
+        for line in f:
+            if line.strip():
+                address, value = line.split(',', 2)[:2]
+                yield int(address), int(value)
+        return
+    for line in f:
+        if line.strip():
+            row = json.loads(line)
+            yield row['address'], row['value']
+
+
+def _load_text(memory, file_path: str, dump_format: str) -> int:
+    """Загружает ячейки дампа csv или jsonl."""
+    writer = _BlockWriter(memory)
+    with open_dump_input(file_path, binary=False) as f:
+        try:
+            for address, value in _text_cells(f, dump_format):
+                writer.cell(address, value)
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"Ошибка разбора дампа {file_path}: {e}")
+    writer.flush()
+    return writer.cells_loaded
+
+
+def _npy_count(f: IO, file_path: str) -> int:
+    """Читает заголовок .npy и возвращает количество ячеек."""
+    prefix = f.read(8)
+    if prefix[:6] != NPY_MAGIC:
+        raise ValueError(f"Файл не является массивом .npy: {file_path}")
+    size = int.from_bytes(f.read(2 if prefix[6] == 1 else 4), 'little')
+    header = ast.literal_eval(f.read(size).decode('latin1'))
+    if header['descr'] not in NPY_CELL_TYPES or len(header['shape']) != 1:
+        raise ValueError(f"Массив {file_path} должен быть одномерным int32 или uint32: "
+                         f"{header['descr']}, {header['shape']}")
+    return header['shape'][0]
+
+
+def _load_binary(memory, file_path: str, dump_format: str, address: int) -> int:
+    """Загружает непрерывный блок ячеек raw или npy с адреса address."""
+    with open_dump_input(file_path) as f:
+        count = _npy_count(f, file_path) if dump_format == 'npy' else None
+        if count is not None:
+            memory._check_block(address, count)
+        loaded = 0
+        while count is None or loaded < count:
+            limit = CELLS_PER_BLOCK if count is None else min(CELLS_PER_BLOCK, count - loaded)
+            data = f.read(4 * limit)
+            if not data:
+                break
+            memory.load_bytes(data, address + loaded)
+            loaded += len(data) // 4
+    if count is not None and loaded != count:
+        raise ValueError(f"Массив {file_path} обрезан: {loaded} из {count} ячеек")
+    return loaded
+
+
+def load_state(memory, file_path: str, address: int = 0) -> int:
+    """
+    Загружает состояние из дампа в память (Memory или ее подкласс).
+
+    Args:
+        memory: память, в которую загружается состояние
+        file_path: файл дампа (формат - по расширению, см. state_format)
+        address: адрес первой ячейки для форматов raw и npy
+
+    Returns:
+        Количество загруженных ячеек (без обнуленных пропусков)
+
+    Raises:
+        ValueError: файл не является дампом или не помещается в память
+    """
+    dump_format = state_format(file_path)
+    if dump_format == 'xml':
+        return _load_xml(memory, file_path)
+    if dump_format in ('csv', 'jsonl'):
+        return _load_text(memory, file_path, dump_format)
+    return _load_binary(memory, file_path, dump_format, address)
@@ -0,0 +1,224 @@
+"""
+Шитый код (closure threading) для виртуальной машины УВМ.
+
+Каждая инструкция из таблицы предекодирования превращается в заранее
+специализированную функцию без аргументов: операнды захвачены замыканием,
+проверки регистров выполнены при построении. Отладочный вывод (--debug)
+формирует трассировщик, поэтому он выполняется интерпретатором.
+Цикл выполнения сводится к последовательному вызову этих функций.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, List
+from .predecode import ProgramTable
+from .fusion import FUSION_KINDS, build_fused, find_fusions
+
+MASK32 = 0xFFFFFFFF
+SIGN32 = 0x80000000
+WRAP32 = 0x100000000
+
+# Коды операций, обращающихся к памяти данных
+MEMORY_OPCODES = (17, 12, 214)
+
+
+def _write_address_error(address: int) -> ValueError:
+    """Формирует ошибку WRITE_MEM для беззнакового адреса из регистра."""
+    if address & SIGN32:
+        return ValueError(f"Адрес памяти не может быть отрицательным: {address - WRAP32}")
+    return ValueError(f"Адрес памяти вне диапазона: {address}")
+
+
+class ThreadedProgram:
+    """Программа, представленная последовательностью замыканий."""
+
+    def __init__(self, vm, table: ProgramTable, fuse: bool = False):
+        """
+        Строит обработчики для всех инструкций таблицы.
+
+        Args:
+            vm: виртуальная машина, состояние которой изменяют обработчики
+            table: таблица предекодированных инструкций
+            fuse: заменять частые последовательности суперинструкциями
+        """
+        memory = vm.memory
+        self.table = table
+        self.registers = memory.registers
+        self.data_memory = memory.data_memory
+        self.fuse = fuse
+
+        self.handlers: List[Callable[[], None]] = []
+        # Обработчики одинаковых инструкций совпадают, поэтому строятся
+        # один раз на каждую уникальную комбинацию операндов.
+        cache = {}
+        opcodes, arg0, arg1, arg2 = table.opcodes, table.arg0, table.arg1, table.arg2
+        for index in range(len(table)):
+            key = (opcodes[index], arg0[index], arg1[index], arg2[index])
+            handler = cache.get(key)
+            if handler is None:
+                handler = self._build_fast(vm, *key)
+                cache[key] = handler
+            self.handlers.append(handler)
+
+        # Обращения к памяти вычисляются по префиксным суммам
+        self.access_prefix = array('Q', [0])
+        total = 0
+        for opcode in table.opcodes:
+            if opcode in MEMORY_OPCODES:
+                total += 1
+            self.access_prefix.append(total)
+
+        # Суперинструкции: последовательность units покрывает всю таблицу,
+        # unit_starts[k] - номер первой инструкции units[k]
+        self.units = self.handlers
+        self.unit_starts = None
+        self.fusions = dict.fromkeys(FUSION_KINDS, 0)
+        if self.fuse:
+            self.units = []
+            self.unit_starts = array('Q')
+            index = 0
+            for start, length, kind in find_fusions(table, memory.data_size,
+                                                    memory.num_registers):
+                for single in range(index, start):
+                    self.units.append(self.handlers[single])
+                    self.unit_starts.append(single)
+                self.units.append(build_fused(vm, table, start, length, kind))
+                self.unit_starts.append(start)
+                self.fusions[kind] += 1
+                index = start + length
+            for single in range(index, len(table)):
+                self.units.append(self.handlers[single])
+                self.unit_starts.append(single)
+            self.unit_starts.append(len(table))
+
+    def execute(self, start: int, end: int) -> int:
+        """
+        Выполняет инструкции с номерами [start, end).
+
+        Суперинструкции используются только целиком внутри диапазона,
+        остальные инструкции выполняются по одной. При ошибке номер
+        невыполненной инструкции сохраняется в fault_index.
+
+        Returns:
+            Номер первой невыполненной инструкции (end)
+        """
+        handlers = self.handlers
+        index = start
+        try:
+            if self.unit_starts is None:
+                for index in range(start, end):
+                    handlers[index]()
+                return end
+
+            units, unit_starts = self.units, self.unit_starts
+            first = bisect_left(unit_starts, start)
+            last = bisect_right(unit_starts, end) - 1
+            if first >= last:
+                for index in range(start, end):
+                    handlers[index]()
+                return end
+
+            for index in range(start, unit_starts[first]):
+                handlers[index]()
+            index = None
+            position = first
+            for position in range(first, last):
+                units[position]()
+            index = unit_starts[last]
+            for index in range(index, end):
+                handlers[index]()
+            return end
+
+        except BaseException as e:
+            if index is None:
+                index = unit_starts[position] + getattr(e, 'completed', 0)
+            self.fault_index = index
+            raise
+
+    @property
+    def fusions_applied(self) -> int:
+        """Общее количество примененных слияний."""
+        return sum(self.fusions.values())
+
+    def is_valid_for(self, vm, table: ProgramTable, fuse: bool = False) -> bool:
+        """Проверяет, что программа построена для текущего состояния ВМ."""
+        memory = vm.memory
+        return (self.table is table
+                and self.registers is memory.registers
+                and self.data_memory is memory.data_memory
+                and self.fuse == fuse)
+
+    def memory_accesses(self, start: int, end: int) -> int:
+        """Количество обращений к памяти инструкций с номерами [start, end)."""
+        return self.access_prefix[end] - self.access_prefix[start]
+
+    @staticmethod
+    def _build_fast(vm, opcode: int, arg0: int, arg1: int, arg2: int) -> Callable[[], None]:
+        """Специализированный обработчик инструкции."""
+        memory = vm.memory
+        alu = vm.alu
+        regs = memory.registers
+        data = memory.data_memory
+        num_registers = memory.num_registers
+        data_size = memory.data_size
+
+        if opcode == 158:  # LOAD_CONST
+            if not 0 <= arg1 < num_registers:
+                return lambda: vm.execute_load_const(arg0, arg1)
+            value = arg0 & MASK32
+
+            def op():
+                regs[arg1] = value
+            return op
+
+        if opcode == 17:  # READ_MEM
+            if not (0 <= arg0 < data_size and 0 <= arg1 < num_registers):
+                return lambda: vm.execute_read_mem(arg0, arg1)
+
+            def op():
+                regs[arg1] = data[arg0]
+            return op
+
+        if opcode == 12:  # WRITE_MEM
+            if not (0 <= arg0 < num_registers and 0 <= arg1 < num_registers):
+                return lambda: vm.execute_write_mem(arg0, arg1)
+
+            def op():
+                address = regs[arg0]
+                if address >= data_size:
+                    raise _write_address_error(address)
+                data[address] = regs[arg1]
+            return op
+
+        # ABS
+        offset, base_reg, src_reg = arg0, arg1, arg2
+        if not (0 <= base_reg < num_registers and 0 <= src_reg < num_registers):
+            return lambda: vm.execute_abs(offset, base_reg, src_reg)
+
+        def op():
+            value = regs[src_reg]
+            if value & SIGN32:
+                if value == SIGN32:
+                    result = 0x7FFFFFFF
+                    alu.overflow_flag = True
+                    alu.overflow_events += 1
+                else:
+                    result = WRAP32 - value
+                    alu.overflow_flag = False
+            else:
+                result = value
+                alu.overflow_flag = False
+            alu.zero_flag = result == 0
+            alu.negative_flag = False
+            alu.carry_flag = False
+
+            base = regs[base_reg]
+            if base & SIGN32:
+                base -= WRAP32
+            address = base + offset
+            if address < 0:
+                raise ValueError(f"Адрес памяти не может быть отрицательным: {address}")
+            if address >= data_size:
+                raise ValueError(f"Адрес {address} вне диапазона памяти [0, {data_size-1}]")
+            data[address] = result
+        return op
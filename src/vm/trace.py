@@ -0,0 +1,163 @@
+"""
+Буферизованная трассировка выполнения.
+
+Отладочный режим (--debug) выводит несколько строк на каждую инструкцию;
+при печати каждой строки по отдельности время больших программ уходит на
+вывод. Трассировщик формирует эти строки (--debug - полная трассировка
+в стандартный вывод), копит их пакетами и передает фоновому потоку
+записи через ограниченную очередь; выполнение приостанавливается, только если
+запись не успевает за программой. Трассируются выбранные инструкции:
+каждая N-я и/или инструкции из диапазона IP.
+"""
+
+import queue
+import sys
+import threading
+from typing import List, Optional, Tuple
+from .decoder import Decoder
+
+# Уровни подробности трассировки
+TRACE_INSTRUCTIONS = 1  # Только инструкции
+TRACE_EFFECTS = 2       # Инструкции и результаты (как --debug)
+TRACE_FLAGS = 3         # Также флаги АЛУ после ABS
+
+
+class TraceWriter:
+    """Запись строк трассировки фоновым потоком."""
+
+    def __init__(self, file_path: Optional[str] = None, batch_lines: int = 4096,
+                 max_batches: int = 16):
+        """
+        Args:
+            file_path: файл трассировки (None - стандартный вывод)
+            batch_lines: количество строк в пакете, передаваемом потоку записи
+            max_batches: размер очереди пакетов
+        """
+        self.file_path = file_path
+        self._file = open(file_path, 'w', encoding='utf-8') if file_path else sys.stdout
+        self.batch_lines = batch_lines
+        self.lines_written = 0
+        self._batch: List[str] = []
+        self._queue: queue.Queue = queue.Queue(maxsize=max_batches)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._drain, name="uvm-trace-writer", daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        """Цикл потока записи."""
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is None:
+                    break
+                if self._error is None:
+                    self._file.write("\n".join(batch) + "\n")
+            except BaseException as e:  # Ошибка сообщается в close
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def write(self, line: str):
+        """Добавляет строку в трассировку."""
+        batch = self._batch
+        batch.append(line)
+        if len(batch) >= self.batch_lines:
+            self.lines_written += len(batch)
+            self._queue.put(batch)
+            self._batch = []
+
+    def flush(self):
+        """Передает накопленные строки потоку записи и ждет их записи."""
+        if self._thread is None:
+            return
+        if self._batch:
+            self.lines_written += len(self._batch)
+            self._queue.put(self._batch)
+            self._batch = []
+        self._queue.join()
+        self._file.flush()
+
+    def close(self):
+        """Записывает оставшиеся строки и завершает поток записи."""
+        if self._thread is None:
+            return
+        if self._batch:
+            self.lines_written += len(self._batch)
+            self._queue.put(self._batch)
+            self._batch = []
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        if self._file is not sys.stdout:
+            self._file.close()
+        else:
+            self._file.flush()
+        if self._error is not None:
+            raise self._error
+
+
+class Tracer:
+    """Трассировщик: отбор инструкций и формирование строк трассировки."""
+
+    def __init__(self, writer: TraceWriter, level: int = TRACE_EFFECTS, every: int = 1,
+                 ip_range: Optional[Tuple[int, int]] = None):
+        """
+        Args:
+            writer: запись строк трассировки
+            level: уровень подробности (TRACE_INSTRUCTIONS, TRACE_EFFECTS, TRACE_FLAGS)
+            every: трассировать каждую every-ю выполненную инструкцию
+            ip_range: трассировать только инструкции с IP в [начало, конец]
+        """
+        if level not in (TRACE_INSTRUCTIONS, TRACE_EFFECTS, TRACE_FLAGS):
+            raise ValueError(f"Неизвестный уровень трассировки: {level}")
+        if every < 1:
+            raise ValueError(f"Интервал трассировки должен быть положительным: {every}")
+        self.writer = writer
+        self.level = level
+        self.every = every
+        self.ip_range = ip_range
+        self.instructions_seen = 0
+        self.instructions_traced = 0
+        self._sampled = False
+
+    def attach(self, vm):
+        """Подключает трассировщик к машине через обработчики событий."""
+        vm.hooks.register('pre_instruction', self._pre_instruction)
+        if self.level >= TRACE_EFFECTS:
+            vm.hooks.register('post_instruction', self._post_instruction)
+
+    def detach(self, vm):
+        """Отключает трассировщик от машины."""
+        vm.hooks.unregister('pre_instruction', self._pre_instruction)
+        if self.level >= TRACE_EFFECTS:
+            vm.hooks.unregister('post_instruction', self._post_instruction)
+
+    def _pre_instruction(self, vm, ip: int, opcode: int, args):
+        seen = self.instructions_seen
+        self.instructions_seen = seen + 1
+        sampled = seen % self.every == 0
+        if sampled and self.ip_range is not None:
+            sampled = self.ip_range[0] <= ip <= self.ip_range[1]
+        self._sampled = sampled
+        if sampled:
+            self.instructions_traced += 1
+            self.writer.write(Decoder.format_fields(opcode, args, ip))
+
+    def _post_instruction(self, vm, ip: int, opcode: int, args):
+        if not self._sampled:
+            return
+        memory = vm.memory
+        write = self.writer.write
+        if opcode == 158:
+            write(f"  LOAD_CONST: R{args[1]} = {args[0]}")
+        elif opcode == 17:
+            write(f"  READ_MEM: R{args[1]} = memory[{args[0]}] = {memory.get_register(args[1])}")
+        elif opcode == 12:
+            write(f"  WRITE_MEM: memory[{memory.get_register(args[0])}] = "
+                  f"R{args[1]} = {memory.get_register(args[1])}")
+        else:
+            offset, base_reg, src_reg = args
+            address = memory.get_register(base_reg) + offset
+            write(f"  ABS: memory[{address}] = abs(R{src_reg}) = {memory.data_memory[address]}")
+            if self.level >= TRACE_FLAGS:
+                write(f"       Флаги АЛУ: {vm.alu.get_status_string()}")
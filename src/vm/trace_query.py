@@ -0,0 +1,118 @@
+"""
+Запросы к трассе выполнения, записанной TraceRecorder (--record).
+
+Все запросы - векторные фильтры по столбцам трассы.
+
+Пример: python run_trace_query.py trace.npz last-write 100
+"""
+
+import sys
+import argparse
+from typing import Optional
+from .counters import OPCODE_NAMES
+from .recorder import load_trace, FLAG_Z, FLAG_N, FLAG_V, FLAG_C
+from .memory import np
+
+# Коды операций, записывающих в память данных
+WRITE_OPCODES = (12, 214)
+
+
+def write_mask(trace):
+    """Маска строк с записью в память данных."""
+    return np.isin(trace['opcode'], WRITE_OPCODES)
+
+
+def last_write(trace, address: int) -> Optional[int]:
+    """Номер строки последней записи по адресу (None - записей не было)."""
+    rows = np.flatnonzero(write_mask(trace) & (trace['address'] == address))
+    return int(rows[-1]) if len(rows) else None
+
+
+def writes_in_range(trace, start: int, end: int):
+    """Номера строк записей в память по адресам [start, end]."""
+    address = trace['address']
+    return np.flatnonzero(write_mask(trace) & (address >= start) & (address <= end))
+
+
+def register_history(trace, register: int):
+    """Номера строк, записавших значение в регистр."""
+    return np.flatnonzero(trace['register'] == register)
+
+
+def format_flags(flags: int) -> str:
+    """Флаги АЛУ в виде строки, как ALU.get_status_string."""
+    names = [name for bit, name in ((FLAG_Z, "Z"), (FLAG_N, "N"), (FLAG_V, "V"), (FLAG_C, "C"))
+             if flags & bit]
+    return "[" + "".join(names) + "]" if names else "[ ]"
+
+
+def format_row(trace, row: int) -> str:
+    """Строка трассы в текстовом виде."""
+    opcode = int(trace['opcode'][row])
+    args = [int(trace['arg0'][row]), int(trace['arg1'][row])]
+    if opcode == 214:
+        args.append(int(trace['arg2'][row]))
+    if trace['register'][row] >= 0:
+        target = f"R{trace['register'][row]}"
+    else:
+        target = f"memory[{trace['address'][row]}]"
+    return (f"#{row:<8} [{trace['ip'][row]:04X}] {OPCODE_NAMES.get(opcode, opcode):<10} "
+            f"{', '.join(map(str, args)):<16} {target} = {trace['value'][row]} "
+            f"{format_flags(int(trace['flags'][row]))}")
+
+
+def main():
+    """Точка входа программы запросов к трассе."""
+    parser = argparse.ArgumentParser(
+        description='Запросы к трассе выполнения УВМ (.npz)',
+        epilog='Пример: python run_trace_query.py trace.npz writes 0 99'
+    )
+    parser.add_argument('trace_file', help='Файл трассы, записанный с --record')
+    commands = parser.add_subparsers(dest='query', required=True)
+
+    query = commands.add_parser('last-write', help='Последняя запись по адресу')
+    query.add_argument('address', type=int)
+
+    query = commands.add_parser('writes', help='Все записи в диапазон адресов [start, end]')
+    query.add_argument('start', type=int)
+    query.add_argument('end', type=int)
+
+    query = commands.add_parser('register', help='История значений регистра')
+    query.add_argument('register', type=int)
+
+    commands.add_parser('summary', help='Сводка по трассе')
+
+    args = parser.parse_args()
+
+    try:
+        trace = load_trace(args.trace_file)
+    except (OSError, ValueError) as e:
+        print(f"Ошибка чтения трассы: {e}")
+        sys.exit(1)
+
+    if args.query == 'last-write':
+        row = last_write(trace, args.address)
+        if row is None:
+            print(f"Запись по адресу {args.address} не выполнялась")
+        else:
+            print(format_row(trace, row))
+        return
+
+    if args.query == 'summary':
+        print(f"Инструкций в трассе: {len(trace['step'])}")
+        opcodes, counts = np.unique(trace['opcode'], return_counts=True)
+        for opcode, count in zip(opcodes, counts):
+            print(f"  {OPCODE_NAMES.get(int(opcode), opcode):<10} {count}")
+        print(f"Записей в память: {int(write_mask(trace).sum())}")
+        return
+
+    if args.query == 'writes':
+        rows = writes_in_range(trace, args.start, args.end)
+    else:
+        rows = register_history(trace, args.register)
+    for row in rows:
+        print(format_row(trace, int(row)))
+    print(f"Найдено строк: {len(rows)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""
+Потоковая запись XML-дампа памяти.
+
+Дамп записывается в файл по мере формирования, пакетами строк, без
+построения дерева элементов: расход памяти не зависит от размера
+диапазона, время линейно по количеству ячеек. Вывод побайтно совпадает
+с прежним форматом (ElementTree + minidom.toprettyxml(indent="  ")):
+отступ в два пробела, элементы без потомков записываются как <tag/>,
+элементы с текстом - в одну строку.
+
+Разреженный дамп выводит только переданные ячейки; пропущенные участки
+записываются элементами <gap address="..." count="..."/>, а элемент
+data_memory получает атрибут sparse с режимом дампа. Каждая область дампа
+записывается отдельным элементом data_memory; разделы system_info и
+registers можно не выводить.
+"""
+
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+from .paralleldump import formatted_blocks, PARALLEL_MIN_CELLS
+
+INDENT = "  "
+
+# Количество ячеек в одном пакете записи
+CELLS_PER_BATCH = 4096
+
+# Разделы дампа
+SECTIONS = ('system_info', 'registers', 'memory')
+
+
+def _escape_text(text: str) -> str:
+    """Экранирование текста так же, как в minidom."""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _escape_attribute(text: str) -> str:
+    """Экранирование значения атрибута так же, как в minidom."""
+    return _escape_text(text).replace("\"", "&quot;")
+
+
+def _counter_lines(counters: dict, level: int) -> List[str]:
+    """Строки раздела performance_counters."""
+    pad = INDENT * level
+    if not counters:
+        return [f"{pad}<performance_counters/>\n"]
+    lines = [f"{pad}<performance_counters>\n"]
+    for name, value in counters.items():
+        if isinstance(value, dict):
+            if not value:
+                lines.append(f"{pad}{INDENT}<{name}/>\n")
+                continue
+            lines.append(f"{pad}{INDENT}<{name}>\n")
+            for key, count in value.items():
+                lines.append(f"{pad}{INDENT * 2}<counter name=\"{_escape_attribute(str(key))}\">"
+                             f"{_escape_text(str(count))}</counter>\n")
+            lines.append(f"{pad}{INDENT}</{name}>\n")
+        else:
+            lines.append(f"{pad}{INDENT}<{name}>{_escape_text(str(value))}</{name}>\n")
+    lines.append(f"{pad}</performance_counters>\n")
+    return lines
+
+
+def _cell_lines(cells, first: int) -> str:
+    """Строки ячеек (cells - беззнаковые значения начиная с адреса first)."""
+    lines = []
+    append = lines.append
+    for address, unsigned in enumerate(cells, first):
+        signed = unsigned - 0x100000000 if unsigned & 0x80000000 else unsigned
+        append(f"    <cell address=\"{address}\" value_signed=\"{signed}\" "
+               f"value_unsigned=\"{unsigned}\" value_hex=\"0x{unsigned:08X}\"/>\n")
+    return "".join(lines)
+
+
+def _sparse_lines(write, cells: Iterable[Tuple[int, int]], start_addr: int, end_addr: int,
+                  index=None) -> int:
+    """Записывает ячейки разреженного дампа и пропуски между ними."""
+    lines = []
+    append = lines.append
+    next_address = start_addr
+    written = 0
+    pending = 0  # Байт в lines (нужно только для индекса)
+    for address, unsigned in cells:
+        if address > next_address:
+            append(f"    <gap address=\"{next_address}\" count=\"{address - next_address}\"/>\n")
+            if index is not None:
+                index.element(address - 1, pending)
+                pending += len(lines[-1])
+        signed = unsigned - 0x100000000 if unsigned & 0x80000000 else unsigned
+        append(f"    <cell address=\"{address}\" value_signed=\"{signed}\" "
+               f"value_unsigned=\"{unsigned}\" value_hex=\"0x{unsigned:08X}\"/>\n")
+        if index is not None:
+            index.element(address, pending)
+            pending += len(lines[-1])
+        next_address = address + 1
+        written += 1
+        if len(lines) >= CELLS_PER_BATCH:
+            write("".join(lines))
+            lines = []
+            append = lines.append
+            pending = 0
+    if next_address <= end_addr:
+        if index is not None:
+            index.element(end_addr, pending)
+        append(f"    <gap address=\"{next_address}\" count=\"{end_addr + 1 - next_address}\"/>\n")
+    write("".join(lines))
+    return written
+
+
+def write_xml_dump(memory, f: TextIO, regions: Iterable[Tuple[int, int, Iterable]],
+                   counters: Optional[dict] = None,
+                   sparse: Optional[str] = None,
+                   sections: Iterable[str] = SECTIONS,
+                   workers: int = 0, index=None) -> int:
+    """
+    Записывает XML-дамп памяти в открытый текстовый файл.
+
+    Args:
+        memory: память (Memory или ее подкласс)
+        f: файл для записи
+        regions: области дампа (start_addr, end_addr, source), по элементу
+                 data_memory на область; source - участки [first, last] для
+                 вывода ячеек, а для разреженного дампа - ячейки (адрес,
+                 беззнаковое значение) по возрастанию адреса
+        counters: счетчики производительности для раздела system_info
+        sparse: режим разреженного дампа (атрибут sparse элемента data_memory)
+        sections: выводимые разделы из SECTIONS
+        workers: при workers > 1 большие плотные области форматируются
+                 пулом процессов (см. paralleldump)
+        index: DumpIndexBuilder, строящий индекс дампа (см. dumpindex)
+
+    Returns:
+        Количество записанных ячеек
+    """
+    write = f.write if index is None else index.write
+    write("<?xml version=\"1.0\" ?>\n<memory_dump>\n")
+
+    if 'system_info' in sections:
+        info = [f"{INDENT}<system_info>\n",
+                f"{INDENT * 2}<total_data_memory>{memory.data_size}</total_data_memory>\n",
+                f"{INDENT * 2}<num_registers>{memory.num_registers}</num_registers>\n",
+                f"{INDENT * 2}<instructions_executed>{memory.instructions_executed}"
+                f"</instructions_executed>\n",
+                f"{INDENT * 2}<memory_accesses>{memory.memory_accesses}</memory_accesses>\n"]
+        if counters is not None:
+            info.extend(_counter_lines(counters, 2))
+        info.append(f"{INDENT}</system_info>\n")
+        write("".join(info))
+
+    if 'registers' in sections:
+        if memory.num_registers:
+            registers = [f"{INDENT}<registers>\n"]
+            for reg, unsigned in enumerate(memory.registers):
+                signed = unsigned - 0x100000000 if unsigned & 0x80000000 else unsigned
+                registers.append(f"{INDENT * 2}<register id=\"{reg}\" value_signed=\"{signed}\" "
+                                 f"value_unsigned=\"{unsigned}\" value_hex=\"0x{unsigned:08X}\"/>\n")
+            registers.append(f"{INDENT}</registers>\n")
+            write("".join(registers))
+        else:
+            write(f"{INDENT}<registers/>\n")
+
+    cells_written = 0
+    if 'memory' in sections:
+        for start_addr, end_addr, source in regions:
+            cells_written += _write_region(memory, write, start_addr, end_addr, source, sparse,
+                                           workers, index)
+
+    write("</memory_dump>\n")
+    return cells_written
+
+
+def _cell_blocks(memory, ranges: Iterable[Tuple[int, int]]) -> Iterator[Tuple[int, str]]:
+    """Строки ячеек участков ranges пакетами: (количество ячеек, текст)."""
+    data = memory.data_memory
+    for first, last in ranges:
+        for batch in range(first, last + 1, CELLS_PER_BATCH):
+            stop = min(batch + CELLS_PER_BATCH, last + 1)
+            yield stop - batch, _cell_lines(data[batch:stop], batch)
+
+
+def _write_region(memory, write, start_addr: int, end_addr: int, source: Iterable,
+                  sparse: Optional[str], workers: int = 0, index=None) -> int:
+    """Записывает элемент data_memory одной области дампа."""
+    opening = f"{INDENT}<data_memory start_address=\"{start_addr}\" end_address=\"{end_addr}\""
+    if index is not None:
+        index.region(start_addr, end_addr, sparse)
+    if sparse:
+        write(f"{opening} sparse=\"{_escape_attribute(sparse)}\">\n")
+        cells_written = _sparse_lines(write, source, start_addr, end_addr, index)
+        write(f"{INDENT}</data_memory>\n")
+        return cells_written
+
+    ranges = list(source)
+    if workers > 1 and sum(last - first + 1 for first, last in ranges) >= PARALLEL_MIN_CELLS:
+        blocks = formatted_blocks(memory, ranges, 'xml', workers)
+    else:
+        blocks = _cell_blocks(memory, ranges)
+    cells_written = 0
+    bounds = iter(ranges)
+    first, last = 0, -1
+    for count, text in blocks:
+        if not cells_written:
+            write(opening + ">\n")
+        if index is not None:
+            # Пакеты идут по порядку участков и не пересекают их границ
+            if first > last:
+                first, last = next(bounds)
+            index.cells(text, first, count)
+            first += count
+        write(text)
+        cells_written += count
+    if cells_written:
+        write(f"{INDENT}</data_memory>\n")
+    else:
+        write(opening + "/>\n")
+    return cells_written
@@ -0,0 +1,295 @@
+"""
+Тесты разреженных дампов памяти, их чтения и сравнения.
+"""
+
+import unittest
+import tempfile
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from vm.memory import Memory
+from vm.paged import PagedMemory, PAGE_SIZE
+from vm.dumpreader import load_dump, diff_dumps, diff_registers
+from vm.stateload import load_state
+from vm.dumpindex import IndexedDump, CELLS_PER_INDEX_BLOCK
+from vm.interpreter import VirtualMachine
+from assembler.command import Command
+from assembler.encoder import Encoder
+
+class TestSparseDumps(unittest.TestCase):
+    """Тесты разреженных дампов."""
+
+    def setUp(self):
+        """Настройка тестов."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+
+    def tearDown(self):
+        """Очистка после тестов."""
+        self.quiet.__exit__(None, None, None)
+        self.temp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_nonzero_dump_expands_to_dense(self):
+        """Тест: разреженный дамп содержит пропуски и разворачивается в плотный."""
+        memory = Memory(data_size=64, num_registers=4)
+        memory.write_data(5, -1)
+        memory.write_data(6, 7)
+        memory.write_data(40, 3)
+        memory.set_register(2, -9)
+
+        memory.dump_to_xml(0, 49, self.path("sparse.xml"), sparse='nonzero')
+        with open(self.path("sparse.xml"), encoding='utf-8') as f:
+            text = f.read()
+        self.assertIn('<data_memory start_address="0" end_address="49" sparse="nonzero">', text)
+        self.assertIn('<gap address="0" count="5"/>', text)
+        self.assertIn('<gap address="7" count="33"/>', text)
+        self.assertIn('<gap address="41" count="9"/>', text)
+        self.assertEqual(text.count("<cell "), 3)
+
+        dump = load_dump(self.path("sparse.xml"))
+        self.assertEqual(dump.sparse, 'nonzero')
+        self.assertEqual(dump.value(5), -1)
+        self.assertEqual(dump.value(39), 0)
+        self.assertEqual(dump.expand().tobytes(), memory.to_bytes(0, 49))
+        self.assertEqual(dump.registers[2], 0xFFFFFFF7)
+
+        # Развернутый дамп совпадает с плотным дампом того же состояния
+        memory.memory_accesses = 0
+        memory.dump_to_xml(0, 49, self.path("dense.xml"))
+        expanded = dump.to_memory()
+        expanded.memory_accesses = 0
+        expanded.dump_to_xml(0, 49, self.path("expanded.xml"))
+        with open(self.path("dense.xml"), encoding='utf-8') as f:
+            dense = f.read()
+        with open(self.path("expanded.xml"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), dense)
+
+    def test_changed_only_dump(self):
+        """Тест: в дамп changed попадают только ячейки, измененные после track_writes."""
+        for memory in (Memory(data_size=3 * PAGE_SIZE, num_registers=2),
+                       PagedMemory(data_size=3 * PAGE_SIZE, num_registers=2)):
+            memory.write_data(1, 10)
+            memory.write_data(PAGE_SIZE + 2, 20)
+            with self.assertRaises(ValueError):
+                memory.dump(self.path("changed.xml"), sparse='changed')
+
+            memory.track_writes()
+            memory.write_data(1, 11)
+            memory.write_data(PAGE_SIZE + 2, 20)  # То же значение - не изменение
+            memory.write_data(2 * PAGE_SIZE, -4)
+
+            self.assertEqual(list(memory.changed_cells(0, 3 * PAGE_SIZE - 1)),
+                             [(1, 11), (2 * PAGE_SIZE, 0xFFFFFFFC)])
+            memory.dump(self.path("changed.xml.gz"), 0, 3 * PAGE_SIZE - 1, sparse='changed')
+            dump = load_dump(self.path("changed.xml.gz"))
+            self.assertEqual(dump.sparse, 'changed')
+            self.assertEqual(dump.cells, {1: 11, 2 * PAGE_SIZE: 0xFFFFFFFC})
+
+    def test_diff_dense_and_sparse(self):
+        """Тест сравнения плотного и разреженного дампов."""
+        memory = Memory(data_size=32, num_registers=2)
+        memory.write_data(3, 5)
+        memory.dump_to_xml(0, 31, self.path("before.xml"))
+        memory.write_data(3, 0)
+        memory.write_data(9, -2)
+        memory.set_register(1, 1)
+        memory.dump_to_xml(0, 31, self.path("after.xml"), sparse='nonzero')
+
+        before, after = load_dump(self.path("before.xml")), load_dump(self.path("after.xml"))
+        self.assertEqual(list(diff_dumps(before, after)), [(3, 5, 0), (9, 0, -2)])
+        self.assertEqual(diff_registers(before, after), [(1, 0, 1)])
+
+    def test_changed_dump_gaps_are_unknown(self):
+        """Тест: пропуски дампа changed - неизвестные, а не нулевые ячейки."""
+        memory = Memory(data_size=16, num_registers=2)
+        memory.write_data(5, 7)
+        memory.dump_to_xml(0, 15, self.path("before.xml"))
+        memory.track_writes()
+        memory.write_data(9, 8)
+        memory.dump_to_xml(0, 15, self.path("after.xml"), sparse='changed')
+
+        before, after = load_dump(self.path("before.xml")), load_dump(self.path("after.xml"))
+        self.assertEqual(after.value(9), 8)
+        self.assertFalse(after.is_known(5))
+        with self.assertRaises(ValueError):
+            after.value(5)
+        self.assertEqual(list(diff_dumps(before, after)), [(9, 0, 8)])
+        self.assertEqual(list(diff_dumps(after, before)), [(9, 8, 0)])
+
+        with self.assertRaises(ValueError):
+            after.expand()
+        with self.assertRaises(ValueError):
+            after.to_memory()
+        with self.assertRaises(ValueError):
+            after.expand(after)
+        self.assertEqual(after.expand(before).tobytes(), memory.to_bytes(0, 15))
+        self.assertEqual(after.to_memory(before).read_data(5), 7)
+
+    def test_multi_region_and_selective_dumps(self):
+        """Тест дампа нескольких областей и выбора разделов."""
+        memory = Memory(data_size=64, num_registers=2)
+        memory.write_data(2, 5)
+        memory.write_data(50, -6)
+        memory.set_register(0, 4)
+
+        memory.dump_regions(self.path("dump.xml"), [(0, 3), (48, 51)])
+        dump = load_dump(self.path("dump.xml"))
+        self.assertEqual(dump.regions, [(0, 3), (48, 51)])
+        self.assertEqual(len(dump.cells), 8)
+        self.assertEqual(dump.value(50), -6)
+        self.assertNotIn(20, dump)
+
+        files = memory.dump_regions(self.path("dump.bin"), [(0, 3), (48, 51)], 'raw', split=True)
+        self.assertEqual(files, [self.path("dump_0_3.bin"), self.path("dump_48_51.bin")])
+        with open(files[1], 'rb') as f:
+            self.assertEqual(f.read(), memory.to_bytes(48, 51))
+        with self.assertRaises(ValueError):
+            memory.dump_regions(self.path("dump.bin"), [(0, 3), (48, 51)], 'raw')
+
+        memory.dump_regions(self.path("registers.xml"), [(0, 3)], select='registers')
+        dump = load_dump(self.path("registers.xml"))
+        self.assertEqual((dump.regions, dump.info, dump.registers), ([], {}, [4, 0]))
+
+        memory.dump_regions(self.path("memory.xml"), [(48, 51)], select='memory')
+        with open(self.path("memory.xml"), encoding='utf-8') as f:
+            text = f.read()
+        self.assertNotIn("<registers", text)
+        self.assertNotIn("<system_info", text)
+        self.assertEqual(load_dump(self.path("memory.xml")).value(50), -6)
+
+        # Дамп без регистров не дает ложных различий регистров
+        full = load_dump(self.path("dump.xml"))
+        self.assertEqual(diff_registers(full, load_dump(self.path("memory.xml"))), [])
+
+    def test_sparse_rejected_for_non_xml_formats(self):
+        """Тест: разреженный дамп доступен только для xml."""
+        memory = Memory(data_size=16, num_registers=2)
+        with self.assertRaises(ValueError):
+            memory.dump(self.path("dump.bin"), dump_format='raw', sparse='nonzero')
+        for dump_format in ('csv', 'jsonl'):
+            with self.assertRaises(ValueError):
+                memory.dump(self.path("dump." + dump_format), dump_format=dump_format,
+                            sparse='nonzero')
+        with self.assertRaises(ValueError):
+            memory.dump(self.path("dump.xml"), sparse='all')
+
+    def test_indexed_dump_reads_cells(self):
+        """Тест: чтение ячеек по индексу совпадает с разбором всего дампа."""
+        memory = PagedMemory(data_size=8 * PAGE_SIZE, num_registers=2)
+        for address in range(0, 8 * PAGE_SIZE, 37):
+            memory.write_data(address, address * (-1) ** address)
+        memory.write_data(PAGE_SIZE + 5, 0)
+        block = CELLS_PER_INDEX_BLOCK
+        regions = [(3, 2 * block + 7), (PAGE_SIZE - 1, 3 * PAGE_SIZE), (5 * PAGE_SIZE, 6 * PAGE_SIZE)]
+        probes = [3, 4, block, block + 1, 2 * block + 7, PAGE_SIZE - 1, 2 * PAGE_SIZE + 37,
+                  3 * PAGE_SIZE, 5 * PAGE_SIZE + block - 1]
+        for options in ({}, {'sparse': 'nonzero'}, {'populated_only': True}):
+            memory.dump_regions(self.path("dump.xml"), regions, index=True, **options)
+            dump = load_dump(self.path("dump.xml"))
+            with IndexedDump(self.path("dump.xml")) as indexed:
+                for address in probes:
+                    self.assertEqual(indexed.value(address), dump.value(address),
+                                     (options, address))
+                self.assertEqual(indexed.read(block - 3, 2 * block + 7),
+                                 [dump.value(a) for a in range(block - 3, 2 * block + 8)])
+                with self.assertRaises(ValueError):
+                    indexed.read(2 * block, 2 * block + 8)
+
+        # Пропуски дампа changed - ячейки с неизвестным значением
+        memory.track_writes()
+        memory.write_data(block + 1, 9)
+        memory.dump_regions(self.path("dump.xml"), regions, sparse='changed', index=True)
+        with IndexedDump(self.path("dump.xml")) as indexed:
+            self.assertEqual(indexed.value(block + 1), 9)
+            with self.assertRaises(ValueError):
+                indexed.value(block)
+            with self.assertRaises(ValueError):
+                indexed.read(block, block + 1)
+
+        with self.assertRaises(ValueError):
+            memory.dump_regions(self.path("dump.xml.gz"), regions, index=True)
+        with self.assertRaises(ValueError):
+            memory.dump_regions(self.path("dump.xml"), regions[::-1], index=True)
+        with open(self.path("dump.xml"), 'a', encoding='utf-8') as f:
+            f.write("\n")
+        with self.assertRaises(ValueError):
+            IndexedDump(self.path("dump.xml"))
+
+class TestLoadState(unittest.TestCase):
+    """Тесты загрузки состояния из дампа."""
+
+    def setUp(self):
+        """Настройка тестов."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.quiet = contextlib.redirect_stdout(io.StringIO())
+        self.quiet.__enter__()
+        self.memory = Memory(data_size=64, num_registers=4)
+        self.memory.write_data(3, -7)
+        self.memory.write_data(4, 8)
+        self.memory.write_data(40, 1)
+        self.memory.set_register(1, -2)
+
+    def tearDown(self):
+        """Очистка после тестов."""
+        self.quiet.__exit__(None, None, None)
+        self.temp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_load_all_formats(self):
+        """Тест: состояние восстанавливается из дампа любого формата."""
+        cases = [("dump.xml", {}), ("sparse.xml.gz", {'sparse': 'nonzero'}),
+                 ("dump.csv", {'dump_format': 'csv'}),
+                 ("dump.jsonl.xz", {'dump_format': 'jsonl'}),
+                 ("dump.npy", {'dump_format': 'npy'}), ("dump.bin", {'dump_format': 'raw'})]
+        for name, options in cases:
+            self.memory.dump(self.path(name), 0, 47, **options)
+            for restored in (Memory(data_size=64, num_registers=4),
+                             PagedMemory(data_size=64, num_registers=4)):
+                restored.load_bytes(b"\xff" * 256)  # Пропуски nonzero обнуляются
+                load_state(restored, self.path(name))
+                self.assertEqual(restored.to_bytes(0, 47), self.memory.to_bytes(0, 47), name)
+                self.assertEqual(restored.read_data(48), -1)
+                if name.endswith(".xml") or name.endswith(".xml.gz"):
+                    self.assertEqual(restored.get_register(1), -2)
+
+        restored = Memory(data_size=64, num_registers=4)
+        self.assertEqual(load_state(restored, self.path("dump.npy"), address=16), 48)
+        self.assertEqual(restored.read_data(19), -7)
+        with self.assertRaises(ValueError):
+            load_state(restored, self.path("dump.bin"), address=32)
+
+    def test_changed_dump_keeps_unchanged_cells(self):
+        """Тест: пропуски дампа changed не изменяют ячейки."""
+        self.memory.track_writes()
+        self.memory.write_data(5, 9)
+        self.memory.dump(self.path("changed.xml"), 0, 47, sparse='changed')
+        restored = Memory(data_size=64, num_registers=4)
+        restored.write_data(6, 12)
+        self.assertEqual(load_state(restored, self.path("changed.xml")), 1)
+        self.assertEqual((restored.read_data(5), restored.read_data(6)), (9, 12))
+
+    def test_vm_continues_from_state(self):
+        """Тест: машина продолжает вычисление с загруженного состояния."""
+        self.memory.dump(self.path("stage1.xml"), 0, 47)
+        vm = VirtualMachine(data_memory_size=64, num_registers=4)
+        vm.load_state(self.path("stage1.xml"))
+        vm.memory.load_program(Encoder.encode_commands([
+            Command(158, [5, 2], 1, ""),   # R2 = 5
+            Command(17, [3, 3], 2, ""),    # R3 = memory[3]
+        ]))
+        vm.run()
+        self.assertEqual(vm.memory.get_register(3), -7)
+        self.assertEqual(vm.memory.get_register(1), -2)
+
+if __name__ == '__main__':
+    unittest.main()
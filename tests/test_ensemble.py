@@ -0,0 +1,85 @@
+"""
+Тесты ансамблевого выполнения программы.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from assembler.command import Command
+from assembler.encoder import Encoder
+from vm.alu import ALU
+
+try:
+    import numpy as np
+    from vm.ensemble import EnsembleVM
+except ImportError:
+    np = None
+
+@unittest.skipIf(np is None, "numpy не установлен")
+class TestEnsembleVM(unittest.TestCase):
+    """Тесты ансамблевой виртуальной машины."""
+
+    def setUp(self):
+        """Настройка тестов."""
+        # memory[R1 + 1] = abs(memory[0]), затем memory[memory[1]] = R2
+        self.program = Encoder.encode_commands([
+            Command(17, [0, 2], 1, ""),
+            Command(158, [4, 1], 2, ""),
+            Command(214, [1, 1, 2], 3, ""),
+            Command(17, [1, 3], 4, ""),
+            Command(12, [3, 2], 5, ""),
+        ])
+
+    def test_abs_vector_flags(self):
+        """Тест векторного abs с флагами по потокам."""
+        values = np.array([-5, 0, -0x80000000, 7], dtype=np.int32)
+        result, zero, negative, overflow = ALU.abs_vector(values)
+
+        self.assertEqual(list(result), [5, 0, 0x7FFFFFFF, 7])
+        self.assertEqual(list(zero), [False, True, False, False])
+        self.assertEqual(list(overflow), [False, False, True, False])
+        self.assertFalse(negative.any())
+
+    def test_lanes_run_independently(self):
+        """Тест: потоки выполняются независимо, ошибка останавливает только свой поток."""
+        ensemble = EnsembleVM(3, data_memory_size=16, num_registers=4)
+        ensemble.load_program(self.program)
+        data = ensemble.data_view(signed=True)
+        data[:, 0] = [-3, -0x80000000, 9]
+        data[:, 1] = [10, 11, -1]
+
+        ensemble.run()
+        results = ensemble.results()
+
+        self.assertEqual(list(data[0, [5, 10]]), [3, -3])
+        self.assertEqual(list(data[1, [5, 11]]), [0x7FFFFFFF, -0x80000000])
+        self.assertEqual([r['flags'][2] for r in results], [False, True, False])
+
+        self.assertIsNone(results[0]['error'])
+        self.assertEqual(results[0]['instructions_executed'], 5)
+        self.assertEqual(results[0]['memory_accesses'], 4)
+        self.assertEqual(results[2]['error'], "Адрес памяти не может быть отрицательным: -1")
+        self.assertEqual(results[2]['instructions_executed'], 4)
+        self.assertEqual(results[2]['ip'], ensemble.program_table.ip_at(4))
+
+    def test_lane_dump(self):
+        """Тест дампа памяти отдельного потока."""
+        import xml.etree.ElementTree as ET
+        ensemble = EnsembleVM(2, data_memory_size=16, num_registers=4)
+        ensemble.load_program(self.program)
+        ensemble.data_view(signed=True)[1, 0] = -8
+        ensemble.run()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dump_file = os.path.join(temp_dir, "lane.xml")
+            ensemble.dump_lane(1, 0, 7, dump_file)
+            cells = ET.parse(dump_file).getroot().find("data_memory").findall("cell")
+
+        self.assertEqual(cells[5].get("value_signed"), "8")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Тесты частичного вычисления программы при ассемблировании.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from assembler.command import Command
+from assembler.encoder import Encoder
+from assembler.evaluator import PartialEvaluator
+from vm.interpreter import VirtualMachine
+from vm.image import is_state_image, parse_state_image
+
+class TestPartialEvaluator(unittest.TestCase):
+    """Тесты частичного вычисления."""
+
+    def setUp(self):
+        """Настройка тестов."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Очистка после тестов."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def run_program(self, binary_data):
+        """Выполняет программу и возвращает виртуальную машину."""
+        program_file = os.path.join(self.temp_dir, "program.bin")
+        with open(program_file, 'wb') as f:
+            f.write(binary_data)
+        vm = VirtualMachine(data_memory_size=1024, num_registers=32)
+        vm.load_program_from_file(program_file)
+        vm.run()
+        return vm
+
+    def test_fully_known_program(self):
+        """Тест: программа без входных данных вычисляется целиком."""
+        commands = [
+            Command(158, [-15, 1], 1, ""),
+            Command(158, [10, 2], 2, ""),
+            Command(12, [2, 1], 3, ""),       # memory[10] = -15
+            Command(17, [10, 3], 4, ""),      # R3 = -15
+            Command(214, [1, 2, 3], 5, ""),   # memory[11] = 15
+        ]
+        result = PartialEvaluator(data_size=1024).evaluate(commands)
+
+        self.assertTrue(result.fully_evaluated)
+        self.assertEqual(result.folded, 5)
+        self.assertEqual(result.memory, {10: 0xFFFFFFF1, 11: 15})
+        self.assertEqual(result.memory_accesses, 3)
+
+        image = result.to_image()
+        self.assertTrue(is_state_image(image))
+        self.assertEqual(parse_state_image(image).memory_runs, [(10, [0xFFFFFFF1, 15])])
+
+        expected = self.run_program(Encoder.encode_commands(commands))
+        folded = self.run_program(image)
+        self.assertEqual(list(folded.memory.data_memory), list(expected.memory.data_memory))
+        self.assertEqual(list(folded.memory.registers), list(expected.memory.registers))
+        self.assertEqual(folded.memory.instructions_executed, 5)
+        self.assertEqual(folded.memory.memory_accesses, expected.memory.memory_accesses)
+        self.assertEqual(folded.alu.get_status_string(), expected.alu.get_status_string())
+
+    def test_residual_after_runtime_input(self):
+        """Тест: чтение исходной памяти останавливает вычисление."""
+        commands = [
+            Command(158, [5, 1], 1, ""),
+            Command(17, [100, 2], 2, ""),     # Данные времени выполнения
+            Command(12, [1, 2], 3, ""),
+        ]
+        result = PartialEvaluator().evaluate(commands)
+
+        self.assertEqual(result.folded, 1)
+        self.assertEqual(result.registers, {1: 5})
+        self.assertEqual(result.residual, commands[1:])
+
+    def test_image_for_target_memory_size(self):
+        """Тест: образ строится для памяти целевой ВМ, больший образ отвергается."""
+        commands = [
+            Command(158, [7, 1], 1, ""),
+            Command(158, [2000, 2], 2, ""),
+            Command(12, [2, 1], 3, ""),       # memory[2000] = 7
+        ]
+        image = parse_state_image(PartialEvaluator().evaluate(commands).to_image())
+        vm = VirtualMachine(data_memory_size=1024, num_registers=32)
+        with self.assertRaisesRegex(ValueError, "--data-size 1024"):
+            vm.apply_state_image(image)
+        self.assertEqual(vm.memory.get_register(1), 0)
+
+        result = PartialEvaluator(data_size=1024).evaluate(commands)
+        self.assertEqual(result.folded, 2)
+        self.assertEqual(result.residual, commands[2:])
+        with self.assertRaises(ValueError):
+            VirtualMachine(data_memory_size=1024, num_registers=2).apply_state_image(
+                parse_state_image(result.to_image()))
+
+if __name__ == '__main__':
+    unittest.main()
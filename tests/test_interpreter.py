@@ -4,6 +4,8 @@
 
 import unittest
 import tempfile
+import contextlib
+import io
 import os
 import xml.etree.ElementTree as ET
 from pathlib import Path
@@ -145,5 +147,246 @@ class TestInterpreter(unittest.TestCase):
         self.assertEqual(self.vm.memory.read_data(100), 200)
         self.assertEqual(self.vm.memory.instructions_executed, 4)
 
+    def test_program_table_predecode(self):
+        """Тест предекодирования программы в таблицу инструкций."""
+        from vm.predecode import ProgramTable
+        commands = [
+            Command(158, [-5, 3], 1, ""),
+            Command(17, [100, 2], 2, ""),
+            Command(12, [0, 1], 3, ""),
+            Command(214, [-2, 4, 3], 4, ""),
+        ]
+        binary_data = Encoder().encode_commands(commands)
+        table = ProgramTable(binary_data)
+
+        self.assertEqual(len(table), 4)
+        self.assertEqual(list(table.opcodes), [158, 17, 12, 214])
+        self.assertEqual(list(table.next_ips), [6, 11, 14, 19])
+        self.assertEqual(table.instruction(3).args, (-2, 4, 3))
+        self.assertEqual(table.index_of(11), 2)
+        self.assertIsNone(table.index_of(7))
+        self.assertIsNone(table.error_ip)
+
+    def test_predecoded_run_stops_at_bad_opcode(self):
+        """Тест: инструкции до некорректного кода операции выполняются."""
+        cmd = Command(158, [42, 1], 1, "")
+        program_file = os.path.join(self.temp_dir, "bad.bin")
+        with open(program_file, 'wb') as f:
+            f.write(cmd.encode() + bytes([0xFF]))
+
+        self.vm.load_program_from_file(program_file)
+        self.vm.run()
+
+        self.assertEqual(self.vm.memory.get_register(1), 42)
+        self.assertEqual(self.vm.memory.instructions_executed, 1)
+        self.assertEqual(self.vm.ip, 6)
+
+    def test_threaded_engine_matches_interpreter(self):
+        """Тест: механизм 'threaded' дает тот же результат, что и интерпретатор."""
+        commands = [
+            Command(158, [-7, 1], 1, ""),
+            Command(158, [10, 2], 2, ""),
+            Command(12, [2, 1], 3, ""),       # memory[10] = -7
+            Command(17, [10, 3], 4, ""),      # R3 = memory[10]
+            Command(214, [5, 2, 3], 5, ""),   # memory[15] = abs(R3)
+            Command(158, [-1, 4], 6, ""),
+            Command(12, [4, 1], 7, ""),       # ошибка: отрицательный адрес
+            Command(158, [1, 5], 8, ""),
+        ]
+        program_file = self.create_test_program(commands)
+
+        results = []
+        for engine in VirtualMachine.ENGINES:
+            vm = VirtualMachine(data_memory_size=1024, num_registers=16, engine=engine)
+            vm.load_program_from_file(program_file)
+            vm.run()
+            results.append((
+                list(vm.memory.data_memory), list(vm.memory.registers), vm.ip,
+                vm.memory.instructions_executed, vm.memory.memory_accesses,
+                vm.alu.get_status_string()
+            ))
+
+        self.assertEqual(results[0][0][15], 7)
+        self.assertEqual(results[0][3], 6)
+        for result in results[1:]:
+            self.assertEqual(result, results[0])
+
+    def test_compiled_engine_small_chunks(self):
+        """Тест механизма 'compiled' при разбиении программы на малые фрагменты."""
+        from vm.compiler import CompiledProgram, _chunk_cache
+        commands = [Command(158, [i, 1], i, "") for i in range(1, 6)]
+        commands += [
+            Command(158, [-3, 2], 6, ""),
+            Command(12, [1, 2], 7, ""),      # memory[5] = -3
+            Command(214, [1, 1, 2], 8, ""),  # memory[6] = 3
+            Command(17, [6, 3], 9, ""),
+        ]
+        program_file = self.create_test_program(commands)
+
+        vm = VirtualMachine(data_memory_size=1024, num_registers=16, engine='compiled')
+        vm.load_program_from_file(program_file)
+        vm.compiled_program = CompiledProgram(vm, vm.get_program_table(), chunk_size=2)
+        vm.run()
+
+        self.assertEqual(vm.memory.read_data(5), -3)
+        self.assertEqual(vm.memory.get_register(3), 3)
+        self.assertEqual(vm.memory.instructions_executed, 9)
+        self.assertEqual(vm.ip, len(vm.memory.program_memory))
+
+        # Общий кэш фрагментов не хранит ссылок на код программы
+        self.assertFalse(any(item is vm.memory.program_memory
+                             for key in _chunk_cache for item in key))
+
+    def test_superinstruction_fusion(self):
+        """Тест слияния последовательностей инструкций в суперинструкции."""
+        commands = [
+            Command(158, [-9, 1], 1, ""),
+            Command(158, [20, 2], 2, ""),
+            Command(12, [2, 1], 3, ""),       # LOAD_CONST+WRITE_MEM
+            Command(17, [20, 3], 4, ""),
+            Command(214, [1, 2, 3], 5, ""),   # READ_MEM+ABS
+            Command(158, [1, 4], 6, ""),
+            Command(158, [2, 5], 7, ""),      # LOAD_CONST*
+        ]
+        program_file = self.create_test_program(commands)
+
+        reference = VirtualMachine(data_memory_size=1024, num_registers=16)
+        reference.load_program_from_file(program_file)
+        reference.run()
+
+        vm = VirtualMachine(data_memory_size=1024, num_registers=16,
+                            engine='threaded', fuse=True)
+        vm.load_program_from_file(program_file)
+        vm.run()
+
+        program = vm.threaded_program
+        self.assertEqual(program.fusions_applied, 3)
+        self.assertEqual(list(program.unit_starts), [0, 3, 5, 7])
+        self.assertEqual(list(vm.memory.data_memory), list(reference.memory.data_memory))
+        self.assertEqual(list(vm.memory.registers), list(reference.memory.registers))
+        self.assertEqual(vm.memory.instructions_executed, 7)
+        self.assertEqual(vm.memory.memory_accesses, reference.memory.memory_accesses)
+        self.assertEqual(vm.alu.get_status_string(), reference.alu.get_status_string())
+
+        # Повторная загрузка той же программы не перестраивает шитый код
+        vm.reset()
+        vm.load_program_from_file(program_file)
+        vm.run()
+        self.assertIs(vm.threaded_program, program)
+        self.assertEqual(list(vm.memory.data_memory), list(reference.memory.data_memory))
+
+        # Слияние выполняется только механизмом threaded
+        for engine in ('interpret', 'compiled'):
+            with self.assertRaises(ValueError):
+                VirtualMachine(engine=engine, fuse=True)
+
+    def test_snapshot_restore(self):
+        """Тест снимка и многократного восстановления состояния."""
+        commands = [
+            Command(158, [-7, 1], 1, ""),
+            Command(158, [10, 2], 2, ""),
+            Command(12, [2, 1], 3, ""),       # memory[10] = -7
+            Command(214, [1, 2, 1], 4, ""),   # memory[11] = 7
+        ]
+        program_file = self.create_test_program(commands)
+
+        for engine in VirtualMachine.ENGINES:
+            vm = VirtualMachine(data_memory_size=64, num_registers=8, engine=engine)
+            vm.load_program_from_file(program_file)
+            vm.run(max_steps=2)
+            snapshot = vm.snapshot()
+
+            for value in (5, 6):
+                vm.memory.write_data(10, value)
+                vm.run()
+                self.assertEqual(vm.memory.read_data(11), 7)
+
+                vm.restore(snapshot)
+                self.assertEqual(vm.ip, 12)
+                self.assertEqual(vm.memory.read_data(10), 0)
+                self.assertEqual(vm.memory.data_memory[11], 0)
+                self.assertEqual(vm.memory.get_register(1), -7)
+                self.assertEqual(vm.memory.instructions_executed, 2)
+
+    def test_performance_counters(self):
+        """Тест счетчиков производительности."""
+        commands = [
+            Command(158, [7, 1], 1, ""),
+            Command(158, [-3, 2], 2, ""),
+            Command(12, [1, 2], 3, ""),       # memory[7] = -3
+            Command(17, [7, 3], 4, ""),
+            Command(214, [1, 1, 3], 5, ""),   # memory[8] = 3
+        ]
+        program_file = self.create_test_program(commands)
+
+        vm = VirtualMachine(data_memory_size=64, num_registers=8,
+                            engine='threaded', counters=True)
+        vm.load_program_from_file(program_file)
+        vm.run()
+
+        counters = vm.counters.as_dict()
+        self.assertEqual(counters['instructions_retired'], 5)
+        self.assertEqual(counters['retired'],
+                         {'LOAD_CONST': 2, 'READ_MEM': 1, 'WRITE_MEM': 1, 'ABS': 1})
+        self.assertEqual((counters['loads'], counters['stores']), (1, 2))
+        self.assertEqual(counters['bytes_decoded'], len(vm.memory.program_memory))
+        self.assertEqual(counters['overflow_events'], 0)
+        self.assertEqual(set(counters['time_ns']), {'alu', 'memory', 'register'})
+        self.assertEqual(sum(counters['time_ns'].values()), 0)
+
+        # Счетчики одинаковы во всех механизмах, выбранный механизм не подменяется
+        overflow = self.create_test_program(commands[:1] + [
+            Command(17, [20, 2], 2, ""),      # R2 = -2^31
+            Command(214, [0, 1, 2], 3, ""),   # memory[7] = 0x7FFFFFFF, переполнение
+            Command(214, [1, 1, 2], 4, ""),
+        ])
+        for engine in VirtualMachine.ENGINES:
+            vm = VirtualMachine(data_memory_size=64, num_registers=8,
+                                engine=engine, counters=True)
+            vm.load_program_from_file(overflow)
+            vm.memory.write_data(20, -0x80000000)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                vm.run()
+            self.assertNotIn("Предупреждение", output.getvalue(), engine)
+            self.assertEqual(vm.counters.overflow_events, 2, engine)
+            self.assertEqual(vm.counters.instructions_retired, 4, engine)
+            self.assertEqual((vm.counters.loads, vm.counters.stores), (1, 2), engine)
+
+        dump_file = os.path.join(self.temp_dir, "dump.xml")
+        vm.dump_memory(0, 10, dump_file)
+        info = ET.parse(dump_file).getroot().find("system_info")
+        self.assertEqual(info.find("performance_counters/loads").text, "1")
+        self.assertIsNone(VirtualMachine().counters)
+
+    def test_hooks(self):
+        """Тест обработчиков событий."""
+        commands = [
+            Command(158, [20, 1], 1, ""),
+            Command(158, [-5, 2], 2, ""),
+            Command(12, [1, 2], 3, ""),       # memory[20] = -5
+            Command(17, [20, 3], 4, ""),
+            Command(214, [1, 1, 3], 5, ""),   # memory[21] = 5
+        ]
+        program_file = self.create_test_program(commands)
+        events = []
+
+        vm = VirtualMachine(data_memory_size=64, num_registers=8, engine='compiled')
+        vm.load_program_from_file(program_file)
+        self.assertFalse(vm.hooks)
+        vm.hooks.register('pre_instruction', lambda vm, ip, opcode, args: events.append(('pre', ip, opcode)))
+        vm.hooks.register('memory_read', lambda vm, address, value: events.append(('read', address, value)))
+        vm.hooks.register('memory_write', lambda vm, address, value: events.append(('write', address, value)))
+        vm.hooks.register('alu_flags', lambda vm, alu: events.append(('flags', alu.get_status_string())))
+        vm.run()
+
+        self.assertEqual([event[1] for event in events if event[0] == 'pre'], [0, 6, 12, 15, 20])
+        self.assertEqual([event for event in events if event[0] != 'pre'],
+                         [('write', 20, -5), ('read', 20, -5), ('write', 21, 5), ('flags', '[ ]')])
+        self.assertEqual(vm.memory.read_data(21), 5)
+
+        with self.assertRaises(ValueError):
+            vm.hooks.register('unknown', print)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
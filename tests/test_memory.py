@@ -0,0 +1,338 @@
+"""
+Тесты памяти виртуальной машины.
+"""
+
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from vm.memory import Memory
+from vm.paged import PagedMemory, PAGE_SIZE
+from vm.mapped import MappedMemory
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class TestMemory(unittest.TestCase):
+    """Тесты памяти."""
+
+    def setUp(self):
+        """Настройка тестов."""
+        self.memory = Memory(data_size=256, num_registers=8)
+
+    @unittest.skipIf(np is None, "numpy не установлен")
+    def test_numpy_views_share_storage(self):
+        """Тест: представления numpy не копируют память."""
+        data = self.memory.data_view()
+        signed = self.memory.data_view(signed=True)
+
+        self.memory.write_data(3, -2)
+        self.assertEqual(data[3], 0xFFFFFFFE)
+        self.assertEqual(signed[3], -2)
+
+        signed[4] = -7
+        self.assertEqual(self.memory.read_data(4), -7)
+
+        registers = self.memory.registers_view(signed=True)
+        self.memory.set_register(2, -100)
+        self.assertEqual(registers[2], -100)
+
+        # Очистка памяти не делает представления недействительными
+        self.memory.clear()
+        self.assertEqual(int(signed[3]), 0)
+        signed[5] = 11
+        self.assertEqual(self.memory.read_data(5), 11)
+
+    @unittest.skipIf(np is None, "numpy не установлен")
+    def test_block_transfer(self):
+        """Тест блочной записи и чтения."""
+        values = np.arange(-5, 5, dtype=np.int32)
+        self.memory.load_block(100, values)
+
+        self.assertEqual(self.memory.memory_accesses, 0)
+        self.assertEqual(list(self.memory.read_block(100, 10)), list(range(-5, 5)))
+        self.assertEqual(self.memory.read_block(100, 1, signed=False)[0], 0xFFFFFFFB)
+
+        with self.assertRaises(ValueError):
+            self.memory.load_block(250, values)
+
+    def test_block_load_from_sequence(self):
+        """Тест блочной записи из обычной последовательности."""
+        self.memory.load_block(10, [1, -1, 0x7FFFFFFF])
+
+        self.assertEqual(self.memory.read_data(10), 1)
+        self.assertEqual(self.memory.read_data(11), -1)
+        self.assertEqual(self.memory.read_data(12), 0x7FFFFFFF)
+
+    def test_raw_bytes_little_endian(self):
+        """Тест двоичного представления памяти (little-endian)."""
+        self.memory.write_data(0, 1)
+        self.memory.write_data(1, -1)
+        self.memory.write_data(2, 0x12345678)
+
+        raw = self.memory.to_bytes(0, 2)
+        self.assertEqual(raw, bytes.fromhex("01000000" "ffffffff" "78563412"))
+
+        other = Memory(data_size=256, num_registers=8)
+        other.load_bytes(raw, 10)
+        self.assertEqual(other.read_data(11), -1)
+        self.assertEqual(other.read_data(12), 0x12345678)
+
+        with self.assertRaises(ValueError):
+            other.load_bytes(b"\x00\x01\x02")
+
+    def test_xml_dump_matches_minidom_format(self):
+        """Тест: потоковый XML-дамп совпадает с выводом minidom.toprettyxml."""
+        import tempfile
+        import xml.etree.ElementTree as ET
+        from xml.dom import minidom
+        memory = Memory(data_size=16, num_registers=2)
+        memory.write_data(3, -2)
+        memory.set_register(1, 0x7FFFFFFF)
+        memory.memory_accesses = 0
+
+        root = ET.Element("memory_dump")
+        info = ET.SubElement(root, "system_info")
+        for name, value in (("total_data_memory", 16), ("num_registers", 2),
+                            ("instructions_executed", 0), ("memory_accesses", 1)):
+            ET.SubElement(info, name).text = str(value)
+        registers = ET.SubElement(root, "registers")
+        for reg, value in ((0, 0), (1, 0x7FFFFFFF)):
+            ET.SubElement(registers, "register", id=str(reg), value_signed=str(value),
+                          value_unsigned=str(value), value_hex=f"0x{value:08X}")
+        cells = ET.SubElement(root, "data_memory", start_address="2", end_address="4")
+        for address, signed in ((2, 0), (3, -2), (4, 0)):
+            unsigned = signed & 0xFFFFFFFF
+            ET.SubElement(cells, "cell", address=str(address), value_signed=str(signed),
+                          value_unsigned=str(unsigned), value_hex=f"0x{unsigned:08X}")
+        expected = minidom.parseString(ET.tostring(root, encoding='unicode')).toprettyxml(indent="  ")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dump_file = os.path.join(temp_dir, "dump.xml")
+            memory.read_data(0)
+            memory.dump_to_xml(2, 4, dump_file)
+            with open(dump_file, encoding='utf-8') as f:
+                self.assertEqual(f.read(), expected)
+
+        # Ячейки дампа учитываются как обращения к памяти
+        self.assertEqual(memory.memory_accesses, 4)
+
+    def test_dump_formats(self):
+        """Тест дампов в форматах raw, npy, csv и jsonl со сжатием."""
+        import gzip
+        import json
+        import lzma
+        import tempfile
+        self.memory.write_data(1, -3)
+        self.memory.write_data(2, 0x12345678)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "dump")
+            self.memory.dump(path + ".bin", 0, 3, 'raw')
+            with open(path + ".bin", 'rb') as f:
+                self.assertEqual(f.read(), self.memory.to_bytes(0, 3))
+
+            self.memory.dump(path + ".csv.gz", 1, 2, 'csv')
+            with gzip.open(path + ".csv.gz", 'rt', encoding='utf-8') as f:
+                self.assertEqual(f.read(), "address,value_signed,value_unsigned,value_hex\n"
+                                           "1,-3,4294967293,0xFFFFFFFD\n"
+                                           "2,305419896,305419896,0x12345678\n")
+
+            self.memory.dump(path + ".jsonl.xz", 0, 2, 'jsonl')
+            with lzma.open(path + ".jsonl.xz", 'rt', encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f]
+            self.assertEqual(rows, [{"address": 0, "value": 0}, {"address": 1, "value": -3},
+                                    {"address": 2, "value": 0x12345678}])
+
+            if np is not None:
+                self.memory.dump(path + ".npy", 0, 255, 'npy')
+                self.assertTrue(np.array_equal(np.load(path + ".npy"),
+                                               self.memory.data_view(signed=True)))
+
+            with self.assertRaises(ValueError):
+                self.memory.dump(path + ".npy", 0, 3, 'npy', populated_only=True)
+            with self.assertRaises(ValueError):
+                self.memory.dump(path + ".txt", 0, 3, 'txt')
+
+            # Ячейки дампа учитываются как обращения к памяти в любом формате
+            for dump_format in ('xml', 'raw', 'csv', 'jsonl'):
+                accesses = self.memory.memory_accesses
+                self.memory.dump(path + "." + dump_format, 4, 7, dump_format)
+                self.assertEqual(self.memory.memory_accesses - accesses, 4, dump_format)
+
+    def test_parallel_dump_matches_serial(self):
+        """Тест: дамп, сформированный пулом процессов, совпадает с последовательным."""
+        import tempfile
+        from unittest import mock
+        for address in range(0, 256, 3):
+            self.memory.write_data(address, address * -1000)
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                mock.patch('vm.paralleldump.CELLS_PER_CHUNK', 10), \
+                mock.patch('vm.xmldump.PARALLEL_MIN_CELLS', 0), \
+                mock.patch('vm.dumpformats.PARALLEL_MIN_CELLS', 0):
+            for dump_format in ('xml', 'csv'):
+                contents = []
+                for workers in (1, 2):
+                    self.memory.memory_accesses = 0
+                    path = os.path.join(temp_dir, f"dump{workers}.{dump_format}")
+                    self.memory.dump_regions(path, [(0, 99), (150, 255)], dump_format,
+                                             workers=workers)
+                    with open(path, encoding='utf-8') as f:
+                        contents.append(f.read())
+                self.assertEqual(contents[0], contents[1])
+
+    def test_clear_zeroes_in_place(self):
+        """Тест очистки памяти без замены буферов."""
+        data_memory = self.memory.data_memory
+        self.memory.write_data(7, 123)
+        self.memory.set_register(1, -5)
+
+        self.memory.clear()
+
+        self.assertIs(self.memory.data_memory, data_memory)
+        self.assertEqual(self.memory.read_data(7), 0)
+        self.assertEqual(self.memory.get_register(1), 0)
+        self.assertEqual(self.memory.to_bytes(), bytes(4 * 256))
+
+
+class TestPagedMemory(unittest.TestCase):
+    """Тесты страничной памяти."""
+
+    def test_pages_allocated_on_write(self):
+        """Тест: страницы выделяются только при записи ненулевых значений."""
+        memory = PagedMemory()
+        self.assertEqual(memory.data_size, 1 << 26)
+
+        self.assertEqual(memory.read_data(0x3FFFFFF), 0)
+        memory.write_data(100, 0)
+        self.assertEqual(memory.resident_pages, 0)
+
+        memory.write_data(0x3FFFFFF, -9)
+        memory.write_data(5 * PAGE_SIZE + 1, 42)
+        self.assertEqual(memory.resident_pages, 2)
+        self.assertEqual(memory.read_data(0x3FFFFFF), -9)
+
+        with self.assertRaises(ValueError):
+            memory.read_data(1 << 26)
+
+    def test_populated_only_dump(self):
+        """Тест дампа только выделенных страниц."""
+        import tempfile
+        import xml.etree.ElementTree as ET
+        memory = PagedMemory(num_registers=4)
+        memory.write_data(3 * PAGE_SIZE + 7, 5)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dump_file = os.path.join(temp_dir, "dump.xml")
+            memory.dump_to_xml(0, 10 * PAGE_SIZE, dump_file, populated_only=True)
+            cells = ET.parse(dump_file).getroot().find("data_memory").findall("cell")
+
+        self.assertEqual(len(cells), PAGE_SIZE)
+        self.assertEqual(cells[0].get("address"), str(3 * PAGE_SIZE))
+        self.assertEqual(cells[7].get("value_signed"), "5")
+
+    def test_block_and_bytes_across_pages(self):
+        """Тест блочных операций на границе страниц."""
+        memory = PagedMemory()
+        memory.load_block(PAGE_SIZE - 1, [1, -2, 3])
+
+        self.assertEqual(memory.to_bytes(PAGE_SIZE - 1, PAGE_SIZE + 1),
+                         bytes.fromhex("01000000" "feffffff" "03000000"))
+        self.assertEqual(memory.resident_pages, 2)
+
+    def test_snapshot_copy_on_write(self):
+        """Тест: снимок разделяет страницы, восстановление возвращает измененные."""
+        memory = PagedMemory()
+        memory.write_data(0, 1)
+        memory.write_data(10 * PAGE_SIZE, 2)
+        snapshot = memory.snapshot()
+        shared = memory.data_memory.pages[10]
+
+        memory.write_data(10 * PAGE_SIZE, 3)
+        memory.write_data(20 * PAGE_SIZE, 4)
+        self.assertEqual(memory.data_memory.dirty, {10, 20})
+        self.assertIsNot(memory.data_memory.pages[10], shared)
+        self.assertEqual(shared[0], 2)
+
+        memory.restore(snapshot)
+        self.assertIs(memory.data_memory.pages[10], shared)
+        self.assertEqual(memory.read_data(10 * PAGE_SIZE), 2)
+        self.assertEqual(memory.resident_pages, 2)
+        self.assertEqual(memory.data_memory.dirty, set())
+
+    def test_track_writes_keeps_snapshot_bookkeeping(self):
+        """Тест: track_writes не сбрасывает учет страниц, измененных после снимка."""
+        memory = PagedMemory()
+        memory.write_data(0, 1)
+        snapshot = memory.snapshot()
+        memory.write_data(10 * PAGE_SIZE, 2)
+        memory.track_writes()
+        memory.write_data(0, 5)
+        memory.write_data(20 * PAGE_SIZE, 3)
+
+        self.assertEqual(memory.data_memory.dirty, {0, 10, 20})
+        self.assertEqual(list(memory.changed_cells(0, 30 * PAGE_SIZE)),
+                         [(0, 5), (20 * PAGE_SIZE, 3)])
+        memory.restore(snapshot)
+        self.assertEqual([memory.read_data(a) for a in (0, 10 * PAGE_SIZE, 20 * PAGE_SIZE)],
+                         [1, 0, 0])
+        self.assertEqual(memory.resident_pages, 1)
+
+
+@unittest.skipIf(sys.byteorder != 'little', "отображение на файл требует little-endian")
+class TestMappedMemory(unittest.TestCase):
+    """Тесты памяти, отображенной на файл."""
+
+    def setUp(self):
+        """Настройка тестов."""
+        import tempfile
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, "memory.bin")
+
+    def tearDown(self):
+        """Очистка после тестов."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def test_state_persists_between_runs(self):
+        """Тест: память сохраняется в файле и читается следующим запуском."""
+        with MappedMemory(self.file_path, data_size=1024) as memory:
+            memory.write_data(10, -5)
+            memory.write_data(1023, 77)
+
+        self.assertEqual(os.path.getsize(self.file_path), 4 * 1024)
+
+        with MappedMemory(self.file_path) as memory:
+            self.assertEqual(memory.data_size, 1024)
+            self.assertEqual(memory.read_data(10), -5)
+            self.assertEqual(memory.read_data(1023), 77)
+
+    def test_file_matches_raw_dump(self):
+        """Тест: файл памяти совпадает с двоичным дампом."""
+        from vm.interpreter import VirtualMachine
+        vm = VirtualMachine(data_memory_size=64, memory_file=self.file_path)
+        vm.memory.write_data(3, 0x12345678)
+        expected = vm.memory.to_bytes()
+        vm.close()
+
+        with open(self.file_path, 'rb') as f:
+            self.assertEqual(f.read(), expected)
+
+    def test_vm_uses_existing_file_size(self):
+        """Тест: машина над существующим файлом получает память его размера."""
+        from vm.interpreter import VirtualMachine
+        with MappedMemory(self.file_path, data_size=100000) as memory:
+            memory.write_data(99999, 42)
+
+        vm = VirtualMachine(memory_file=self.file_path)
+        self.assertEqual(vm.memory.data_size, 100000)
+        self.assertEqual(vm.memory.read_data(99999), 42)
+        vm.close()
+
+if __name__ == '__main__':
+    unittest.main()
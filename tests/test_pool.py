@@ -0,0 +1,102 @@
+"""
+Тесты пула виртуальных машин.
+"""
+
+import unittest
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from assembler.command import Command
+from assembler.encoder import Encoder
+from vm.interpreter import VirtualMachine
+from vm.paged import PAGE_SIZE
+from vm.pool import VMPool
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class TestVMPool(unittest.TestCase):
+    """Тесты пула виртуальных машин."""
+
+    def run_job(self, vm, address, value):
+        """Выполняет задание: memory[address] = abs(value)."""
+        program = Encoder.encode_commands([
+            Command(158, [value, 1], 1, ""),
+            Command(158, [address, 2], 2, ""),
+            Command(214, [0, 2, 1], 3, ""),
+        ])
+        vm.memory.load_program(program)
+        vm.run()
+
+    def test_release_resets_touched_state(self):
+        """Тест: возвращенная машина очищается и выдается повторно."""
+        pool = VMPool(size=1, engine='threaded')
+        with pool.machine() as vm:
+            self.run_job(vm, 5 * PAGE_SIZE, -7)
+            self.assertEqual(vm.memory.read_data(5 * PAGE_SIZE), 7)
+            self.assertEqual(vm.memory.resident_pages, 1)
+
+        again = pool.acquire()
+        self.assertIs(again, vm)
+        self.assertEqual(pool.created, 1)
+        self.assertEqual(again.memory.resident_pages, 0)
+        self.assertEqual(again.memory.get_register(1), 0)
+        self.assertEqual(again.memory.instructions_executed, 0)
+        self.assertEqual(again.ip, 0)
+
+        self.run_job(again, 3, -4)
+        self.assertEqual(again.memory.read_data(3), 4)
+        self.assertEqual(again.memory.read_data(5 * PAGE_SIZE), 0)
+
+    def test_pool_grows_and_checks_owner(self):
+        """Тест: пул создает машины по необходимости и принимает только свои."""
+        pool = VMPool(size=1)
+        first, second = pool.acquire(), pool.acquire()
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.created, 2)
+
+        pool.release(first)
+        with self.assertRaises(ValueError):
+            pool.release(first)
+        with self.assertRaises(ValueError):
+            pool.release(VirtualMachine())
+
+    def test_double_release_does_not_duplicate_machine(self):
+        """Тест: повторный возврат отклоняется до очистки и не дублирует машину."""
+        pool = VMPool(size=1)
+        vm = pool.acquire()
+        vm.memory.write_data(7, 9)
+        pool.release(vm)
+        with self.assertRaises(ValueError):
+            pool.release(vm)
+        self.assertEqual(pool.available, 1)
+
+        first, second = pool.acquire(), pool.acquire()
+        self.assertIsNot(first, second)
+        first.memory.write_data(7, 5)
+        pool.release(second)
+        self.assertEqual(first.memory.read_data(7), 5)
+
+    def test_release_restores_engine_settings(self):
+        """Тест: механизм и слияние, измененные заданием, восстанавливаются при возврате."""
+        pool = VMPool(size=1)
+        with pool.machine() as vm:
+            vm.engine, vm.fuse = 'threaded', True
+            self.run_job(vm, 3, -4)
+        self.assertEqual((vm.engine, vm.fuse), ('interpret', False))
+
+    @unittest.skipIf(np is None, "numpy не установлен")
+    def test_dense_pool_memory(self):
+        """Тест: пул с плотной памятью дает представления и очищает память."""
+        pool = VMPool(size=1, data_memory_size=64, paged=False)
+        with pool.machine() as vm:
+            self.run_job(vm, 40, -6)
+            self.assertEqual(vm.memory.data_view()[40], 6)
+        self.assertFalse(vm.memory.data_view().any())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Тесты таблицы строк и профилировщика.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from assembler.command import Command
+from assembler.encoder import Encoder
+from assembler.linetable import write_line_table
+from vm.interpreter import VirtualMachine
+from vm.profiler import LineTable, Profiler
+
+class TestProfiler(unittest.TestCase):
+    """Тесты профилировщика."""
+
+    def setUp(self):
+        """Настройка тестов."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.commands = [
+            Command(158, [-4, 1], 3, "158,-4,1"),
+            Command(158, [10, 2], 4, "158,10,2"),
+            Command(214, [0, 2, 1], 7, "214,0,2,1"),
+        ]
+
+    def tearDown(self):
+        """Очистка после тестов."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def test_line_table_roundtrip(self):
+        """Тест: таблица строк сопоставляет IP строкам исходного текста."""
+        path = os.path.join(self.temp_dir, "program.bin.lines")
+        write_line_table(self.commands, path, "/src/program.asm")
+        table = LineTable.load(path)
+
+        self.assertEqual(table.source, "program.asm")
+        self.assertEqual(table.lookup(0), (3, "158,-4,1"))
+        self.assertEqual(table.lookup(12), (7, "214,0,2,1"))
+        self.assertIsNone(table.lookup(17))
+
+    def test_profile_by_line_and_opcode(self):
+        """Тест отчетов профилировщика."""
+        path = os.path.join(self.temp_dir, "program.bin.lines")
+        write_line_table(self.commands, path, "program.asm")
+
+        vm = VirtualMachine(data_memory_size=64, num_registers=8, engine='compiled')
+        vm.profiler = Profiler(LineTable.load(path))
+        vm.memory.load_program(Encoder.encode_commands(self.commands))
+        vm.run()
+
+        self.assertEqual(vm.memory.read_data(10), 4)
+        self.assertEqual([row['location'] for row in vm.profiler.by_line()], [3, 4, 7])
+        self.assertEqual({row['opcode']: row['hits'] for row in vm.profiler.by_opcode()},
+                         {'LOAD_CONST': 2, 'ABS': 1})
+        self.assertEqual(len(vm.profiler.top(2)), 2)
+
+        folded = vm.profiler.folded().splitlines()
+        self.assertEqual(len(folded), 3)
+        self.assertTrue(folded[2].startswith("program.asm;ABS;строка 7: 214,0,2,1 "))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Тесты записи трассы выполнения и запросов к ней.
+"""
+
+import unittest
+import tempfile
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from assembler.command import Command
+from assembler.encoder import Encoder
+from vm.interpreter import VirtualMachine
+
+try:
+    import numpy as np
+    from vm.recorder import TraceRecorder, load_trace, FLAG_Z, FLAG_V
+    from vm import trace_query
+except ImportError:
+    np = None
+
+@unittest.skipIf(np is None, "numpy не установлен")
+class TestTraceRecorder(unittest.TestCase):
+    """Тесты записи трассы."""
+
+    def setUp(self):
+        """Настройка тестов."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.trace_file = os.path.join(self.temp_dir, "trace.npz")
+
+    def tearDown(self):
+        """Очистка после тестов."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def test_record_and_query(self):
+        """Тест записи трассы фрагментами и запросов к ней."""
+        program = Encoder.encode_commands([
+            Command(158, [5, 1], 1, ""),
+            Command(158, [-2, 2], 2, ""),
+            Command(12, [1, 2], 3, ""),       # memory[5] = -2
+            Command(17, [5, 3], 4, ""),       # R3 = -2
+            Command(158, [0, 2], 5, ""),
+            Command(12, [1, 2], 6, ""),       # memory[5] = 0
+            Command(214, [1, 1, 2], 7, ""),   # memory[6] = 0, флаг Z
+        ])
+        vm = VirtualMachine(data_memory_size=16, num_registers=4, engine='threaded')
+        vm.memory.load_program(program)
+        recorder = TraceRecorder(self.trace_file, chunk_size=3)
+        recorder.attach(vm)
+        with contextlib.redirect_stdout(io.StringIO()):
+            vm.run()
+        recorder.close()
+        self.assertEqual(recorder.chunks, [3, 3, 1])
+
+        trace = load_trace(self.trace_file)
+        self.assertEqual(list(trace['step']), list(range(7)))
+        self.assertEqual(list(trace['opcode']), [158, 158, 12, 17, 158, 12, 214])
+        self.assertEqual(list(trace['address']), [-1, -1, 5, 5, -1, 5, 6])
+        self.assertEqual(trace['flags'][6], FLAG_Z)
+
+        self.assertEqual(trace_query.last_write(trace, 5), 5)
+        self.assertIsNone(trace_query.last_write(trace, 7))
+        self.assertEqual(list(trace_query.writes_in_range(trace, 0, 5)), [2, 5])
+        history = trace_query.register_history(trace, 2)
+        self.assertEqual(list(trace['value'][history]), [-2, 0])
+        self.assertIn("memory[6] = 0 [Z]", trace_query.format_row(trace, 6))
+
+    def test_flags_match_alu_status(self):
+        """Тест: флаги в выводе запросов совпадают с ALU.get_status_string."""
+        from vm.alu import ALU
+        alu = ALU()
+        alu.zero_flag = alu.overflow_flag = True
+        self.assertEqual(trace_query.format_flags(FLAG_Z | FLAG_V), alu.get_status_string())
+        self.assertEqual(trace_query.format_flags(0), ALU().get_status_string())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Тесты периодических снимков памяти во время выполнения.
+"""
+
+import unittest
+import tempfile
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from assembler.command import Command
+from assembler.encoder import Encoder
+from vm.interpreter import VirtualMachine
+from vm.snapshots import SnapshotStream
+from vm.main import main as vm_main
+
+try:
+    import numpy as np
+    from vm.snapshots import load_snapshots
+except ImportError:
+    np = None
+
+@unittest.skipIf(np is None, "numpy не установлен")
+class TestSnapshotStream(unittest.TestCase):
+    """Тесты снимков."""
+
+    def setUp(self):
+        """Настройка тестов."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_file = os.path.join(self.temp_dir.name, "snapshots.bin")
+        self.program = Encoder.encode_commands([
+            Command(158, [1, 1], 1, ""),     # IP 0
+            Command(158, [10, 2], 2, ""),    # IP 6
+            Command(12, [1, 2], 3, ""),      # IP 12: memory[1] = 10
+            Command(158, [2, 1], 4, ""),     # IP 15
+            Command(158, [-20, 2], 5, ""),   # IP 21
+            Command(12, [1, 2], 6, ""),      # IP 27: memory[2] = -20
+        ])
+
+    def tearDown(self):
+        """Очистка после тестов."""
+        self.temp_dir.cleanup()
+
+    def run_program(self, engine: str, max_steps: int = 0, **options) -> VirtualMachine:
+        vm = VirtualMachine(data_memory_size=16, num_registers=4, engine=engine,
+                            fuse=engine == 'threaded')
+        vm.memory.load_program(self.program)
+        stream = SnapshotStream(self.snapshot_file, [(0, 3)], **options)
+        stream.attach(vm)
+        with contextlib.redirect_stdout(io.StringIO()):
+            vm.run(max_steps)
+        stream.close()
+        return vm
+
+    def test_snapshots_every_n_and_at_ips(self):
+        """Тест: снимки каждые N инструкций и перед заданными IP во всех механизмах."""
+        for engine in VirtualMachine.ENGINES:
+            vm = self.run_program(engine, every=2, ips=[0, 27])
+            self.assertEqual(vm.memory.read_data(2), -20)
+
+            series = load_snapshots(self.snapshot_file)
+            self.assertEqual(list(series.steps), [0, 2, 4, 5], engine)
+            self.assertEqual(list(series.ips), [0, 12, 21, 27])
+            self.assertEqual(list(series.cell(1)), [0, 0, 10, 10])
+            self.assertEqual(list(series.cell(2)), [0, 0, 0, 0])
+            self.assertEqual(list(series.register(2)), [0, 10, 10, -20])
+            self.assertEqual(series.window(0, 3).shape, (4, 4))
+
+    def test_snapshots_respect_step_limit(self):
+        """Тест: лимит инструкций учитывается по всему запуску."""
+        for engine in VirtualMachine.ENGINES:
+            vm = self.run_program(engine, max_steps=3, every=2)
+            self.assertEqual(vm.memory.instructions_executed, 3, engine)
+            self.assertEqual(vm.ip, 15)
+            self.assertEqual(list(load_snapshots(self.snapshot_file).steps), [2])
+
+    def test_invalid_stream(self):
+        """Тест проверки параметров снимков."""
+        with self.assertRaises(ValueError):
+            SnapshotStream(self.snapshot_file, [(0, 3)])
+        vm = VirtualMachine(data_memory_size=16, num_registers=4)
+        with self.assertRaises(ValueError):
+            SnapshotStream(self.snapshot_file, [(0, 16)], every=1).attach(vm)
+
+        # IP не на границе инструкции и за концом программы
+        vm.memory.load_program(self.program)
+        for ip in (1, 30):
+            with self.assertRaisesRegex(ValueError, f"0x{ip:04X}"):
+                SnapshotStream(self.snapshot_file, [(0, 3)], ips=[0, ip]).attach(vm)
+
+    def test_default_regions_clamped_to_memory(self):
+        """Тест: области дампа за концом памяти ограничиваются и для снимков."""
+        program_file = os.path.join(self.temp_dir.name, "program.bin")
+        with open(program_file, 'wb') as f:
+            f.write(self.program)
+        argv = ['interpreter.py', program_file, os.path.join(self.temp_dir.name, "dump.xml"),
+                '0', '70000', '--snapshots', self.snapshot_file, '--snapshot-every', '3']
+        original_argv = sys.argv
+        try:
+            sys.argv = argv
+            with contextlib.redirect_stdout(io.StringIO()):
+                vm_main()
+        finally:
+            sys.argv = original_argv
+
+        series = load_snapshots(self.snapshot_file)
+        self.assertEqual(list(series.steps), [3])
+        self.assertEqual(series.window(0, 65535).shape, (1, 65536))
+        self.assertEqual(list(series.cell(1)), [10])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Тесты буферизованной трассировки выполнения.
+"""
+
+import unittest
+import tempfile
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from assembler.command import Command
+from assembler.encoder import Encoder
+from vm.interpreter import VirtualMachine
+from vm.trace import TraceWriter, Tracer, TRACE_INSTRUCTIONS, TRACE_FLAGS
+
+class TestTrace(unittest.TestCase):
+    """Тесты трассировки."""
+
+    def setUp(self):
+        """Настройка тестов."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.trace_file = os.path.join(self.temp_dir, "trace.txt")
+        self.program = Encoder.encode_commands([
+            Command(158, [7, 0], 1, ""),
+            Command(158, [-3, 1], 2, ""),
+            Command(12, [0, 1], 3, ""),
+            Command(17, [7, 2], 4, ""),
+            Command(214, [1, 0, 2], 5, ""),
+        ])
+
+    def tearDown(self):
+        """Очистка после тестов."""
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def run_vm(self, engine='interpret', debug=False, tracer=None):
+        """Выполняет программу и возвращает вывод."""
+        vm = VirtualMachine(data_memory_size=64, num_registers=8, engine=engine)
+        vm.memory.load_program(self.program)
+        vm.debug = debug
+        vm.show_alu_flags = debug
+        if tracer is not None:
+            tracer.attach(vm)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            vm.run()
+        if tracer is not None:
+            tracer.writer.close()
+        return output.getvalue()
+
+    def read_trace(self):
+        """Читает строки файла трассировки."""
+        with open(self.trace_file, encoding='utf-8') as f:
+            return f.read().splitlines()
+
+    def test_trace_matches_debug_output(self):
+        """Тест: полная трассировка совпадает с выводом --debug."""
+        debug_lines = [line for line in self.run_vm(debug=True).splitlines()
+                       if line.startswith(('[', '  '))]
+        tracer = Tracer(TraceWriter(self.trace_file, batch_lines=3), level=TRACE_FLAGS)
+        self.run_vm(engine='threaded', tracer=tracer)
+
+        self.assertEqual(self.read_trace(), debug_lines)
+        self.assertEqual(tracer.writer.lines_written, len(debug_lines))
+
+    def test_debug_output_precedes_run_summary(self):
+        """Тест: буферизованный вывод --debug записан до итогов выполнения."""
+        for engine in VirtualMachine.ENGINES:
+            lines = self.run_vm(engine=engine, debug=True).splitlines()
+            traced = [number for number, line in enumerate(lines) if line.startswith('[')]
+            self.assertEqual(len(traced), 5, engine)
+            self.assertLess(traced[-1], lines.index("Выполнение завершено."))
+
+    def test_sampling(self):
+        """Тест отбора каждой N-й инструкции и диапазона IP."""
+        tracer = Tracer(TraceWriter(self.trace_file), level=TRACE_INSTRUCTIONS, every=2)
+        self.run_vm(tracer=tracer)
+        self.assertEqual([line[:6] for line in self.read_trace()], ["[0000]", "[000C]", "[0014]"])
+
+        tracer = Tracer(TraceWriter(self.trace_file), ip_range=(6, 0x0F))
+        self.run_vm(tracer=tracer)
+        self.assertEqual(len(self.read_trace()), 6)
+        self.assertEqual((tracer.instructions_traced, tracer.instructions_seen), (3, 5))
+
+        writer = TraceWriter(self.trace_file)
+        with self.assertRaises(ValueError):
+            Tracer(writer, every=0)
+        writer.close()
+
+if __name__ == '__main__':
+    unittest.main()